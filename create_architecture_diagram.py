@@ -6,6 +6,7 @@ Creates a comprehensive visual representation of the system architecture
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.patches import FancyBboxPatch, FancyArrowPatch
+from matplotlib.collections import PatchCollection
 import matplotlib.lines as mlines
 
 # Set up the figure
@@ -51,6 +52,11 @@ ax.add_patch(router_box)
 ax.text(10, mode_y + 0.5, 'Mode Router\n& Dispatcher', ha='center', va='center',
         fontsize=11, fontweight='bold')
 
+# Shared text styles, built once and reused by every label below
+title_font = dict(ha='center', va='center', fontsize=11, fontweight='bold')
+label_font = dict(ha='center', va='center', fontsize=8)
+item_font = dict(ha='center', va='center', fontsize=9)
+
 # ==================== Layer 3: Operational Modes ====================
 modes_y = 7.5
 mode_width = 3.2
@@ -64,122 +70,73 @@ modes = [
     {'name': 'Database\nMode', 'icon': '🗄️', 'x': 15}
 ]
 
+# Boxes are collected per layer and drawn as one PatchCollection each
+mode_patches = []
 for mode in modes:
-    box = FancyBboxPatch((mode['x'], modes_y), mode_width, 1.2,
-                         boxstyle="round,pad=0.08",
-                         edgecolor='#F57C00', facecolor=color_mode, linewidth=1.5)
-    ax.add_patch(box)
+    mode_patches.append(FancyBboxPatch((mode['x'], modes_y), mode_width, 1.2,
+                                       boxstyle="round,pad=0.08",
+                                       edgecolor='#F57C00', facecolor=color_mode, linewidth=1.5))
     ax.text(mode['x'] + mode_width/2, modes_y + 0.8, mode['icon'],
             ha='center', va='center', fontsize=16)
     ax.text(mode['x'] + mode_width/2, modes_y + 0.35, mode['name'],
             ha='center', va='center', fontsize=9, fontweight='bold')
+ax.add_collection(PatchCollection(mode_patches, match_original=True))
 
 # ==================== Layer 4: Core Modules ====================
 modules_y = 5
 module_height = 1.5
 
-# ETL Module
-etl_box = FancyBboxPatch((0.5, modules_y), 3, module_height,
-                         boxstyle="round,pad=0.1",
-                         edgecolor='#388E3C', facecolor=color_core, linewidth=2)
-ax.add_patch(etl_box)
-ax.text(2, modules_y + 1.1, 'ETL Module', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#2E7D32')
-ax.text(2, modules_y + 0.7, 'Data Loading', ha='center', va='center', fontsize=8)
-ax.text(2, modules_y + 0.4, 'Transformation', ha='center', va='center', fontsize=8)
-ax.text(2, modules_y + 0.1, 'Schema Validation', ha='center', va='center', fontsize=8)
-
-# Ollama Client
-ollama_box = FancyBboxPatch((4, modules_y), 3, module_height,
-                           boxstyle="round,pad=0.1",
-                           edgecolor='#D32F2F', facecolor=color_llm, linewidth=2)
-ax.add_patch(ollama_box)
-ax.text(5.5, modules_y + 1.1, 'Ollama Client', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#C62828')
-ax.text(5.5, modules_y + 0.7, 'llama3, mistral, phi3', ha='center', va='center', fontsize=8)
-ax.text(5.5, modules_y + 0.4, 'Prompt Templates', ha='center', va='center', fontsize=8)
-ax.text(5.5, modules_y + 0.1, 'Code Executor', ha='center', va='center', fontsize=8)
-
-# Agent Orchestrator
-agent_box = FancyBboxPatch((7.5, modules_y), 3.5, module_height,
-                          boxstyle="round,pad=0.1",
-                          edgecolor='#00897B', facecolor=color_agent, linewidth=2)
-ax.add_patch(agent_box)
-ax.text(9.25, modules_y + 1.1, 'Agent Orchestrator', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#00796B')
-ax.text(9.25, modules_y + 0.7, '• ETL Agent', ha='center', va='center', fontsize=8)
-ax.text(9.25, modules_y + 0.4, '• Query Agent', ha='center', va='center', fontsize=8)
-ax.text(9.25, modules_y + 0.1, '• Profiling Agent', ha='center', va='center', fontsize=8)
-
-# PDF Extractor
-pdf_box = FancyBboxPatch((11.5, modules_y), 3, module_height,
-                        boxstyle="round,pad=0.1",
-                        edgecolor='#7B1FA2', facecolor=color_storage, linewidth=2)
-ax.add_patch(pdf_box)
-ax.text(13, modules_y + 1.1, 'PDF Extractor', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#6A1B9A')
-ax.text(13, modules_y + 0.7, 'Text & Tables', ha='center', va='center', fontsize=8)
-ax.text(13, modules_y + 0.4, 'NER Processor', ha='center', va='center', fontsize=8)
-ax.text(13, modules_y + 0.1, 'Entity Extraction', ha='center', va='center', fontsize=8)
-
-# Database Handlers
-db_box = FancyBboxPatch((15, modules_y), 3, module_height,
-                       boxstyle="round,pad=0.1",
-                       edgecolor='#1976D2', facecolor=color_ui, linewidth=2)
-ax.add_patch(db_box)
-ax.text(16.5, modules_y + 1.1, 'DB Handlers', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#1565C0')
-ax.text(16.5, modules_y + 0.7, 'DuckDB', ha='center', va='center', fontsize=8)
-ax.text(16.5, modules_y + 0.4, 'SQLite', ha='center', va='center', fontsize=8)
-ax.text(16.5, modules_y + 0.1, 'SQL Interface', ha='center', va='center', fontsize=8)
+core_modules = [
+    {'title': 'ETL Module', 'x': 0.5, 'width': 3, 'edge': '#388E3C', 'face': color_core,
+     'color': '#2E7D32', 'items': ['Data Loading', 'Transformation', 'Schema Validation']},
+    {'title': 'Ollama Client', 'x': 4, 'width': 3, 'edge': '#D32F2F', 'face': color_llm,
+     'color': '#C62828', 'items': ['llama3, mistral, phi3', 'Prompt Templates', 'Code Executor']},
+    {'title': 'Agent Orchestrator', 'x': 7.5, 'width': 3.5, 'edge': '#00897B', 'face': color_agent,
+     'color': '#00796B', 'items': ['• ETL Agent', '• Query Agent', '• Profiling Agent']},
+    {'title': 'PDF Extractor', 'x': 11.5, 'width': 3, 'edge': '#7B1FA2', 'face': color_storage,
+     'color': '#6A1B9A', 'items': ['Text & Tables', 'NER Processor', 'Entity Extraction']},
+    {'title': 'DB Handlers', 'x': 15, 'width': 3, 'edge': '#1976D2', 'face': color_ui,
+     'color': '#1565C0', 'items': ['DuckDB', 'SQLite', 'SQL Interface']},
+]
+
+core_patches = []
+for module in core_modules:
+    core_patches.append(FancyBboxPatch((module['x'], modules_y), module['width'], module_height,
+                                       boxstyle="round,pad=0.1",
+                                       edgecolor=module['edge'], facecolor=module['face'], linewidth=2))
+    center_x = module['x'] + module['width']/2
+    ax.text(center_x, modules_y + 1.1, module['title'], color=module['color'], **title_font)
+    for offset, item in zip((0.7, 0.4, 0.1), module['items']):
+        ax.text(center_x, modules_y + offset, item, **label_font)
+ax.add_collection(PatchCollection(core_patches, match_original=True))
 
 # ==================== Layer 5: Support Services ====================
 support_y = 2.5
 support_height = 1.8
 
-# Cache Manager
-cache_box = FancyBboxPatch((1, support_y), 4, support_height,
-                          boxstyle="round,pad=0.1",
-                          edgecolor='#F57C00', facecolor='#FFF8E1', linewidth=2)
-ax.add_patch(cache_box)
-ax.text(3, support_y + 1.4, 'Cache Manager', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#EF6C00')
-ax.text(3, support_y + 1.0, '💾 Memory Cache', ha='center', va='center', fontsize=9)
-ax.text(3, support_y + 0.6, '💿 Disk Cache', ha='center', va='center', fontsize=9)
-ax.text(3, support_y + 0.2, 'TTL Management', ha='center', va='center', fontsize=8)
-
-# Memory Store
-memory_box = FancyBboxPatch((5.5, support_y), 4, support_height,
-                           boxstyle="round,pad=0.1",
-                           edgecolor='#7B1FA2', facecolor='#F3E5F5', linewidth=2)
-ax.add_patch(memory_box)
-ax.text(7.5, support_y + 1.4, 'Memory Store', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#6A1B9A')
-ax.text(7.5, support_y + 1.0, '💬 Conversation History', ha='center', va='center', fontsize=9)
-ax.text(7.5, support_y + 0.6, '📦 Session State', ha='center', va='center', fontsize=9)
-ax.text(7.5, support_y + 0.2, 'Context Management', ha='center', va='center', fontsize=8)
-
-# Configuration
-config_box = FancyBboxPatch((10, support_y), 4, support_height,
-                           boxstyle="round,pad=0.1",
-                           edgecolor='#388E3C', facecolor='#E8F5E9', linewidth=2)
-ax.add_patch(config_box)
-ax.text(12, support_y + 1.4, 'Configuration', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#2E7D32')
-ax.text(12, support_y + 1.0, '⚙️ Environment Variables', ha='center', va='center', fontsize=9)
-ax.text(12, support_y + 0.6, '📁 Directory Setup', ha='center', va='center', fontsize=9)
-ax.text(12, support_y + 0.2, 'Settings Management', ha='center', va='center', fontsize=8)
-
-# Security
-security_box = FancyBboxPatch((14.5, support_y), 4, support_height,
-                             boxstyle="round,pad=0.1",
-                             edgecolor='#D32F2F', facecolor='#FFEBEE', linewidth=2)
-ax.add_patch(security_box)
-ax.text(16.5, support_y + 1.4, 'Security Layer', ha='center', va='center',
-        fontsize=11, fontweight='bold', color='#C62828')
-ax.text(16.5, support_y + 1.0, '🔒 Code Sandbox', ha='center', va='center', fontsize=9)
-ax.text(16.5, support_y + 0.6, '✅ Safety Checks', ha='center', va='center', fontsize=9)
-ax.text(16.5, support_y + 0.2, 'Module Whitelist', ha='center', va='center', fontsize=8)
+support_services = [
+    {'title': 'Cache Manager', 'x': 1, 'edge': '#F57C00', 'face': '#FFF8E1', 'color': '#EF6C00',
+     'items': ['💾 Memory Cache', '💿 Disk Cache'], 'note': 'TTL Management'},
+    {'title': 'Memory Store', 'x': 5.5, 'edge': '#7B1FA2', 'face': '#F3E5F5', 'color': '#6A1B9A',
+     'items': ['💬 Conversation History', '📦 Session State'], 'note': 'Context Management'},
+    {'title': 'Configuration', 'x': 10, 'edge': '#388E3C', 'face': '#E8F5E9', 'color': '#2E7D32',
+     'items': ['⚙️ Environment Variables', '📁 Directory Setup'], 'note': 'Settings Management'},
+    {'title': 'Security Layer', 'x': 14.5, 'edge': '#D32F2F', 'face': '#FFEBEE', 'color': '#C62828',
+     'items': ['🔒 Code Sandbox', '✅ Safety Checks'], 'note': 'Module Whitelist'},
+]
+
+support_patches = []
+for service in support_services:
+    support_patches.append(FancyBboxPatch((service['x'], support_y), 4, support_height,
+                                          boxstyle="round,pad=0.1",
+                                          edgecolor=service['edge'], facecolor=service['face'],
+                                          linewidth=2))
+    center_x = service['x'] + 2
+    ax.text(center_x, support_y + 1.4, service['title'], color=service['color'], **title_font)
+    for offset, item in zip((1.0, 0.6), service['items']):
+        ax.text(center_x, support_y + offset, item, **item_font)
+    ax.text(center_x, support_y + 0.2, service['note'], **label_font)
+ax.add_collection(PatchCollection(support_patches, match_original=True))
 
 # ==================== Layer 6: Data Storage ====================
 storage_y = 0.3
@@ -192,17 +149,20 @@ storages = [
     {'name': 'CSV\nFiles', 'x': 13, 'color': '#7B1FA2'},
 ]
 
+storage_patches = []
 for storage in storages:
-    box = FancyBboxPatch((storage['x'], storage_y), storage_width, 1.2,
-                         boxstyle="round,pad=0.08",
-                         edgecolor=storage['color'], facecolor=color_storage,
-                         linewidth=2, linestyle='--')
-    ax.add_patch(box)
+    storage_patches.append(FancyBboxPatch((storage['x'], storage_y), storage_width, 1.2,
+                                          boxstyle="round,pad=0.08",
+                                          edgecolor=storage['color'], facecolor=color_storage,
+                                          linewidth=2, linestyle='--'))
     ax.text(storage['x'] + storage_width/2, storage_y + 0.6, storage['name'],
             ha='center', va='center', fontsize=10, fontweight='bold',
             color=storage['color'])
+ax.add_collection(PatchCollection(storage_patches, match_original=True))
 
 # ==================== Arrows / Data Flow ====================
+# Arrows keep their own patches: FancyArrowPatch resolves its head geometry at
+# draw time, which a PatchCollection would freeze before tight_layout runs.
 
 # UI to Mode Router
 arrow1 = FancyArrowPatch((10, 11), (10, 10.5),
@@ -218,58 +178,26 @@ for mode in modes:
                            color='#F57C00', linestyle='--', alpha=0.6)
     ax.add_patch(arrow)
 
-# Modes to Core Modules (selected examples)
-# Manual to ETL
-arrow_m1 = FancyArrowPatch((2.5, modes_y), (2, modules_y + module_height),
-                          arrowstyle='->', mutation_scale=15, linewidth=1.5,
-                          color='#388E3C', alpha=0.7)
-ax.add_patch(arrow_m1)
-
-# LLM to Ollama
-arrow_m2 = FancyArrowPatch((6, modes_y), (5.5, modules_y + module_height),
-                          arrowstyle='->', mutation_scale=15, linewidth=1.5,
-                          color='#D32F2F', alpha=0.7)
-ax.add_patch(arrow_m2)
-
-# Agent to Orchestrator
-arrow_m3 = FancyArrowPatch((9.5, modes_y), (9.25, modules_y + module_height),
-                          arrowstyle='->', mutation_scale=15, linewidth=1.5,
-                          color='#00897B', alpha=0.7)
-ax.add_patch(arrow_m3)
-
-# PDF to Extractor
-arrow_m4 = FancyArrowPatch((13, modes_y), (13, modules_y + module_height),
-                          arrowstyle='->', mutation_scale=15, linewidth=1.5,
-                          color='#7B1FA2', alpha=0.7)
-ax.add_patch(arrow_m4)
-
-# DB to Handlers
-arrow_m5 = FancyArrowPatch((16.5, modes_y), (16.5, modules_y + module_height),
-                          arrowstyle='->', mutation_scale=15, linewidth=1.5,
-                          color='#1976D2', alpha=0.7)
-ax.add_patch(arrow_m5)
-
-# Core to Support (bidirectional)
-arrow_s1 = FancyArrowPatch((3, modules_y), (3, support_y + support_height),
-                          arrowstyle='<->', mutation_scale=15, linewidth=1.5,
-                          color='#F57C00', linestyle=':', alpha=0.5)
-ax.add_patch(arrow_s1)
-
-arrow_s2 = FancyArrowPatch((7.5, modules_y), (7.5, support_y + support_height),
-                          arrowstyle='<->', mutation_scale=15, linewidth=1.5,
-                          color='#7B1FA2', linestyle=':', alpha=0.5)
-ax.add_patch(arrow_s2)
-
-# Support to Storage
-arrow_st1 = FancyArrowPatch((2.5, support_y), (2.5, storage_y + 1.2),
-                           arrowstyle='->', mutation_scale=15, linewidth=1.5,
-                           color='#1976D2', alpha=0.6)
-ax.add_patch(arrow_st1)
+# (start, end, arrowstyle, color, linestyle, alpha)
+flows = [
+    # Modes to Core Modules (selected examples)
+    ((2.5, modes_y), (2, modules_y + module_height), '->', '#388E3C', '-', 0.7),  # Manual to ETL
+    ((6, modes_y), (5.5, modules_y + module_height), '->', '#D32F2F', '-', 0.7),  # LLM to Ollama
+    ((9.5, modes_y), (9.25, modules_y + module_height), '->', '#00897B', '-', 0.7),  # Agent to Orchestrator
+    ((13, modes_y), (13, modules_y + module_height), '->', '#7B1FA2', '-', 0.7),  # PDF to Extractor
+    ((16.5, modes_y), (16.5, modules_y + module_height), '->', '#1976D2', '-', 0.7),  # DB to Handlers
+    # Core to Support (bidirectional)
+    ((3, modules_y), (3, support_y + support_height), '<->', '#F57C00', ':', 0.5),
+    ((7.5, modules_y), (7.5, support_y + support_height), '<->', '#7B1FA2', ':', 0.5),
+    # Support to Storage
+    ((2.5, support_y), (2.5, storage_y + 1.2), '->', '#1976D2', '-', 0.6),
+    ((16.5, modules_y), (16.5, storage_y + 1.2), '->', '#1976D2', '-', 0.6),
+]
 
-arrow_st2 = FancyArrowPatch((16.5, modules_y), (16.5, storage_y + 1.2),
-                           arrowstyle='->', mutation_scale=15, linewidth=1.5,
-                           color='#1976D2', alpha=0.6)
-ax.add_patch(arrow_st2)
+for start, end, style, color, linestyle, alpha in flows:
+    ax.add_patch(FancyArrowPatch(start, end, arrowstyle=style, mutation_scale=15,
+                                 linewidth=1.5, color=color, linestyle=linestyle,
+                                 alpha=alpha))
 
 # ==================== Legend ====================
 legend_elements = [
@@ -311,7 +239,7 @@ ax.add_patch(features_box)
 ax.text(10, 12.4, features_text, ha='center', va='center',
         fontsize=9, fontweight='bold', color='#424242')
 
-# Save the figure
+# Save the figure (rebuilt by `make docs` when this script changes)
 plt.tight_layout()
 plt.savefig('architecture_diagram.png', dpi=300, bbox_inches='tight',
             facecolor='white', edgecolor='none')
@@ -4,20 +4,21 @@ LLM-Driven Agentic Framework for Autonomous ETL and DataOps
 """
 import streamlit as st
 import pandas as pd
+import hashlib
+import io
 import os
+import re
+import uuid
 from datetime import datetime
 from loguru import logger
 
 # Import core modules
-from src.etl.load_superstore import load_and_clean_superstore, save_clean_data, filter_data
-from src.utils.profiling import generate_profile
+from src.etl.load_superstore import CATEGORY_COLUMNS, DATE_FORMAT, load_and_clean_superstore, save_clean_data, filter_data
+from src.etl.csv_reader import read_csv_fast
 from src.llm.ollama_client import OllamaClient
 from src.llm.prompt_templates import PromptTemplates
 from src.llm.code_executor import SafeCodeExecutor
-from src.agents.orchestrator import AgentOrchestrator
-from src.document.pdf_extractor import PDFExtractor
-from src.document.ner_processor import NERProcessor
-from src.database.duckdb_handler import DuckDBHandler
+from src.llm.batch_dispatcher import BatchDispatcher
 from src.cache.cache_manager import CacheManager
 from src.cache.memory_store import MemoryStore
 
@@ -32,6 +33,197 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+SUPERSTORE_PATH = "input_docs/Sample - Superstore.csv"
+DUCKDB_PATH = "data/database.duckdb"
+DB_PAGE_SIZE = 500
+FETCH_ALL_MAX_ROWS = 200_000  # "Fetch all rows" sends at most this many rows to the browser
+_SELECT_RE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"\blimit\b", re.IGNORECASE)
+
+
+@st.cache_data(show_spinner=False)
+def _load_superstore(path: str, mtime: float) -> pd.DataFrame:
+    """
+    Load the cleaned Superstore data once per file version (`mtime` is only a cache key).
+    """
+    return load_and_clean_superstore(path)
+
+
+@st.cache_data(show_spinner=False)
+def _read_upload(file_name: str, digest: str, _data) -> pd.DataFrame:
+    """
+    Parse an uploaded CSV/Excel file once per upload.
+
+    `_data` is excluded from Streamlit's hashing; the file name and a
+    BLAKE2 digest of its full contents identify the upload instead.
+    """
+    if file_name.endswith('.csv'):
+        return read_csv_fast(_data)
+    return pd.read_excel(io.BytesIO(_data))
+
+
+def _set_current_df(df: pd.DataFrame, superstore: bool = False) -> pd.DataFrame:
+    """
+    Make `df` the working frame, computing its per-frame metadata once.
+
+    Order Date is parsed here; the Superstore frame is also sorted by it
+    (so the Manual Mode tab can slice it directly) and gets its known text
+    columns as categoricals. Uploads keep their row order and dtypes. The
+    metadata lives in `df.attrs`, which pandas carries over to slices;
+    `load_token` tells this load apart from any other.
+    """
+    if "Order Date" in df.columns:
+        if not pd.api.types.is_datetime64_any_dtype(df["Order Date"]):
+            try:
+                df["Order Date"] = pd.to_datetime(df["Order Date"], format=DATE_FORMAT, cache=True)
+            except (ValueError, TypeError):
+                df["Order Date"] = pd.to_datetime(df["Order Date"], cache=True, errors='coerce')
+        if superstore:
+            df = df.sort_values("Order Date", kind='stable').reset_index(drop=True)
+        df.attrs['order_date_sorted'] = df["Order Date"].is_monotonic_increasing
+
+    if superstore:
+        # Known low-cardinality text columns become categoricals (int codes, not strings)
+        for c in CATEGORY_COLUMNS:
+            if c in df.columns:
+                df[c] = df[c].astype('category')
+
+    df.attrs['load_token'] = uuid.uuid4().hex
+    df.attrs['numeric_cols'] = df.select_dtypes(include=['number']).columns.tolist()
+    # Sorted distinct values of the low-cardinality text columns, for filter widgets
+    uniques = {}
+    for c in df.select_dtypes(include=['object', 'string', 'category']).columns:
+        values = df[c].dropna().unique()
+        if len(values) < 100:
+            uniques[c] = sorted(values.tolist(), key=str)
+    df.attrs['uniques'] = uniques
+    st.session_state.memory_store.set_context("current_df", df)
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def _aggs(filter_key: tuple, _df: pd.DataFrame) -> dict:
+    """
+    Summary figures for the filtered frame, once per filter combination.
+
+    `_df` is excluded from Streamlit's hashing; `filter_key` identifies the
+    loaded frame and the filter values that produced `_df`.
+    """
+    return {
+        "rows": len(_df),
+        "columns": len(_df.columns),
+        "numeric_cols": len(_df.attrs.get('numeric_cols', [])),
+        "sales": float(_df['Sales'].sum()) if 'Sales' in _df.columns else None,
+        "profit": float(_df['Profit'].sum()) if 'Profit' in _df.columns else None,
+    }
+
+
+def _db_mtime(db_path: str) -> float:
+    """
+    Modification time of the database file, used to invalidate the cached queries below.
+    """
+    return os.path.getmtime(db_path) if os.path.exists(db_path) else 0.0
+
+
+@st.cache_data(show_spinner=False)
+def _db_tables(db_path: str, mtime: float) -> list:
+    """
+    Table names, once per database file version (`mtime` is only a cache key).
+    """
+    from src.database.duckdb_handler import DuckDBHandler
+
+    with DuckDBHandler(db_path) as db:
+        return db.list_tables()
+
+
+@st.cache_data(show_spinner=False)
+def _db_schema(db_path: str, table: str, mtime: float) -> pd.DataFrame:
+    """
+    Schema of `table`, once per database file version.
+    """
+    from src.database.duckdb_handler import DuckDBHandler
+
+    with DuckDBHandler(db_path) as db:
+        return db.get_table_schema(table)
+
+
+@st.cache_data(show_spinner=False)
+def _db_stats(db_path: str, table: str, mtime: float) -> dict:
+    """
+    Aggregate statistics of `table`, once per database file version.
+    """
+    from src.database.duckdb_handler import DuckDBHandler
+
+    with DuckDBHandler(db_path) as db:
+        return db.aggregate_stats(table)
+
+
+@st.cache_data(show_spinner=False)
+def _run_sql(db_path: str, sql: str, mtime: float) -> pd.DataFrame:
+    """
+    Result of `sql`, once per query text and database file version.
+    """
+    from src.database.duckdb_handler import DuckDBHandler
+
+    with DuckDBHandler(db_path) as db:
+        return db.query(sql)
+
+
+@st.cache_data(show_spinner=False)
+def _stream_sql(db_path: str, sql: str, mtime: float, max_rows: int = FETCH_ALL_MAX_ROWS) -> tuple:
+    """
+    Up to `max_rows` rows of `sql` as an Arrow-backed frame, plus the total row count.
+
+    Batches past the cap are only counted, so memory stays bounded by
+    `max_rows` however large the result is.
+    """
+    import pyarrow as pa
+    from src.database.duckdb_handler import DuckDBHandler
+
+    with DuckDBHandler(db_path) as db:
+        kept, total = [], 0
+        for batch in db.stream_query(sql):
+            if total < max_rows:
+                kept.append(batch.slice(0, max_rows - total))
+            total += batch.num_rows
+        if not kept:
+            return pd.DataFrame(), 0
+        return pa.Table.from_batches(kept).to_pandas(types_mapper=pd.ArrowDtype), total
+
+
+def _needs_paging(sql: str) -> bool:
+    """
+    True for a SELECT (or WITH ... SELECT) that has no LIMIT of its own.
+    """
+    return bool(_SELECT_RE.match(sql)) and not _LIMIT_RE.search(sql)
+
+
+@st.cache_resource(show_spinner=False)
+def _batch_dispatcher(base_url: str) -> BatchDispatcher:
+    """
+    Shared dispatcher that coalesces LLM requests from all sessions into bursts, one per Ollama host.
+    """
+    return BatchDispatcher(base_url=base_url).start()
+
+
+@st.cache_data(ttl=1.0, show_spinner=False)
+def _mem_summary(store_id: int, _ms: MemoryStore) -> dict:
+    """
+    Memory store summary, refreshed at most once a second per session.
+
+    `_ms` is excluded from Streamlit's hashing; `store_id` keeps sessions apart.
+    """
+    return _ms.get_summary()
+
+
+@st.cache_data(ttl=1.0, show_spinner=False)
+def _cache_stats(manager_id: int, _cm: CacheManager) -> dict:
+    """
+    Cache statistics (globs the disk cache), refreshed at most once a second per session.
+    """
+    return _cm.get_stats()
+
+
 # Initialize session state
 if "memory_store" not in st.session_state:
     st.session_state.memory_store = MemoryStore(max_history=50)
@@ -64,6 +256,7 @@ with st.sidebar:
                     if models:
                         st.info(f"📦 Available models: {', '.join(models)}")
                         st.session_state.ollama_client = client
+                        from src.agents.orchestrator import AgentOrchestrator
                         st.session_state.orchestrator = AgentOrchestrator(client)
                     else:
                         st.warning("No models found. Please pull a model first.")
@@ -74,15 +267,23 @@ with st.sidebar:
                 st.error(f"Error: {e}")
                 logger.error(f"Ollama connection error: {e}")
 
+    st.caption(f"Ollama runs `OLLAMA_NUM_PARALLEL` requests at once (here: {os.getenv('OLLAMA_NUM_PARALLEL', 'server default')}); "
+               "set it on the `ollama serve` side for batch questions.")
+
     st.markdown("---")
 
     # System Statistics
     st.subheader("📊 System Stats")
 
-    memory_summary = st.session_state.memory_store.get_summary()
+    if st.button("Refresh now"):
+        _mem_summary.clear()
+        _cache_stats.clear()
+
+    # Throttled: widget interactions rerun the script, these only refresh once a second
+    memory_summary = _mem_summary(id(st.session_state.memory_store), st.session_state.memory_store)
     st.metric("Conversations", memory_summary["conversation_messages"])
 
-    cache_stats = st.session_state.cache_manager.get_stats()
+    cache_stats = _cache_stats(id(st.session_state.cache_manager), st.session_state.cache_manager)
     st.metric("Cache Entries", cache_stats["memory_entries"])
 
     if st.button("Clear All Cache"):
@@ -135,8 +336,8 @@ with tab1:
             if st.button("Load Superstore Data"):
                 with st.spinner("Loading..."):
                     try:
-                        df = load_and_clean_superstore("input_docs/Sample - Superstore.csv")
-                        st.session_state.memory_store.set_context("current_df", df)
+                        df = _load_superstore(SUPERSTORE_PATH, os.path.getmtime(SUPERSTORE_PATH))
+                        df = _set_current_df(df, superstore=True)
                         st.success(f"✅ Loaded {len(df)} rows, {len(df.columns)} columns")
                     except Exception as e:
                         st.error(f"Error loading data: {e}")
@@ -147,12 +348,12 @@ with tab1:
 
             if uploaded_file:
                 try:
-                    if uploaded_file.name.endswith('.csv'):
-                        df = pd.read_csv(uploaded_file)
-                    else:
-                        df = pd.read_excel(uploaded_file)
+                    data = uploaded_file.getbuffer()
+                    # Hashed in place over the buffer, without copying it to bytes
+                    df = _read_upload(uploaded_file.name,
+                                      hashlib.blake2b(data, digest_size=16).hexdigest(), data)
 
-                    st.session_state.memory_store.set_context("current_df", df)
+                    df = _set_current_df(df)
                     st.success(f"✅ Loaded {len(df)} rows, {len(df.columns)} columns")
 
                 except Exception as e:
@@ -165,19 +366,34 @@ with tab1:
             df = st.session_state.memory_store.get_context("current_df")
 
             if st.button("📊 Generate Profile Report"):
-                with st.spinner("Generating profile..."):
-                    try:
-                        output_path = f"data/reports/profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-                        generate_profile(df, output_path)
-                        st.success(f"✅ Report saved to {output_path}")
-                    except Exception as e:
-                        st.error(f"Error generating profile: {e}")
+                try:
+                    from src.utils.profiling import generate_profile  # heavy import, only when profiling
+
+                    # Built in a background process (unchanged data is served from the report
+                    # cache keyed on its content); the outcome is reported below on later runs
+                    output_path = f"data/reports/profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+                    st.session_state["pending_profile"] = generate_profile(df, output_path)
+                except Exception as e:
+                    st.error(f"Error generating profile: {e}")
+
+            pending_profile = st.session_state.get("pending_profile")
+            if pending_profile is not None:
+                if not pending_profile.done():
+                    st.info("📊 Generating profile in the background...")
+                else:
+                    st.session_state.pop("pending_profile")
+                    if pending_profile.exception() is not None:
+                        st.error(f"Error generating profile: {pending_profile.exception()}")
+                    else:
+                        st.success(f"✅ Report saved to {pending_profile.result()}")
 
             if st.button("💾 Save to Database"):
                 with st.spinner("Saving to DuckDB..."):
                     try:
-                        with DuckDBHandler("data/database.duckdb") as db:
-                            db.create_table_from_df(df, "loaded_data")
+                        from src.database.duckdb_handler import DuckDBHandler
+
+                        with DuckDBHandler(DUCKDB_PATH) as db:
+                            db.create_table_from_df(df, "loaded_data", materialize=True)
                             st.success("✅ Saved to database")
                     except Exception as e:
                         st.error(f"Error saving to database: {e}")
@@ -192,22 +408,34 @@ with tab1:
         st.markdown("**Filters:**")
 
         filter_col1, filter_col2, filter_col3 = st.columns(3)
+        start_date = end_date = None
+        selected_region = "All"
 
         with filter_col1:
-            if "Order Date" in df.columns:
-                df['Order Date'] = pd.to_datetime(df['Order Date'])
-                min_date = df['Order Date'].min().date()
-                max_date = df['Order Date'].max().date()
+            if "Order Date" in df.columns and df['Order Date'].notna().any():
+                # Parsed once by _set_current_df at load time (and sorted, for the Superstore frame)
+                is_sorted = df.attrs.get('order_date_sorted', False)
+                dates = df['Order Date'].dropna()
+                min_date = (dates.iloc[0] if is_sorted else dates.min()).date()
+                max_date = (dates.iloc[-1] if is_sorted else dates.max()).date()
 
                 start_date = st.date_input("Start Date", min_date, min_value=min_date, max_value=max_date)
                 end_date = st.date_input("End Date", max_date, min_value=min_date, max_value=max_date)
 
                 if start_date <= end_date:
-                    df = df[(df['Order Date'].dt.date >= start_date) & (df['Order Date'].dt.date <= end_date)]
+                    start_ts = pd.Timestamp(start_date)
+                    end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+                    if is_sorted:
+                        # Binary search the sorted column for the [start, end + 1 day) slice
+                        lo = df['Order Date'].searchsorted(start_ts, side='left')
+                        hi = df['Order Date'].searchsorted(end_ts, side='left')
+                        df = df.iloc[lo:hi]
+                    else:
+                        df = df[df['Order Date'].between(start_ts, end_ts, inclusive="left")]
 
         with filter_col2:
             if "Region" in df.columns:
-                regions = ["All"] + sorted(df["Region"].unique().tolist())
+                regions = ["All"] + df.attrs.get('uniques', {}).get("Region", [])
                 selected_region = st.selectbox("Region", regions)
 
                 if selected_region != "All":
@@ -216,30 +444,34 @@ with tab1:
         with filter_col3:
             st.metric("Filtered Rows", len(df))
 
-        # Display dataframe
-        st.dataframe(df, use_container_width=True, height=400)
+        # Display a bounded preview; the statistics below still use the full filtered frame
+        preview_rows = st.slider("Preview rows", 100, 5000, 500, step=100)
+        st.dataframe(df.head(preview_rows), use_container_width=True, height=400)
 
         # Quick stats
         st.subheader("📈 Quick Statistics")
 
         stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
 
-        numeric_cols = df.select_dtypes(include=['number']).columns
+        # Aggregates are cached per (loaded frame, filter values), so reruns that
+        # don't change the filters skip the column reductions
+        source_df = st.session_state.memory_store.get_context("current_df")
+        aggs = _aggs((source_df.attrs['load_token'], start_date, end_date, selected_region), df)
 
-        if len(numeric_cols) > 0:
+        if aggs["numeric_cols"] > 0:
             with stat_col1:
-                st.metric("Total Rows", len(df))
+                st.metric("Total Rows", aggs["rows"])
 
             with stat_col2:
-                st.metric("Columns", len(df.columns))
+                st.metric("Columns", aggs["columns"])
 
             with stat_col3:
-                if "Sales" in df.columns:
-                    st.metric("Total Sales", f"${df['Sales'].sum():,.2f}")
+                if aggs["sales"] is not None:
+                    st.metric("Total Sales", f"${aggs['sales']:,.2f}")
 
             with stat_col4:
-                if "Profit" in df.columns:
-                    st.metric("Total Profit", f"${df['Profit'].sum():,.2f}")
+                if aggs["profit"] is not None:
+                    st.metric("Total Profit", f"${aggs['profit']:,.2f}")
 
 # ============================================
 # TAB 2: LLM Mode
@@ -324,6 +556,42 @@ with tab2:
                                 st.error(f"Error: {e}")
                                 logger.error(f"LLM query error: {e}")
 
+                # Several questions at once, sent to Ollama concurrently
+                batch_text = st.text_area(
+                    "Ask multiple questions (one per line):",
+                    placeholder="e.g., Total sales by region\nTop 5 customers by profit",
+                    height=100
+                )
+
+                if st.button("📚 Generate Batch Answers"):
+                    questions = [q.strip() for q in batch_text.splitlines() if q.strip()]
+                    if not questions:
+                        st.warning("Please enter at least one question")
+                    elif st.session_state.memory_store.get_context("current_df") is None:
+                        st.warning("Please load a dataset first (Manual Mode tab)")
+                    else:
+                        df = st.session_state.memory_store.get_context("current_df")
+
+                        with st.spinner(f"🤖 Asking {len(questions)} questions..."):
+                            dispatcher = _batch_dispatcher(st.session_state.ollama_client.base_url)
+                            answers = dispatcher.submit_many(
+                                [PromptTemplates.data_analysis_prompt(df, q) for q in questions],
+                                model=selected_model,
+                                temperature=0.4
+                            )
+                            st.session_state.memory_store.set_context(
+                                "llm_batch_stats", dispatcher.get_stats()
+                            )
+
+                        for question, answer in zip(questions, answers):
+                            with st.expander(f"💡 {question}", expanded=True):
+                                if isinstance(answer, Exception):
+                                    st.error(f"Error: {answer}")
+                                else:
+                                    st.markdown(answer)
+                                    st.session_state.memory_store.add_message("user", question)
+                                    st.session_state.memory_store.add_message("assistant", answer)
+
         with col2:
             st.subheader("📜 History")
 
@@ -423,7 +691,7 @@ with tab4:
         # Save uploaded file
         pdf_path = f"input_docs/{uploaded_pdf.name}"
         with open(pdf_path, "wb") as f:
-            f.write(uploaded_pdf.getbuffer())
+            f.write(uploaded_pdf.getbuffer())  # one write straight from the upload, no copy
 
         st.success(f"✅ Uploaded: {uploaded_pdf.name}")
 
@@ -436,6 +704,10 @@ with tab4:
         if st.button("🔍 Extract"):
             with st.spinner(f"Extracting {extraction_type.lower()}..."):
                 try:
+                    # PDF parsers and spaCy are only loaded once an extraction is requested
+                    from src.document.pdf_extractor import PDFExtractor
+                    from src.document.ner_processor import NERProcessor
+
                     extractor = PDFExtractor()
 
                     if extraction_type == "Text":
@@ -508,46 +780,91 @@ with tab5:
     if db_type == "DuckDB":
         st.subheader("🦆 DuckDB Interface")
 
-        with DuckDBHandler("data/database.duckdb") as db:
-            # List tables
-            tables = db.list_tables()
+        # Cached per database file version: reruns for other widgets don't reopen DuckDB
+        db_mtime = _db_mtime(DUCKDB_PATH)
 
-            if tables:
-                st.markdown(f"**Available Tables:** {', '.join(tables)}")
+        # List tables
+        tables = _db_tables(DUCKDB_PATH, db_mtime)
 
-                selected_table = st.selectbox("Select Table", tables)
+        if tables:
+            st.markdown(f"**Available Tables:** {', '.join(tables)}")
 
-                col1, col2 = st.columns(2)
+            selected_table = st.selectbox("Select Table", tables)
 
-                with col1:
-                    if st.button("View Schema"):
-                        schema = db.get_table_schema(selected_table)
-                        st.dataframe(schema)
+            col1, col2 = st.columns(2)
 
-                with col2:
-                    if st.button("View Stats"):
-                        stats = db.aggregate_stats(selected_table)
-                        st.json(stats)
+            with col1:
+                if st.button("View Schema"):
+                    schema = _db_schema(DUCKDB_PATH, selected_table, db_mtime)
+                    st.dataframe(schema)
 
-                # Query interface
-                st.subheader("💻 SQL Query")
+            with col2:
+                if st.button("View Stats"):
+                    stats = _db_stats(DUCKDB_PATH, selected_table, db_mtime)
+                    st.json(stats)
 
-                query = st.text_area(
-                    "Enter SQL query:",
-                    value=f"SELECT * FROM {selected_table} LIMIT 10",
-                    height=100
-                )
+            # Query interface
+            st.subheader("💻 SQL Query")
 
-                if st.button("▶️ Run Query"):
+            query = st.text_area(
+                "Enter SQL query:",
+                value=f"SELECT * FROM {selected_table} LIMIT 10",
+                height=100
+            )
+
+            if st.button("▶️ Run Query"):
+                sql = query.strip().rstrip(";")
+                if _SELECT_RE.match(sql):
+                    st.session_state["db_sql"] = sql
+                else:
+                    # Writes and DDL run once, on this click; they are never kept for reruns to repeat
+                    st.session_state.pop("db_sql", None)
                     try:
-                        result = db.query(query)
+                        from src.database.duckdb_handler import DuckDBHandler
+
+                        with DuckDBHandler(DUCKDB_PATH) as db:
+                            result = db.query(sql)
                         st.dataframe(result, use_container_width=True)
-                        st.info(f"Returned {len(result)} rows")
+                        st.success("✅ Statement executed")
                     except Exception as e:
                         st.error(f"Query error: {e}")
+            fetch_all = st.checkbox("Fetch all rows", value=False,
+                                    help=f"Shows up to {FETCH_ALL_MAX_ROWS:,} rows at once; unbounded SELECTs "
+                                         f"are otherwise shown {DB_PAGE_SIZE} rows per page")
 
-            else:
-                st.info("No tables in database. Load data from Manual Mode tab.")
+            # The last SELECT that was run stays on screen so its pages can be browsed
+            active_sql = st.session_state.get("db_sql")
+            if active_sql:
+                try:
+                    if fetch_all and _SELECT_RE.match(active_sql):
+                        # Streamed: rows up to the cap reach the browser, the rest is only counted
+                        result, total = _stream_sql(DUCKDB_PATH, active_sql, db_mtime)
+                        st.dataframe(result, use_container_width=True)
+                        if total > len(result):
+                            st.warning(f"Returned {total} rows; showing the first {len(result)} "
+                                       f"(the limit for fetching all rows)")
+                        else:
+                            st.info(f"Returned {total} rows")
+                    elif fetch_all or not _needs_paging(active_sql):
+                        result = _run_sql(DUCKDB_PATH, active_sql, db_mtime)
+                        st.dataframe(result, use_container_width=True)
+                        st.info(f"Returned {len(result)} rows")
+                    else:
+                        # Only one page crosses to the browser; the total is counted once per query
+                        total = int(_run_sql(DUCKDB_PATH, f"SELECT COUNT(*) FROM ({active_sql})", db_mtime).iloc[0, 0])
+                        pages = max(1, -(-total // DB_PAGE_SIZE))
+                        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+                        offset = (page - 1) * DB_PAGE_SIZE
+                        result = _run_sql(
+                            DUCKDB_PATH, f"SELECT * FROM ({active_sql}) LIMIT {DB_PAGE_SIZE} OFFSET {offset}", db_mtime
+                        )
+                        st.dataframe(result, use_container_width=True)
+                        st.info(f"Rows {offset + 1 if total else 0}–{offset + len(result)} of {total} (page {page} of {pages})")
+                except Exception as e:
+                    st.error(f"Query error: {e}")
+
+        else:
+            st.info("No tables in database. Load data from Manual Mode tab.")
 
 # Footer
 st.markdown("---")
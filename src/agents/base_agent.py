@@ -1,12 +1,23 @@
 """
 Base Agent - Abstract base class for all agents
 """
+import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 from loguru import logger
 from datetime import datetime
 
 
+def keyword_pattern(keywords: Iterable[str]) -> "re.Pattern":
+    """
+    Compile keywords into one alternation matching any of them as a substring.
+
+    Searching the compiled pattern is a single scan of the text instead of
+    one `in` test per keyword.
+    """
+    return re.compile("|".join(re.escape(k) for k in keywords))
+
+
 class BaseAgent(ABC):
     """Abstract base class for all agents"""
 
@@ -37,6 +48,24 @@ class BaseAgent(ABC):
         """
         pass
 
+    @staticmethod
+    def normalized_task(task: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Lowercased task type and description, for keyword matching
+
+        Uses the `_type_lower`/`_desc_lower` keys the orchestrator attaches
+        when routing, so the strings are lowercased once per task, not once per agent.
+
+        Args:
+            task: Task dictionary
+
+        Returns:
+            (type, description), both lowercased
+        """
+        if "_desc_lower" in task:
+            return task["_type_lower"], task["_desc_lower"]
+        return task.get("type", "").lower(), task.get("description", "").lower()
+
     @abstractmethod
     def execute(self, task: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -1,17 +1,32 @@
 """
 ETL Agent - Specialized in Extract, Transform, Load operations
 """
-from typing import Any, Dict, Optional
+import os
+from typing import Any, Dict, List, Optional
+import duckdb
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from loguru import logger
 
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, keyword_pattern
 from src.etl.load_superstore import load_and_clean_superstore, save_clean_data, filter_data
+from src.etl.csv_reader import detect_encoding, read_csv_fast
+from src.etl.dtypes import downcast_dtypes
+
+# Rows per Parquet row group: large enough for fast scans, small enough to skip by statistics
+PARQUET_ROW_GROUP_SIZE = 122_880
+
+# File formats a save task flagged `intermediate` may be written in
+INTERMEDIATE_FORMATS = ("parquet", "csv")
 
 
 class ETLAgent(BaseAgent):
     """Agent specialized in ETL operations"""
 
+    KEYWORDS = ("load", "extract", "transform", "clean", "filter", "save", "export")
+    _KEYWORD_RE = keyword_pattern(KEYWORDS)
+
     def __init__(self):
         super().__init__(
             name="ETL Agent",
@@ -28,12 +43,9 @@ class ETLAgent(BaseAgent):
         Returns:
             True if task type is 'etl' or contains ETL keywords
         """
-        task_type = task.get("type", "").lower()
-        description = task.get("description", "").lower()
-
-        etl_keywords = ["load", "extract", "transform", "clean", "filter", "save", "export"]
+        task_type, description = self.normalized_task(task)
 
-        return task_type == "etl" or any(keyword in description for keyword in etl_keywords)
+        return task_type == "etl" or self._KEYWORD_RE.search(description) is not None
 
     def execute(self, task: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -79,22 +91,27 @@ class ETLAgent(BaseAgent):
             return result
 
     def _load_data(self, file_path: str, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Load data from file"""
+        """Load data from file (only the task's `columns`, if it lists any)"""
+        columns = task.get("columns")
         try:
             if file_path.endswith('.csv'):
                 # Check if it's superstore
                 if "superstore" in file_path.lower():
                     df = load_and_clean_superstore(file_path)
+                    if columns:
+                        df = df[columns]
                 else:
-                    encoding = task.get("encoding", "utf-8")
+                    # Multi-threaded pyarrow parse for large files, pandas for small ones;
+                    # the encoding is sniffed from a sample instead of found by a failed parse
+                    encoding = task.get("encoding") or detect_encoding(file_path)
                     try:
-                        df = pd.read_csv(file_path, encoding=encoding)
+                        df = read_csv_fast(file_path, encoding=encoding, columns=columns)
                     except UnicodeDecodeError:
-                        df = pd.read_csv(file_path, encoding='latin1')
+                        df = read_csv_fast(file_path, encoding='latin1', columns=columns)
             elif file_path.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(file_path, usecols=columns)
             elif file_path.endswith('.parquet'):
-                df = pd.read_parquet(file_path)
+                df = pd.read_parquet(file_path, columns=columns)
             else:
                 return {
                     "success": False,
@@ -102,14 +119,20 @@ class ETLAgent(BaseAgent):
                     "error": f"Unsupported file format: {file_path}"
                 }
 
+            # Categoricals make every later filter/profile scan move fewer bytes; numeric
+            # columns keep their width, since LLM-generated code does arithmetic on them
+            df = downcast_dtypes(df, numeric=False)
+            nrows, ncols = df.shape
+
             return {
                 "success": True,
                 "data": df,
                 "error": None,
                 "metadata": {
-                    "rows": len(df),
-                    "columns": len(df.columns),
-                    "file": file_path
+                    "rows": nrows,
+                    "columns": ncols,
+                    "file": file_path,
+                    "dtypes_downcast": True
                 }
             }
         except Exception as e:
@@ -132,17 +155,24 @@ class ETLAgent(BaseAgent):
         transformations = task.get("transformations", [])
 
         try:
-            for transform in transformations:
+            # Each step below copies the frame once, so adjacent compatible steps are merged first
+            for transform in self._coalesce_transforms(transformations):
                 transform_type = transform.get("type")
                 if transform_type == "drop_nulls":
                     columns = transform.get("columns")
                     df = df.dropna(subset=columns) if columns else df.dropna()
                 elif transform_type == "fill_nulls":
-                    df = df.fillna(transform.get("value", 0))
+                    value = transform.get("value", 0)
+                    # Categoricals (e.g. from downcast_dtypes) only accept known categories
+                    for col in df.select_dtypes(include=['category']).columns:
+                        fill = value.get(col) if isinstance(value, dict) else value
+                        if fill is not None and df[col].hasnans and fill not in df[col].cat.categories:
+                            df = df.copy(deep=False)
+                            df[col] = df[col].cat.add_categories([fill])
+                    df = df.fillna(value)
                 elif transform_type == "convert_type":
-                    column = transform.get("column")
-                    dtype = transform.get("dtype")
-                    df[column] = df[column].astype(dtype)
+                    # One astype for the whole run; also leaves the caller's frame untouched
+                    df = df.astype(transform["dtypes"])
                 elif transform_type == "rename":
                     df = df.rename(columns=transform.get("mapping", {}))
 
@@ -158,6 +188,51 @@ class ETLAgent(BaseAgent):
                 "error": f"Transformation failed: {e}"
             }
 
+    @staticmethod
+    def _coalesce_transforms(transformations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge runs of adjacent transforms that pandas can apply in one call
+
+        Consecutive drop_nulls become one dropna over the union of their
+        columns (any step without columns drops on all of them); consecutive
+        convert_type steps on distinct columns become one astype mapping.
+        The result is the same as applying the steps one by one. A single
+        column name given as a string counts as a one-column list.
+
+        Args:
+            transformations: Transform dicts from the task
+
+        Returns:
+            Transform list with convert_type steps carrying a `dtypes` mapping
+        """
+        def _column_list(columns) -> Optional[List[Any]]:
+            if isinstance(columns, str):
+                return [columns]
+            return list(columns) if columns else None
+
+        merged: List[Dict[str, Any]] = []
+        for transform in transformations:
+            transform_type = transform.get("type")
+            last = merged[-1] if merged else {}
+
+            if transform_type == "drop_nulls" and last.get("type") == "drop_nulls":
+                columns = _column_list(transform.get("columns"))
+                if last.get("columns") and columns:
+                    last["columns"] = list(dict.fromkeys([*last["columns"], *columns]))
+                else:
+                    last["columns"] = None
+            elif transform_type == "convert_type":
+                column = transform.get("column")
+                if last.get("type") == "convert_type" and column not in last["dtypes"]:
+                    last["dtypes"][column] = transform.get("dtype")
+                else:
+                    merged.append({"type": "convert_type", "dtypes": {column: transform.get("dtype")}})
+            elif transform_type == "drop_nulls":
+                merged.append({"type": "drop_nulls", "columns": _column_list(transform.get("columns"))})
+            else:
+                merged.append(transform)
+        return merged
+
     def _filter_data(self, task: Dict[str, Any], context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Filter data based on conditions"""
         if not context or "df" not in context:
@@ -179,21 +254,10 @@ class ETLAgent(BaseAgent):
             if any([start_date, end_date, region]):
                 df = filter_data(df, start_date, end_date, region)
 
-            # Apply custom filters
+            # Apply custom filters in one DuckDB scan
             custom_filters = filters.get("custom", [])
-            for filt in custom_filters:
-                column = filt.get("column")
-                operator = filt.get("operator", "==")
-                value = filt.get("value")
-
-                if operator == "==":
-                    df = df[df[column] == value]
-                elif operator == ">":
-                    df = df[df[column] > value]
-                elif operator == "<":
-                    df = df[df[column] < value]
-                elif operator == "in":
-                    df = df[df[column].isin(value)]
+            if custom_filters:
+                df = self._apply_custom_filters(df, custom_filters)
 
             return {
                 "success": True,
@@ -208,6 +272,42 @@ class ETLAgent(BaseAgent):
                 "error": f"Filtering failed: {e}"
             }
 
+    @staticmethod
+    def _apply_custom_filters(df: pd.DataFrame, custom_filters: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        AND all custom filters into a single WHERE clause run by DuckDB
+
+        Values are bound as parameters; unknown operators are ignored.
+        The result has a fresh RangeIndex.
+        """
+        predicates = []
+        params = []
+        for filt in custom_filters:
+            column = '"' + str(filt.get("column")).replace('"', '""') + '"'
+            operator = filt.get("operator", "==")
+            value = filt.get("value")
+
+            if operator == "==":
+                predicates.append(f"{column} = ?")
+                params.append(value)
+            elif operator in (">", "<"):
+                predicates.append(f"{column} {operator} ?")
+                params.append(value)
+            elif operator == "in":
+                values = list(value)
+                predicates.append(f"{column} IN ({', '.join('?' * len(values))})" if values else "FALSE")
+                params.extend(values)
+
+        if not predicates:
+            return df
+
+        conn = duckdb.connect()
+        try:
+            conn.register("t", df)
+            return conn.execute(f"SELECT * FROM t WHERE {' AND '.join(predicates)}", params).fetchdf()
+        finally:
+            conn.close()
+
     def _save_data(self, task: Dict[str, Any], context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Save data to file"""
         if not context or "df" not in context:
@@ -220,16 +320,30 @@ class ETLAgent(BaseAgent):
         df = context["df"]
         output_path = task.get("output_path")
 
+        # Intermediate outputs are only read back by later steps, so the format is ours to pick
+        if task.get("intermediate"):
+            intermediate_format = task.get("intermediate_format", "parquet")
+            if intermediate_format not in INTERMEDIATE_FORMATS:
+                return {
+                    "success": False,
+                    "data": None,
+                    "error": f"Unsupported intermediate format: {intermediate_format}"
+                }
+            output_path = f"{os.path.splitext(output_path)[0]}.{intermediate_format}"
+
         try:
             if output_path.endswith('.csv'):
                 df.to_csv(output_path, index=False)
             elif output_path.endswith('.parquet'):
-                df.to_parquet(output_path, index=False)
-            elif output_path.endswith(('.xlsx', '.xls')):
+                pq.write_table(pa.Table.from_pandas(df, preserve_index=False), output_path,
+                               compression="snappy", row_group_size=PARQUET_ROW_GROUP_SIZE)
+            elif output_path.endswith('.xlsx'):
+                self._write_xlsx(df, output_path)
+            elif output_path.endswith('.xls'):
                 df.to_excel(output_path, index=False)
             else:
                 # Save both formats
-                save_clean_data(df, output_path)
+                save_clean_data(df, output_path, write_csv=True)
 
             return {
                 "success": True,
@@ -243,3 +357,20 @@ class ETLAgent(BaseAgent):
                 "data": None,
                 "error": f"Save failed: {e}"
             }
+
+    @staticmethod
+    def _write_xlsx(df: pd.DataFrame, output_path: str):
+        """
+        Stream `df` into an .xlsx workbook row by row
+
+        openpyxl's write-only mode flushes rows as they are appended instead of
+        building every cell object in memory first.
+        """
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append([str(col) for col in df.columns])
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+        workbook.save(output_path)
@@ -1,28 +1,56 @@
 """
 Agent Orchestrator - Routes tasks to appropriate agents
 """
-from typing import Any, Dict, List, Optional
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+from pyarrow import feather
 from loguru import logger
 
-from .base_agent import BaseAgent
-from .etl_agent import ETLAgent
+from .base_agent import BaseAgent, keyword_pattern
+from .etl_agent import INTERMEDIATE_FORMATS, ETLAgent
 from .query_agent import QueryAgent
 from .profiling_agent import ProfilingAgent
 from src.llm.ollama_client import OllamaClient
 from src.llm.prompt_templates import PromptTemplates
 
 
+# Agent tags the routing prompt asks the LLM to put on each step
+_STEP_AGENTS = {"etl", "query", "profile"}
+_ETL_OPERATIONS = {"load", "filter", "transform", "save"}
+
+# Workflow-step keywords, checked in order; the first group that matches decides the task
+_STEP_RULES = [
+    (keyword_pattern(["load", "read", "import"]), {"type": "etl", "operation": "load"}),
+    (keyword_pattern(["filter", "select", "where"]), {"type": "etl", "operation": "filter"}),
+    (keyword_pattern(["save", "export", "write"]), {"type": "etl", "operation": "save"}),
+    (keyword_pattern(["profile", "report", "summary"]), {"type": "profile"}),
+]
+
+
 class AgentOrchestrator:
     """Orchestrates multiple agents to handle complex workflows"""
 
-    def __init__(self, llm_client: Optional[OllamaClient] = None):
+    def __init__(self, llm_client: Optional[OllamaClient] = None, intermediate_format: str = "parquet"):
         """
         Initialize orchestrator with agents
 
         Args:
             llm_client: Optional LLM client for query agent
+            intermediate_format: File format for save tasks flagged `intermediate`
+                (one of INTERMEDIATE_FORMATS)
         """
+        if intermediate_format not in INTERMEDIATE_FORMATS:
+            raise ValueError(f"Unsupported intermediate format: {intermediate_format}")
         self.llm_client = llm_client or OllamaClient()
+        self.intermediate_format = intermediate_format
 
         # Initialize all agents
         self.agents: List[BaseAgent] = [
@@ -32,6 +60,14 @@ class AgentOrchestrator:
         ]
 
         self.context: Dict[str, Any] = {}
+        self._context_lock = threading.Lock()
+
+        # Working frames are spilled here as Arrow files instead of being held in `context`;
+        # the directory goes when the orchestrator is collected, or at exit at the latest
+        self._context_dir = tempfile.mkdtemp(prefix="autopipeline_ctx_")
+        weakref.finalize(self, shutil.rmtree, self._context_dir, ignore_errors=True)
+        # (df_path, frame) of the last spilled frame read back, shared by the tasks that read it
+        self._mapped: Optional[Tuple[str, pd.DataFrame]] = None
         logger.info(f"Initialized AgentOrchestrator with {len(self.agents)} agents")
 
     def route_task(self, task: Dict[str, Any]) -> Optional[BaseAgent]:
@@ -44,8 +80,14 @@ class AgentOrchestrator:
         Returns:
             Agent that can handle the task, or None
         """
+        # Lowercase once here rather than in every agent's can_handle
+        normalized = {
+            **task,
+            "_type_lower": task.get("type", "").lower(),
+            "_desc_lower": task.get("description", "").lower()
+        }
         for agent in self.agents:
-            if agent.can_handle(task):
+            if agent.can_handle(normalized):
                 logger.info(f"Routing task to {agent.name}")
                 return agent
 
@@ -63,53 +105,178 @@ class AgentOrchestrator:
         Returns:
             Execution result
         """
-        agent = self.route_task(task)
+        result = self._run_task(task, context)
+
+        # Update shared context if task produced data
+        if result.get("success") and result.get("data") is not None:
+            self._set_context_df(result["data"])
+
+        return result
+
+    def _run_task(
+        self,
+        task: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        shared: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Route `task` and run it with `context` layered over the shared context
 
+        Agents only read their context; results reach the shared context
+        through `_set_context_df` once the task is done. Concurrent tasks
+        pass the wave's `shared` snapshot instead of reading it again.
+        """
+        agent = self.route_task(task)
         if not agent:
             return {
                 "success": False,
                 "data": None,
                 "error": f"No agent available to handle task type: {task.get('type', 'unknown')}"
             }
+        if task.get("intermediate") and "intermediate_format" not in task:
+            task = {**task, "intermediate_format": self.intermediate_format}
+        if shared is None:
+            shared = self._execution_context()
+        return agent.execute(task, ChainMap(context or {}, shared))
 
-        # Merge context
-        execution_context = {**self.context, **(context or {})}
-
-        result = agent.execute(task, execution_context)
+    def _execution_context(self) -> Dict[str, Any]:
+        """
+        Copy of the shared context with the working frame loaded back as `df`
 
-        # Update shared context if task produced data
-        if result.get("success") and result.get("data") is not None:
-            self.context["df"] = result["data"]
+        Each spilled file is mapped once; later tasks (and `context_df`)
+        reuse that frame, which copy-on-write keeps safe to share.
+        """
+        with self._context_lock:
+            execution_context = dict(self.context)
+            path = execution_context.pop("df_path", None)
+            if path is not None:
+                mapped = self._mapped
+                if mapped is None or mapped[0] != path:
+                    mapped = self._mapped = (path, feather.read_feather(path, memory_map=True))
+                execution_context["df"] = mapped[1]
+        return execution_context
+
+    @property
+    def context_df(self) -> Any:
+        """
+        The current working frame (or other task output), memory-mapped from disk on demand
+        """
+        return self._execution_context().get("df")
 
-        return result
+    def _set_context_df(self, data: Any):
+        """
+        Make `data` the working frame
 
-    def execute_workflow(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        DataFrames are written to a new, uncompressed Arrow file and only the
+        path is kept, so earlier frames can be garbage-collected between steps.
+        Anything Arrow cannot encode (and non-frame outputs) stays in memory.
+        """
+        path = None
+        if isinstance(data, pd.DataFrame):
+            path = os.path.join(self._context_dir, f"ctx_{uuid.uuid4().hex}.arrow")
+            try:
+                feather.write_feather(data, path, compression="uncompressed")
+            except Exception as e:
+                logger.warning(f"Keeping working frame in memory, Arrow write failed: {e}")
+                path = None
+
+        with self._context_lock:
+            old_path = self.context.pop("df_path", None)
+            self.context.pop("df", None)
+            self._mapped = None
+            if path is not None:
+                self.context["df_path"] = path
+            else:
+                self.context["df"] = data
+
+        if old_path is not None:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass  # still memory-mapped elsewhere on some platforms; removed with the directory
+
+    def execute_workflow(self, tasks: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
         """
         Execute a sequence of tasks
 
+        A task may list the indices of earlier tasks it needs in `depends_on`;
+        tasks whose dependencies are all done run together on a thread pool.
+        Tasks without `depends_on` depend on the task before them, so plain
+        task lists still run strictly in order.
+
         Args:
             tasks: List of tasks to execute in order
+            max_workers: Maximum tasks run at once within a wave
 
         Returns:
-            List of execution results
+            List of execution results, one per task at its position in `tasks`;
+            after a critical failure, tasks that never ran are left off the end
+            (or marked as skipped if a later task already ran)
         """
-        results = []
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
         logger.info(f"Starting workflow with {len(tasks)} tasks")
 
-        for i, task in enumerate(tasks, 1):
-            logger.info(f"Executing task {i}/{len(tasks)}: {task.get('type', 'unknown')}")
+        waves = self._plan_waves(tasks)
+        for wave in waves:
+            logger.info(f"Executing task(s) {', '.join(str(i + 1) for i in wave)}/{len(tasks)}")
+
+            if len(wave) == 1:
+                wave_results = [self.execute_task(tasks[wave[0]])]
+            else:
+                # Every task in the wave sees the context as it was when the wave started
+                snapshot = self._execution_context()
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(wave))) as pool:
+                    wave_results = list(pool.map(lambda i: self._run_task(tasks[i], shared=snapshot), wave))
 
-            result = self.execute_task(task)
-            results.append(result)
+                # Threads finish in any order; the last task (by position) that produced data wins
+                produced = [r["data"] for r in wave_results if r.get("success") and r.get("data") is not None]
+                if produced:
+                    self._set_context_df(produced[-1])
+
+            for i, result in zip(wave, wave_results):
+                results[i] = result
 
             # Stop workflow if task failed and it's marked as critical
-            if not result["success"] and task.get("critical", False):
-                logger.error(f"Critical task failed, stopping workflow: {result.get('error')}")
+            failed = [r for i, r in zip(wave, wave_results) if not r["success"] and tasks[i].get("critical", False)]
+            if failed:
+                logger.error(f"Critical task failed, stopping workflow: {failed[0].get('error')}")
                 break
 
-        logger.success(f"Workflow completed: {len(results)} tasks executed")
+        executed = sum(result is not None for result in results)
+        while results and results[-1] is None:
+            results.pop()
+        results = [
+            result if result is not None
+            else {"success": False, "data": None, "error": "Skipped: a critical task failed"}
+            for result in results
+        ]
+        logger.success(f"Workflow completed: {executed} tasks executed")
         return results
 
+    @staticmethod
+    def _plan_waves(tasks: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Group task indices into waves that can run concurrently
+
+        Args:
+            tasks: Workflow tasks, optionally with `depends_on` index lists
+
+        Returns:
+            Waves of task indices, in execution order
+        """
+        levels: List[int] = []
+        for i, task in enumerate(tasks):
+            if "depends_on" in task:
+                deps = [d for d in task["depends_on"] if 0 <= d < i]
+                levels.append(max((levels[d] for d in deps), default=-1) + 1)
+            else:
+                levels.append(levels[-1] + 1 if levels else 0)
+
+        waves: List[List[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+        for i, level in enumerate(levels):
+            waves[level].append(i)
+        return waves
+
     def parse_natural_language_workflow(self, user_request: str, model: str = "llama3") -> List[Dict[str, Any]]:
         """
         Parse natural language request into a workflow of tasks
@@ -128,12 +295,16 @@ class AgentOrchestrator:
         try:
             response = self.llm_client.generate_structured_output(prompt, model=model)
 
-            # Convert LLM response to task list
+            # Each step arrives tagged with its agent; only untagged or
+            # malformed steps fall back to the keyword heuristic
             tasks = []
             task_steps = response.get("task_breakdown", [])
 
             for step in task_steps:
-                task = self._infer_task_from_step(step)
+                task = self._task_from_tagged_step(step)
+                if task is None:
+                    text = step.get("step") if isinstance(step, dict) else step
+                    task = self._infer_task_from_step(str(text)) if text else None
                 if task:
                     tasks.append(task)
 
@@ -149,6 +320,31 @@ class AgentOrchestrator:
                 "query": user_request
             }]
 
+    @staticmethod
+    def _task_from_tagged_step(step: Any) -> Optional[Dict[str, Any]]:
+        """
+        Build a task from a step the LLM already tagged with an agent
+
+        Args:
+            step: Step from the routing response's task_breakdown
+
+        Returns:
+            Task dictionary, or None if the step is not a usable tagged step
+        """
+        if not isinstance(step, dict):
+            return None
+
+        agent = str(step.get("agent", "")).lower()
+        description = str(step.get("step", ""))
+        if agent not in _STEP_AGENTS or not description:
+            return None
+
+        task = {"type": agent, "description": description}
+        operation = step.get("operation")
+        if agent == "etl" and operation in _ETL_OPERATIONS:
+            task["operation"] = operation
+        return task
+
     def _infer_task_from_step(self, step: str) -> Optional[Dict[str, Any]]:
         """
         Infer task type from step description
@@ -161,18 +357,12 @@ class AgentOrchestrator:
         """
         step_lower = step.lower()
 
-        if any(keyword in step_lower for keyword in ["load", "read", "import"]):
-            return {"type": "etl", "operation": "load", "description": step}
-        elif any(keyword in step_lower for keyword in ["filter", "select", "where"]):
-            return {"type": "etl", "operation": "filter", "description": step}
-        elif any(keyword in step_lower for keyword in ["save", "export", "write"]):
-            return {"type": "etl", "operation": "save", "description": step}
-        elif any(keyword in step_lower for keyword in ["profile", "report", "summary"]):
-            return {"type": "profile", "description": step}
-        elif any(keyword in step_lower for keyword in ["query", "find", "show", "get", "calculate"]):
-            return {"type": "query", "description": step}
-        else:
-            return {"type": "query", "description": step}
+        for pattern, task in _STEP_RULES:
+            if pattern.search(step_lower):
+                return {**task, "description": step}
+
+        # Query keywords ("query", "find", "show", ...) and anything unrecognised
+        return {"type": "query", "description": step}
 
     def get_agent_stats(self) -> List[Dict[str, Any]]:
         """
@@ -185,5 +375,13 @@ class AgentOrchestrator:
 
     def clear_context(self):
         """Clear shared context"""
-        self.context.clear()
+        with self._context_lock:
+            path = self.context.pop("df_path", None)
+            self.context.clear()
+            self._mapped = None
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
         logger.info("Context cleared")
@@ -1,22 +1,50 @@
 """
 Profiling Agent - Specialized in data profiling and quality assessment
 """
-from typing import Any, Dict, Optional
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+import duckdb
 import pandas as pd
+import pyarrow as pa
 from loguru import logger
 
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, keyword_pattern
 from src.utils.profiling import generate_profile
 
+# Categorical columns with more distinct values than this skip the combined value_counts
+MAX_LONG_FORM_UNIQUES = 10_000
+
+# pandas describe() rows, in order, and the DuckDB aggregate computing each
+_DESCRIBE_AGGREGATES = [
+    ("count", "COUNT({c})"),
+    ("mean", "AVG({c})"),
+    ("std", "STDDEV_SAMP({c})"),
+    ("min", "MIN({c})"),
+    ("25%", "QUANTILE_CONT({c}, 0.25)"),
+    ("50%", "QUANTILE_CONT({c}, 0.5)"),
+    ("75%", "QUANTILE_CONT({c}, 0.75)"),
+    ("max", "MAX({c})"),
+]
+
+
+def _quote(column: Any) -> str:
+    """Quote a column name as a DuckDB identifier"""
+    return '"' + str(column).replace('"', '""') + '"'
+
 
 class ProfilingAgent(BaseAgent):
     """Agent specialized in data profiling and quality checks"""
 
+    KEYWORDS = ("profile", "quality", "summary", "statistics", "report", "describe")
+    _KEYWORD_RE = keyword_pattern(KEYWORDS)
+
     def __init__(self):
         super().__init__(
             name="Profiling Agent",
             description="Generates data profiles and quality reports"
         )
+        # (frame key, stats) of the last frame summarised by _generate_quick_stats
+        self._quick_stats_cache: Optional[Tuple[tuple, Dict[str, Any]]] = None
 
     def can_handle(self, task: Dict[str, Any]) -> bool:
         """
@@ -28,12 +56,9 @@ class ProfilingAgent(BaseAgent):
         Returns:
             True if task type is 'profile' or contains profiling keywords
         """
-        task_type = task.get("type", "").lower()
-        description = task.get("description", "").lower()
+        task_type, description = self.normalized_task(task)
 
-        profiling_keywords = ["profile", "quality", "summary", "statistics", "report", "describe"]
-
-        return task_type == "profile" or any(keyword in description for keyword in profiling_keywords)
+        return task_type == "profile" or self._KEYWORD_RE.search(description) is not None
 
     def execute(self, task: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -44,7 +69,9 @@ class ProfilingAgent(BaseAgent):
             context: Context with 'df' DataFrame
 
         Returns:
-            Result dictionary with profile information
+            Result dictionary with profile information. The HTML report is
+            built in the background: `report` is a Future resolving to
+            `metadata["report_path"]` once it is written.
         """
         try:
             if not context or "df" not in context:
@@ -55,11 +82,15 @@ class ProfilingAgent(BaseAgent):
                 }
 
             df = context["df"]
+            nrows, ncols = df.shape
             output_path = task.get("output_path", "data/reports/profile.html")
 
-            # Generate comprehensive profile
-            logger.info(f"Generating profile report for DataFrame with {len(df)} rows")
-            generate_profile(df, output_path)
+            # Generate comprehensive profile in the background (reused from disk if this
+            # content was profiled before) while the quick stats are computed here
+            report = generate_profile(df, output_path)
+            report.add_done_callback(
+                lambda f: f.exception() and logger.error(f"Profile report failed: {f.exception()}")
+            )
 
             # Also generate quick stats
             stats = self._generate_quick_stats(df)
@@ -68,10 +99,11 @@ class ProfilingAgent(BaseAgent):
                 "success": True,
                 "data": stats,
                 "error": None,
+                "report": report,
                 "metadata": {
                     "report_path": output_path,
-                    "rows": len(df),
-                    "columns": len(df.columns)
+                    "rows": nrows,
+                    "columns": ncols
                 }
             }
 
@@ -98,29 +130,147 @@ class ProfilingAgent(BaseAgent):
         Returns:
             Dictionary with quick stats
         """
+        # Columns, dtypes and a digest of the full content: one hashing pass is far cheaper than
+        # the stats, and unlike id() it cannot match a different frame at a recycled address
+        shape = nrows, ncols = df.shape
+        cols = df.columns
+        content = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+        key = (shape, tuple(map(str, cols)), tuple(map(str, df.dtypes)), content)
+        if self._quick_stats_cache is not None and self._quick_stats_cache[0] == key:
+            return dict(self._quick_stats_cache[1])
+
+        # Count nulls only in columns that have any; clean frames skip the counting entirely
+        any_null = df.isna().any()
+        null_cols = any_null[any_null].index
+        if len(null_cols) == 0:
+            missing_values = {col: 0 for col in cols}
+            missing_percentage = {col: 0.0 for col in cols}
+        else:
+            nulls = df[null_cols].isna().sum().reindex(cols, fill_value=0)
+            missing_values = nulls.to_dict()
+            missing_percentage = (nulls / nrows * 100).to_dict()
+
         stats = {
-            "shape": {"rows": len(df), "columns": len(df.columns)},
-            "columns": list(df.columns),
+            "shape": {"rows": nrows, "columns": ncols},
+            "columns": list(cols),
             "dtypes": df.dtypes.astype(str).to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
-            "missing_percentage": (df.isnull().sum() / len(df) * 100).to_dict(),
+            "missing_values": missing_values,
+            "missing_percentage": missing_percentage,
             "memory_usage_mb": df.memory_usage(deep=True).sum() / 1024**2
         }
 
-        # Numeric columns statistics
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        if len(numeric_cols) > 0:
-            stats["numeric_summary"] = df[numeric_cols].describe().to_dict()
-
-        # Categorical columns info
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
-        if len(categorical_cols) > 0:
-            stats["categorical_info"] = {
-                col: {
-                    "unique_count": df[col].nunique(),
-                    "top_values": df[col].value_counts().head(5).to_dict()
-                }
+        numeric_cols = list(df.select_dtypes(include=['number']).columns)
+        categorical_cols = list(df.select_dtypes(include=['object', 'category']).columns)
+        if numeric_cols or categorical_cols:
+            try:
+                numeric_summary, categorical_info = self._duckdb_column_summaries(df, numeric_cols, categorical_cols)
+            except Exception as e:
+                # e.g. object columns holding mixed Python types DuckDB cannot scan
+                logger.warning(f"DuckDB summary failed, using pandas: {e}")
+                numeric_summary, categorical_info = self._pandas_column_summaries(df, numeric_cols, categorical_cols)
+
+            # Numeric columns statistics
+            if numeric_cols:
+                stats["numeric_summary"] = numeric_summary
+            # Categorical columns info
+            if categorical_cols:
+                stats["categorical_info"] = categorical_info
+
+        self._quick_stats_cache = (key, stats)
+        return dict(stats)
+
+    @staticmethod
+    def _duckdb_column_summaries(
+        df: pd.DataFrame, numeric_cols: List[Any], categorical_cols: List[Any]
+    ) -> Tuple[Dict[Any, Dict[str, float]], Dict[Any, Dict[str, Any]]]:
+        """
+        describe()-style numeric stats and categorical top values, aggregated by DuckDB
+
+        One multi-threaded query computes every numeric aggregate and distinct
+        count; a second computes all top-5 lists as a single UNION ALL.
+        Top values are returned as strings.
+
+        Args:
+            df: DataFrame to analyze
+            numeric_cols: Columns to describe
+            categorical_cols: Columns to count values of
+
+        Returns:
+            (numeric_summary, categorical_info)
+        """
+        aggregates = [agg.format(c=_quote(col)) for col in numeric_cols for _, agg in _DESCRIBE_AGGREGATES]
+        aggregates += [f"COUNT(DISTINCT {_quote(col)})" for col in categorical_cols]
+
+        # Registered as one Arrow table: DuckDB scans it zero-copy, where a pandas
+        # frame would be re-converted on every scan of the UNION ALL below
+        table = pa.Table.from_pandas(df[numeric_cols + categorical_cols], preserve_index=False)
+
+        conn = duckdb.connect()
+        try:
+            conn.register("t", table)
+            row = iter(conn.execute(f"SELECT {', '.join(aggregates)} FROM t").fetchone())
+
+            numeric_summary = {
+                col: {name: float("nan") if value is None else float(value)
+                      for (name, _), value in zip(_DESCRIBE_AGGREGATES, row)}
+                for col in numeric_cols
+            }
+            categorical_info = {col: {"unique_count": int(next(row)), "top_values": {}} for col in categorical_cols}
+
+            if categorical_cols:
+                top_queries = [
+                    f"""SELECT * FROM (
+                            SELECT {i} AS col, CAST({_quote(col)} AS VARCHAR) AS val, COUNT(*) AS n
+                            FROM t WHERE {_quote(col)} IS NOT NULL
+                            GROUP BY 2 ORDER BY n DESC, val LIMIT 5
+                        )"""
+                    for i, col in enumerate(categorical_cols)
+                ]
+                for i, val, n in conn.execute(" UNION ALL ".join(top_queries) + " ORDER BY col, n DESC, val").fetchall():
+                    categorical_info[categorical_cols[i]]["top_values"][val] = int(n)
+        finally:
+            conn.close()
+
+        return numeric_summary, categorical_info
+
+    @staticmethod
+    def _pandas_column_summaries(
+        df: pd.DataFrame, numeric_cols: List[Any], categorical_cols: List[Any]
+    ) -> Tuple[Dict[Any, Dict[str, float]], Dict[Any, Dict[str, Any]]]:
+        """
+        pandas fallback for `_duckdb_column_summaries`
+
+        Args:
+            df: DataFrame to analyze
+            numeric_cols: Columns to describe
+            categorical_cols: Columns to count values of
+
+        Returns:
+            (numeric_summary, categorical_info)
+        """
+        numeric_summary = df[numeric_cols].describe().to_dict() if numeric_cols else {}
+
+        # One nunique pass, then one value_counts over the long form of the
+        # low-cardinality columns instead of one per column
+        categorical_info = {}
+        if categorical_cols:
+            nuniq = df[categorical_cols].nunique()
+            low_card = [c for c in categorical_cols if nuniq[c] <= MAX_LONG_FORM_UNIQUES]
+
+            top_values = {c: {} for c in categorical_cols}
+            if low_card:
+                long = df[low_card].astype(object).melt(var_name="col", value_name="val")
+                top = long.value_counts(["col", "val"]).groupby(level=0, sort=False).head(5)
+                for (col, val), count in top.items():
+                    top_values[col][val] = int(count)
+            # High-cardinality columns would blow up the long form; count them on their own
+            for col in categorical_cols:
+                if col not in low_card:
+                    top_values[col] = df[col].value_counts().head(5).to_dict()
+
+            categorical_info = {
+                col: {"unique_count": int(nuniq[col]), "top_values": top_values[col]}
                 for col in categorical_cols
             }
 
-        return stats
+        return numeric_summary, categorical_info
@@ -5,7 +5,7 @@ from typing import Any, Dict, Optional
 import pandas as pd
 from loguru import logger
 
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, keyword_pattern
 from src.llm.ollama_client import OllamaClient
 from src.llm.prompt_templates import PromptTemplates
 from src.llm.code_executor import SafeCodeExecutor
@@ -14,6 +14,9 @@ from src.llm.code_executor import SafeCodeExecutor
 class QueryAgent(BaseAgent):
     """Agent specialized in answering natural language queries about data"""
 
+    KEYWORDS = ("query", "question", "analyze", "what", "how", "show", "find", "get")
+    _KEYWORD_RE = keyword_pattern(KEYWORDS)
+
     def __init__(self, llm_client: Optional[OllamaClient] = None):
         super().__init__(
             name="Query Agent",
@@ -32,12 +35,9 @@ class QueryAgent(BaseAgent):
         Returns:
             True if task type is 'query' or contains query keywords
         """
-        task_type = task.get("type", "").lower()
-        description = task.get("description", "").lower()
-
-        query_keywords = ["query", "question", "analyze", "what", "how", "show", "find", "get"]
+        task_type, description = self.normalized_task(task)
 
-        return task_type == "query" or any(keyword in description for keyword in query_keywords)
+        return task_type == "query" or self._KEYWORD_RE.search(description) is not None
 
     def execute(self, task: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
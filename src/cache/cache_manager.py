@@ -2,32 +2,167 @@
 Cache Manager - Unified interface for caching with multiple backends
 """
 import hashlib
+import heapq
+import math
+import mmap
+import os
 import pickle
-from typing import Any, Optional, Callable
-from functools import wraps
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+from functools import lru_cache, wraps
 from loguru import logger
 from pathlib import Path
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
+
+try:
+    import xxhash
+
+    def _hash_key(key_str: str) -> str:
+        return xxhash.xxh3_64_hexdigest(key_str)
+
+    def _hash_bytes(data) -> str:
+        return xxhash.xxh3_64_hexdigest(data)
+except ImportError:
+    # Keys are not security-sensitive; BLAKE2 is the fastest hash in the stdlib
+    def _hash_key(key_str: str) -> str:
+        return hashlib.blake2b(key_str.encode(), digest_size=8).hexdigest()
+
+    def _hash_bytes(data) -> str:
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    _json_loads = json.loads
+
+# Suffixes of files the disk backend writes; entries are the .pkl/.json files,
+# .tmp files are writes interrupted before they were moved into place
+_DISK_SUFFIXES = (".pkl", ".json", ".tmp")
+_ENTRY_SUFFIXES = (".pkl", ".json")
+
+# Per-function size of the lru_cache fast path in cached()
+FAST_PATH_ENTRIES = 1024
+
+# clear() unlinks files on this many threads once there are more than CLEAR_PARALLEL_MIN of them
+CLEAR_WORKERS = 4
+CLEAR_PARALLEL_MIN = 64
+
+# Disk entries kept decoded in memory after a hit, least recently used evicted first
+HOT_DISK_ENTRIES = 32
+
+# Disk cache files are read and written through a 1 MB buffer instead of the default 8 KB
+DISK_IO_BUFFER = 1 << 20
+
+# Out-of-band pickle buffers start at a multiple of this offset in the .pkl file
+BUFFER_ALIGNMENT = 64
+
+
+# Value types stored on disk as JSON instead of pickle
+_JSON_SCALARS = (str, bool, type(None))
+
+# orjson only encodes integers in this range; bigger ones are pickled
+_JSON_INT_MIN, _JSON_INT_MAX = -(1 << 63), (1 << 64) - 1
+
+
+def _is_json_safe(value: Any) -> bool:
+    """
+    True if `value` survives a JSON round trip unchanged
+
+    Only dicts with string keys, lists and plain scalars qualify; tuples,
+    numpy scalars and non-finite floats would come back as something else.
+    """
+    value_type = type(value)
+    if value_type in _JSON_SCALARS:
+        return True
+    if value_type is int:
+        return _JSON_INT_MIN <= value <= _JSON_INT_MAX
+    if value_type is float:
+        return math.isfinite(value)
+    if value_type is list:
+        return all(_is_json_safe(item) for item in value)
+    if value_type is dict:
+        return all(type(k) is str and _is_json_safe(v) for k, v in value.items())
+    return False
+
+
+def _arg_fingerprint(value: Any) -> Any:
+    """
+    Stand-in for a `cached()` argument in its cache key
+
+    DataFrames, Series and arrays are reduced to their shape plus a content
+    hash; their repr is both slow to build and truncated, so two different
+    frames could otherwise share a key. Everything else is used as is.
+    """
+    # Only look for pandas/numpy types if something already imported them
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        columns = tuple(map(str, value.columns)) if isinstance(value, pd.DataFrame) else value.name
+        return (type(value).__name__, value.shape, columns,
+                int(pd.util.hash_pandas_object(value, index=True).sum()))
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray) and value.dtype != object:
+        return ("ndarray", value.dtype.str, value.shape, _hash_bytes(np.ascontiguousarray(value)))
+    return value
+
+
+@contextmanager
+def _atomic_open(path: Path):
+    """
+    Open a temporary sibling of `path` for binary writing, moved into place on success
+
+    Readers and concurrent writers only ever see a complete file; if writing
+    fails the temporary file is removed and `path` is left untouched.
+    """
+    tmp = tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False, buffering=DISK_IO_BUFFER
+    )
+    try:
+        with tmp:
+            yield tmp
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
 
 
 class CacheManager:
     """Manage caching with disk and memory backends"""
 
-    def __init__(self, cache_dir: str = "data/cache", ttl_seconds: int = 3600):
+    def __init__(self, cache_dir: str = "data/cache", ttl_seconds: int = 3600, max_memory_entries: int = 1024):
         """
         Initialize cache manager
 
         Args:
             cache_dir: Directory for disk cache
             ttl_seconds: Time-to-live for cache entries in seconds
+            max_memory_entries: Memory cache size; least recently used entries are evicted beyond it
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
         self.ttl_seconds = ttl_seconds
-        self.memory_cache = {}
+        self.max_memory_entries = max_memory_entries
+        # cache key -> (monotonic expiry, value), least recently used first
+        self.memory_cache: "OrderedDict[str, tuple]" = OrderedDict()
         self.cache_metadata = {}
+        # cache key -> value for recently read disk entries, so warm reads skip decoding
+        self._hot_set: "OrderedDict[str, Any]" = OrderedDict()
+        # lru_cache fast paths created by cached(), emptied along with the memory backend
+        self._fast_paths: List[Callable] = []
+        # (monotonic expiry, backend, cache key) for every set(); stale rows are skipped when popped
+        self._exp_heap: List[Tuple[float, str, str]] = []
 
         logger.info(f"Initialized CacheManager with dir: {cache_dir}, TTL: {ttl_seconds}s")
 
@@ -43,10 +178,58 @@ class CacheManager:
         """
         if isinstance(key_data, str):
             key_str = key_data
+        elif isinstance(key_data, tuple):
+            key_str = repr(key_data)  # already ordered; no JSON encoding needed
         else:
             key_str = json.dumps(key_data, sort_keys=True, default=str)
 
-        return hashlib.md5(key_str.encode()).hexdigest()
+        return _hash_key(key_str)
+
+    @staticmethod
+    def _dump_pickle(value: Any, cache_file: Path):
+        """
+        Pickle `value` to `cache_file` with the newest protocol
+
+        Large contiguous buffers (numpy arrays, and so DataFrame columns) are
+        written out-of-band after the pickle stream, at an aligned offset, so
+        they are neither copied into the stream nor copied again when loaded.
+        Everything lives in the one file, replaced atomically: values loaded
+        earlier may still be memory-mapped onto the old one.
+        """
+        buffers = []
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL, buffer_callback=buffers.append)
+        raw = [buf.raw() for buf in buffers]
+
+        with _atomic_open(cache_file) as f:
+            pickle.dump((len(payload), [view.nbytes for view in raw]), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(payload)
+            if raw:
+                f.write(b"\0" * (-f.tell() % BUFFER_ALIGNMENT))
+                for view in raw:
+                    f.write(view)
+
+    @staticmethod
+    def _load_pickle(cache_file: Path) -> Any:
+        """Load a value written by `_dump_pickle`, restoring out-of-band buffers without copying"""
+        buffers = []
+        with open(cache_file, "rb", buffering=DISK_IO_BUFFER) as f:
+            payload_length, lengths = pickle.load(f)
+            payload = f.read(payload_length)
+            if lengths:
+                offset = f.tell()
+                offset += -offset % BUFFER_ALIGNMENT
+                # Map the file copy-on-write: restored arrays are views onto the page
+                # cache, pages are only read when touched, and writes stay private
+                if sum(lengths):
+                    view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+                else:
+                    view = memoryview(bytearray())
+                    offset = 0
+                for length in lengths:
+                    buffers.append(view[offset:offset + length])
+                    offset += length
+
+        return pickle.loads(payload, buffers=buffers)
 
     def get(self, key: str, backend: str = "memory") -> Optional[Any]:
         """
@@ -54,43 +237,73 @@ class CacheManager:
 
         Args:
             key: Cache key
-            backend: 'memory' or 'disk'
+            backend: 'memory', 'disk', or 'auto' (memory first, then disk)
 
         Returns:
             Cached value or None if not found/expired
         """
         cache_key = self._generate_key(key)
-
+        self._reap_expired()
+
+        value = None
+        if backend in ("memory", "auto"):
+            value = self._get_memory(cache_key, key)
+        if value is None and backend in ("disk", "auto"):
+            value = self._get_disk(cache_key, key)
+
+        if value is None:
+            logger.debug("Cache MISS: {!s:.50}", key)
+        return value
+
+    def _get_memory(self, cache_key: str, key: str) -> Optional[Any]:
+        """Look up a memory-backend entry"""
+        entry = self.memory_cache.get(cache_key)
+        if entry is None:
+            return None
+        if time.monotonic() > entry[0]:
+            logger.debug("Cache expired for key: {!s:.50}", key)
+            del self.memory_cache[cache_key]
+            return None
+        self.memory_cache.move_to_end(cache_key)
+        logger.debug("Cache HIT (memory): {!s:.50}", key)
+        return entry[1]
+
+    def _get_disk(self, cache_key: str, key: str) -> Optional[Any]:
+        """Look up a disk-backend entry, from the hot set if it was read recently"""
         # Check if expired
-        if cache_key in self.cache_metadata:
-            metadata = self.cache_metadata[cache_key]
-            expires_at = metadata.get("expires_at")
-
-            if expires_at and datetime.now() > expires_at:
-                logger.debug(f"Cache expired for key: {key[:50]}")
-                self.delete(key, backend)
+        metadata = self.cache_metadata.get(cache_key, {})
+        expires_at = metadata.get("expires_at")
+        if expires_at and time.monotonic() > expires_at:
+            logger.debug("Cache expired for key: {!s:.50}", key)
+            self._delete_disk(cache_key)
+            return None
+
+        if cache_key in self._hot_set:
+            self._hot_set.move_to_end(cache_key)
+            logger.debug("Cache HIT (disk, hot): {!s:.50}", key)
+            return self._hot_set[cache_key]
+
+        # The format tag is lost on restart, so fall back to whichever file exists
+        fmt = metadata.get("fmt")
+        json_file = self.cache_dir / f"{cache_key}.json"
+        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        try:
+            if fmt != "pickle" and json_file.exists():
+                value = _json_loads(json_file.read_bytes())
+            elif fmt != "json" and cache_file.exists():
+                value = self._load_pickle(cache_file)
+            else:
                 return None
+        except Exception as e:
+            logger.warning(f"Failed to load cache: {e}")
+            return None
 
-        if backend == "memory":
-            value = self.memory_cache.get(cache_key)
-            if value is not None:
-                logger.debug(f"Cache HIT (memory): {key[:50]}")
-            return value
-
-        elif backend == "disk":
-            cache_file = self.cache_dir / f"{cache_key}.pkl"
-            if cache_file.exists():
-                try:
-                    with open(cache_file, "rb") as f:
-                        value = pickle.load(f)
-                    logger.debug(f"Cache HIT (disk): {key[:50]}")
-                    return value
-                except Exception as e:
-                    logger.warning(f"Failed to load cache: {e}")
-                    return None
-
-        logger.debug(f"Cache MISS: {key[:50]}")
-        return None
+        if value is not None:
+            self._hot_set[cache_key] = value
+            if len(self._hot_set) > HOT_DISK_ENTRIES:
+                self._hot_set.popitem(last=False)
+            logger.debug("Cache HIT (disk): {!s:.50}", key)
+        return value
 
     def set(self, key: str, value: Any, backend: str = "memory", ttl_seconds: Optional[int] = None) -> bool:
         """
@@ -107,38 +320,97 @@ class CacheManager:
         """
         cache_key = self._generate_key(key)
         ttl = ttl_seconds or self.ttl_seconds
-
-        # Set expiration metadata
-        self.cache_metadata[cache_key] = {
-            "created_at": datetime.now(),
-            "expires_at": datetime.now() + timedelta(seconds=ttl),
-            "original_key": key[:100]  # Store truncated key for debugging
-        }
+        self._reap_expired()
+        expires_at = time.monotonic() + ttl
 
         try:
             if backend == "memory":
-                self.memory_cache[cache_key] = value
-                logger.debug(f"Cached to memory: {key[:50]}")
+                # Expiry travels with the entry; no metadata record for the memory backend
+                self.memory_cache[cache_key] = (expires_at, value)
+                self.memory_cache.move_to_end(cache_key)
+                if len(self.memory_cache) > self.max_memory_entries:
+                    self._evict_memory()
+                logger.debug("Cached to memory: {!s:.50}", key)
 
             elif backend == "disk":
-                cache_file = self.cache_dir / f"{cache_key}.pkl"
-                with open(cache_file, "wb") as f:
-                    pickle.dump(value, f)
-                logger.debug(f"Cached to disk: {key[:50]}")
+                self._hot_set.pop(cache_key, None)
 
+                # Set expiration metadata
+                self.cache_metadata[cache_key] = {
+                    "created_at": time.time(),  # epoch seconds; formatted only in get_stats
+                    "expires_at": expires_at,
+                }
+
+                # Plain dict/list/str values (LLM output, metadata) skip pickle entirely
+                json_file = self.cache_dir / f"{cache_key}.json"
+                cache_file = self.cache_dir / f"{cache_key}.pkl"
+                if _is_json_safe(value):
+                    with _atomic_open(json_file) as f:
+                        f.write(_json_dumps(value))
+                    self.cache_metadata[cache_key]["fmt"] = "json"
+                    stale = cache_file
+                else:
+                    self._dump_pickle(value, cache_file)
+                    self.cache_metadata[cache_key]["fmt"] = "pickle"
+                    stale = json_file
+                stale.unlink(missing_ok=True)
+                logger.debug("Cached to disk: {!s:.50}", key)
+
+            heapq.heappush(self._exp_heap, (expires_at, backend, cache_key))
             return True
 
         except Exception as e:
             logger.error(f"Failed to cache: {e}")
             return False
 
+    def _reap_expired(self):
+        """
+        Remove every entry whose TTL has passed, soonest expiry first
+
+        Costs one comparison when nothing has expired. A heap row whose entry
+        was since overwritten, deleted or evicted no longer matches its
+        expiry and is simply dropped.
+        """
+        now = time.monotonic()
+        heap = self._exp_heap
+        while heap and heap[0][0] < now:
+            expires_at, backend, cache_key = heapq.heappop(heap)
+            if backend == "memory":
+                entry = self.memory_cache.get(cache_key)
+                if entry is not None and entry[0] == expires_at:
+                    del self.memory_cache[cache_key]
+            else:
+                metadata = self.cache_metadata.get(cache_key)
+                if metadata is not None and metadata["expires_at"] == expires_at:
+                    self._delete_disk(cache_key)
+
+        # Rows for overwritten keys pile up under long TTLs; rebuild once they dominate
+        if len(heap) > 2 * (len(self.memory_cache) + len(self.cache_metadata)) + 64:
+            live = [row for row in heap
+                    if (row[1] == "memory" and self.memory_cache.get(row[2], (None,))[0] == row[0])
+                    or (row[1] == "disk" and self.cache_metadata.get(row[2], {}).get("expires_at") == row[0])]
+            heapq.heapify(live)
+            self._exp_heap = live
+
+    def _delete_disk(self, cache_key: str):
+        """Remove a disk entry's files, metadata and hot copy"""
+        self._hot_set.pop(cache_key, None)
+        for suffix in _DISK_SUFFIXES:
+            (self.cache_dir / f"{cache_key}{suffix}").unlink(missing_ok=True)
+        self.cache_metadata.pop(cache_key, None)
+
+    def _evict_memory(self):
+        """Drop least recently used memory entries down to the size limit (expired ones are already reaped)"""
+        while len(self.memory_cache) > self.max_memory_entries:
+            self.memory_cache.popitem(last=False)
+
     def delete(self, key: str, backend: str = "memory") -> bool:
         """
         Delete value from cache
 
         Args:
             key: Cache key
-            backend: 'memory' or 'disk'
+            backend: 'memory', 'disk', or 'auto' (both)
 
         Returns:
             True if successful
@@ -146,19 +418,13 @@ class CacheManager:
         cache_key = self._generate_key(key)
 
         try:
-            if backend == "memory":
-                if cache_key in self.memory_cache:
-                    del self.memory_cache[cache_key]
-
-            elif backend == "disk":
-                cache_file = self.cache_dir / f"{cache_key}.pkl"
-                if cache_file.exists():
-                    cache_file.unlink()
+            if backend in ("memory", "auto"):
+                self.memory_cache.pop(cache_key, None)
 
-            if cache_key in self.cache_metadata:
-                del self.cache_metadata[cache_key]
+            if backend in ("disk", "auto"):
+                self._delete_disk(cache_key)
 
-            logger.debug(f"Deleted cache: {key[:50]}")
+            logger.debug("Deleted cache: {!s:.50}", key)
             return True
 
         except Exception as e:
@@ -176,16 +442,31 @@ class CacheManager:
             True if successful
         """
         try:
+            if backend == "both":
+                self._exp_heap.clear()
+
             if backend in ["memory", "both"]:
                 self.memory_cache.clear()
+                for fast_path in self._fast_paths:
+                    fast_path.cache_clear()
                 logger.info("Cleared memory cache")
 
             if backend in ["disk", "both"]:
-                for cache_file in self.cache_dir.glob("*.pkl"):
-                    cache_file.unlink()
+                # One directory pass instead of a glob (and Path objects) per suffix
+                with os.scandir(self.cache_dir) as it:
+                    paths = [entry.path for entry in it
+                             if entry.name.endswith(_DISK_SUFFIXES) and entry.is_file()]
+                if len(paths) > CLEAR_PARALLEL_MIN:
+                    # unlink releases the GIL, so the filesystem work overlaps across threads
+                    with ThreadPoolExecutor(max_workers=CLEAR_WORKERS) as pool:
+                        list(pool.map(os.unlink, paths))
+                else:
+                    for path in paths:
+                        os.unlink(path)
+                self.cache_metadata.clear()
+                self._hot_set.clear()
                 logger.info("Cleared disk cache")
 
-            self.cache_metadata.clear()
             return True
 
         except Exception as e:
@@ -199,33 +480,77 @@ class CacheManager:
         Returns:
             Dictionary with cache stats
         """
-        disk_files = list(self.cache_dir.glob("*.pkl"))
-        disk_size = sum(f.stat().st_size for f in disk_files)
+        disk_entries = 0
+        disk_size = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(_DISK_SUFFIXES):
+                    disk_size += entry.stat().st_size
+                    disk_entries += entry.name.endswith(_ENTRY_SUFFIXES)
 
         return {
             "memory_entries": len(self.memory_cache),
-            "disk_entries": len(disk_files),
+            "max_memory_entries": self.max_memory_entries,
+            "disk_entries": disk_entries,
             "disk_size_mb": disk_size / (1024 * 1024),
             "ttl_seconds": self.ttl_seconds,
-            "metadata_entries": len(self.cache_metadata)
+            "metadata_entries": len(self.cache_metadata),
+            "oldest_disk_entry": datetime.fromtimestamp(
+                min(m["created_at"] for m in self.cache_metadata.values())
+            ).isoformat() if self.cache_metadata else None
         }
 
-    def cached(self, backend: str = "memory", ttl_seconds: Optional[int] = None):
+    def cached(self, backend: str = "memory", ttl_seconds: Optional[int] = None,
+               key_func: Optional[Callable[..., str]] = None):
         """
         Decorator for caching function results
 
+        With the memory backend, calls whose arguments are all hashable go
+        through a `functools.lru_cache` instead of the keyed lookup. Its
+        entries are bucketed by TTL window, so none outlives `ttl_seconds`
+        (an entry made late in a window lives correspondingly shorter).
+        DataFrames, arrays and other unhashable arguments use the keyed path.
+
         Args:
             backend: Cache backend to use
             ttl_seconds: Custom TTL
+            key_func: Optional callable taking the call's arguments and
+                returning a stable key string, for arguments the default
+                fingerprinting cannot describe
 
         Returns:
             Decorated function
         """
         def decorator(func: Callable) -> Callable:
+            prefix = f"{func.__module__}.{func.__qualname__}"
+            ttl = ttl_seconds or self.ttl_seconds
+
+            fast_path = None
+            if backend == "memory" and key_func is None:
+                @lru_cache(maxsize=FAST_PATH_ENTRIES, typed=True)
+                def fast_path(_window, *args, **kwargs):
+                    return func(*args, **kwargs)
+
+                self._fast_paths.append(fast_path)
+
             @wraps(func)
             def wrapper(*args, **kwargs):
+                if fast_path is not None:
+                    try:
+                        hash((args, tuple(kwargs.values())))
+                    except TypeError:
+                        pass  # unhashable argument; fall through to the keyed path
+                    else:
+                        return fast_path(int(time.monotonic() // ttl), *args, **kwargs)
+
                 # Generate cache key from function name and arguments
-                cache_key = f"{func.__name__}:{args}:{kwargs}"
+                if key_func is not None:
+                    cache_key = f"{prefix}:{key_func(*args, **kwargs)}"
+                else:
+                    # Argument types are part of the key, as in lru_cache(typed=True)
+                    key_args = tuple((type(a).__name__, _arg_fingerprint(a)) for a in args)
+                    key_kwargs = tuple(sorted((k, type(v).__name__, _arg_fingerprint(v)) for k, v in kwargs.items()))
+                    cache_key = f"{prefix}:{key_args!r}:{key_kwargs!r}"
 
                 # Try to get from cache
                 cached_value = self.get(cache_key, backend)
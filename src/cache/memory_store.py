@@ -1,10 +1,47 @@
 """
 Memory Store - In-memory storage for session data and conversation history
 """
-from typing import Any, Dict, List, Optional
+from collections import defaultdict, deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional
 from datetime import datetime
 from loguru import logger
 import json
+import time
+
+try:
+    import orjson
+
+    def _dump_json(data: Any) -> bytes:
+        return orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+    _load_json = orjson.loads
+except ImportError:
+    def _dump_json(data: Any) -> bytes:
+        return json.dumps(data, indent=2, default=str).encode()
+
+    _load_json = json.loads
+
+
+def _with_iso_timestamp(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a history/log entry with its `timestamp_ns` formatted as an ISO `timestamp`"""
+    entry = dict(entry)
+    timestamp_ns = entry.pop("timestamp_ns", None)
+    if timestamp_ns is not None:
+        entry["timestamp"] = datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+    return entry
+
+
+def _with_ns_timestamp(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of `_with_iso_timestamp`, for entries read back from an export"""
+    if "timestamp" in entry and "timestamp_ns" not in entry:
+        entry = dict(entry)
+        entry["timestamp_ns"] = int(datetime.fromisoformat(entry.pop("timestamp")).timestamp() * 1e9)
+    return entry
 
 
 class MemoryStore:
@@ -19,8 +56,10 @@ class MemoryStore:
         """
         self.max_history = max_history
 
-        # Conversation history
-        self.conversation_history: List[Dict[str, Any]] = []
+        # Conversation history (oldest entries drop off once max_history is reached)
+        self.conversation_history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        # The same messages again, per role, so filtered reads skip the other roles
+        self._by_role: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
 
         # Session data
         self.session_data: Dict[str, Any] = {}
@@ -29,7 +68,8 @@ class MemoryStore:
         self.user_context: Dict[str, Any] = {}
 
         # Execution logs
-        self.execution_logs: List[Dict[str, Any]] = []
+        self.execution_logs: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        self._by_status: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
 
         logger.info(f"Initialized MemoryStore with max_history: {max_history}")
 
@@ -45,15 +85,12 @@ class MemoryStore:
         message = {
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat(),
+            # Formatted only on export; a raw clock read is all an append should cost
+            "timestamp_ns": time.time_ns(),
             "metadata": metadata or {}
         }
 
-        self.conversation_history.append(message)
-
-        # Trim history if needed
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history:]
+        self._append(self.conversation_history, self._by_role, "role", message)
 
         logger.debug(f"Added {role} message to history")
 
@@ -72,19 +109,12 @@ class MemoryStore:
         Returns:
             List of messages
         """
-        history = self.conversation_history
-
-        if role_filter:
-            history = [msg for msg in history if msg["role"] == role_filter]
-
-        if limit:
-            history = history[-limit:]
-
-        return history
+        return self._tail(self._by_role.get(role_filter, ()) if role_filter else self.conversation_history, limit)
 
     def clear_history(self):
         """Clear conversation history"""
         self.conversation_history.clear()
+        self._by_role.clear()
         logger.info("Cleared conversation history")
 
     def set_session_data(self, key: str, value: Any):
@@ -181,15 +211,11 @@ class MemoryStore:
         log_entry = {
             "operation": operation,
             "status": status,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp_ns": time.time_ns(),
             "details": details or {}
         }
 
-        self.execution_logs.append(log_entry)
-
-        # Trim logs if needed
-        if len(self.execution_logs) > self.max_history:
-            self.execution_logs = self.execution_logs[-self.max_history:]
+        self._append(self.execution_logs, self._by_status, "status", log_entry)
 
         logger.debug(f"Logged execution: {operation} - {status}")
 
@@ -208,19 +234,33 @@ class MemoryStore:
         Returns:
             List of log entries
         """
-        logs = self.execution_logs
-
-        if status_filter:
-            logs = [log for log in logs if log["status"] == status_filter]
-
+        return self._tail(self._by_status.get(status_filter, ()) if status_filter else self.execution_logs, limit)
+
+    @staticmethod
+    def _append(entries: Deque[Dict[str, Any]], index: Dict[str, Deque[Dict[str, Any]]], field: str,
+                entry: Dict[str, Any]):
+        """Append `entry` to a bounded deque and to its per-`field` index, keeping both in step"""
+        if entries and len(entries) == entries.maxlen:
+            # The entry about to fall off is also the oldest one in its index bucket
+            evicted = entries[0]
+            bucket = index[evicted[field]]
+            bucket.popleft()
+            if not bucket:
+                del index[evicted[field]]
+        entries.append(entry)
+        index[entry[field]].append(entry)
+
+    @staticmethod
+    def _tail(entries, limit: Optional[int]) -> List[Dict[str, Any]]:
+        """Last `limit` entries (all if None), oldest first"""
         if limit:
-            logs = logs[-limit:]
-
-        return logs
+            return list(islice(entries, max(len(entries) - limit, 0), None))
+        return list(entries)
 
     def clear_execution_logs(self):
         """Clear execution logs"""
         self.execution_logs.clear()
+        self._by_status.clear()
         logger.info("Cleared execution logs")
 
     def get_summary(self) -> Dict[str, Any]:
@@ -250,15 +290,15 @@ class MemoryStore:
         """
         try:
             data = {
-                "conversation_history": self.conversation_history,
+                "conversation_history": [_with_iso_timestamp(m) for m in self.conversation_history],
                 "session_data": self.session_data,
                 "user_context": self.user_context,
-                "execution_logs": self.execution_logs,
+                "execution_logs": [_with_iso_timestamp(log) for log in self.execution_logs],
                 "exported_at": datetime.now().isoformat()
             }
 
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            with open(file_path, 'wb') as f:
+                f.write(_dump_json(data))
 
             logger.info(f"Exported memory store to {file_path}")
             return True
@@ -278,13 +318,19 @@ class MemoryStore:
             True if successful
         """
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                data = _load_json(f.read())
 
-            self.conversation_history = data.get("conversation_history", [])
+            self.conversation_history = deque(maxlen=self.max_history)
+            self._by_role.clear()
+            for message in data.get("conversation_history", []):
+                self._append(self.conversation_history, self._by_role, "role", _with_ns_timestamp(message))
             self.session_data = data.get("session_data", {})
             self.user_context = data.get("user_context", {})
-            self.execution_logs = data.get("execution_logs", [])
+            self.execution_logs = deque(maxlen=self.max_history)
+            self._by_status.clear()
+            for log_entry in data.get("execution_logs", []):
+                self._append(self.execution_logs, self._by_status, "status", _with_ns_timestamp(log_entry))
 
             logger.info(f"Imported memory store from {file_path}")
             return True
@@ -2,8 +2,9 @@
 Configuration Management - Load and manage application configuration
 """
 import os
+from functools import cache
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from loguru import logger
 
@@ -11,6 +12,13 @@ from loguru import logger
 load_dotenv()
 
 
+@cache
+def _ensure_dir(directory: Path) -> Path:
+    """Create `directory` (once per process) and return it"""
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
 class Config:
     """Application configuration"""
 
@@ -59,6 +67,23 @@ class Config:
     MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
 
+    # Filled in below the class body: the settings display() reports, and its cached result
+    _PUBLIC_KEYS: Tuple[str, ...] = ()
+    _display_cache: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def ensure_dir(cls, directory: Path) -> Path:
+        """
+        Create a directory on first use
+
+        Args:
+            directory: Directory path (e.g. Config.REPORTS_DIR)
+
+        Returns:
+            The same path, now existing
+        """
+        return _ensure_dir(Path(directory))
+
     @classmethod
     def ensure_directories(cls):
         """Create necessary directories if they don't exist"""
@@ -74,7 +99,7 @@ class Config:
         ]
 
         for directory in directories:
-            directory.mkdir(parents=True, exist_ok=True)
+            _ensure_dir(directory)
 
         logger.info("Created necessary directories")
 
@@ -97,13 +122,16 @@ class Config:
         """
         Get all configuration as dictionary
 
+        Settings are read from the environment once, at import, so the
+        result is built on the first call and copied afterwards.
+
         Returns:
             Configuration dictionary
         """
-        config_dict = {}
+        if cls._display_cache is None:
+            config_dict = {}
 
-        for key in dir(cls):
-            if key.isupper() and not key.startswith("_"):
+            for key in cls._PUBLIC_KEYS:
                 value = getattr(cls, key)
                 # Don't expose sensitive information
                 if "KEY" in key or "PASSWORD" in key:
@@ -111,11 +139,11 @@ class Config:
                 else:
                     config_dict[key] = str(value)
 
-        return config_dict
+            cls._display_cache = config_dict
+
+        return dict(cls._display_cache)
+
 
+Config._PUBLIC_KEYS = tuple(sorted(key for key in vars(Config) if key.isupper() and not key.startswith("_")))
 
-# Initialize directories on import
-try:
-    Config.ensure_directories()
-except Exception as e:
-    logger.warning(f"Failed to create directories: {e}")
+# Directories are created on first use (Config.ensure_dir), not at import
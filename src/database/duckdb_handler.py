@@ -1,12 +1,43 @@
 """
 DuckDB Handler - Efficient analytical database for DataFrames
 """
+import re
+from collections import OrderedDict
 import duckdb
 import pandas as pd
-from typing import Optional, List, Dict, Any
+import pyarrow as pa
+from typing import Optional, List, Dict, Any, Iterator
 from loguru import logger
 from pathlib import Path
 
+# DuckDB's default row group size; batches of this size map onto whole row groups
+STREAM_BATCH_ROWS = 122880
+
+# Prepared statements kept per connection; the least recently used one is deallocated beyond this
+PREPARED_CACHE_SIZE = 64
+
+# Table names are spliced into SQL, so only plain (optionally schema-qualified) identifiers are accepted
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?")
+
+
+def _check_identifier(name: str) -> str:
+    """Return `name` if it is a plain SQL identifier, else raise ValueError"""
+    if not isinstance(name, str) or not _IDENTIFIER_RE.fullmatch(name):
+        raise ValueError(f"Invalid table name: {name!r}")
+    return name
+
+
+def _fetch_arrow(result) -> pa.Table:
+    """Fetch a DuckDB result as one Arrow table"""
+    if hasattr(result, "to_arrow_table"):
+        return result.to_arrow_table()
+    return result.fetch_arrow_table()  # duckdb < 1.4
+
+
+def _to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Arrow-backed DataFrame over `table`: columns are not copied into numpy blocks, and ints stay nullable"""
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
 
 class DuckDBHandler:
     """Handler for DuckDB database operations"""
@@ -20,26 +51,91 @@ class DuckDBHandler:
         """
         self.db_path = db_path or ":memory:"
         self.conn = duckdb.connect(self.db_path)
+        # SQL text -> name of its prepared statement, least recently used first
+        self._prepared: "OrderedDict[str, str]" = OrderedDict()
+        self._prepared_seq = 0
+        # Names registered as views by create_table_from_df -> the Arrow table behind each
+        self._views: Dict[str, pa.Table] = {}
         logger.info(f"Connected to DuckDB: {self.db_path}")
 
-    def create_table_from_df(self, df: pd.DataFrame, table_name: str, if_exists: str = "replace") -> bool:
+    def create_table_from_df(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        if_exists: str = "replace",
+        materialize: Optional[bool] = None
+    ) -> bool:
         """
         Create table from DataFrame
 
+        On an in-memory database the frame is by default only registered as
+        a view for the lifetime of the connection, which copies nothing;
+        `insert_dataframe` turns such a view into a table first. On a
+        database file the data is copied into DuckDB storage by default, so
+        it survives a reopen. Appending to an existing view or table goes
+        through `insert_dataframe` either way.
+
         Args:
             df: Source DataFrame
             table_name: Name for the table
             if_exists: 'replace' or 'append'
+            materialize: Copy the data into a real table instead of a view
+                (default: only for file-backed databases)
+
+        Returns:
+            True if successful
+        """
+        if if_exists == "append" and self._has_relation(table_name):
+            return self.insert_dataframe(df, table_name)
+        if materialize is None:
+            materialize = self.db_path != ":memory:"
+        if materialize:
+            return self.materialize_table_from_df(df, table_name, if_exists)
+
+        try:
+            _check_identifier(table_name)
+            self._reset_prepared()
+            if if_exists == "replace":
+                self.conn.unregister(table_name)
+                self.conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+
+            # Arrow-backed views scan much faster than views over pandas frames
+            arrow = pa.Table.from_pandas(df, preserve_index=False)
+            self.conn.register(table_name, arrow)
+            self._views[table_name] = arrow
+
+            logger.info(f"Registered view '{table_name}' with {len(df)} rows")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to create table: {e}")
+            return False
+
+    def materialize_table_from_df(self, df: pd.DataFrame, table_name: str, if_exists: str = "replace") -> bool:
+        """
+        Copy a DataFrame into a DuckDB table
+
+        Args:
+            df: Source DataFrame
+            table_name: Name for the table
+            if_exists: 'replace' or 'append' (appending to a missing table creates it)
 
         Returns:
             True if successful
         """
         try:
+            _check_identifier(table_name)
+            if if_exists == "append" and self._has_relation(table_name):
+                return self.insert_dataframe(df, table_name)
+
+            self._reset_prepared()
+            self.conn.unregister(table_name)  # a registered view would shadow the table
+            self._views.pop(table_name, None)
             if if_exists == "replace":
                 self.conn.execute(f"DROP TABLE IF EXISTS {table_name}")
 
-            self.conn.register(table_name, df)
-            self.conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM {table_name}")
+            # Straight from Arrow into storage, no CREATE ... AS SELECT to plan
+            self.conn.from_arrow(pa.Table.from_pandas(df, preserve_index=False)).create(table_name)
 
             logger.info(f"Created table '{table_name}' with {len(df)} rows")
             return True
@@ -48,6 +144,46 @@ class DuckDBHandler:
             logger.error(f"Failed to create table: {e}")
             return False
 
+    def _has_relation(self, table_name: str) -> bool:
+        """True if `table_name` is a registered view or a table"""
+        return table_name in self._views or table_name in self.list_tables()
+
+    def _execute_cached(self, sql: str) -> duckdb.DuckDBPyConnection:
+        """
+        Execute a query through a prepared statement cached by its SQL text
+
+        Repeated queries skip parsing and planning. Plans over registered
+        views are not rebound when the view is re-registered, so anything
+        that changes the catalog calls `_reset_prepared`. Multi-statement
+        scripts and anything DuckDB cannot prepare run directly.
+        """
+        name = self._prepared.get(sql)
+        if name is not None:
+            self._prepared.move_to_end(sql)
+            return self.conn.execute(f"EXECUTE {name}")
+
+        if ";" in sql.strip().rstrip(";"):
+            return self.conn.execute(sql)
+
+        self._prepared_seq += 1
+        name = f"_stmt_{self._prepared_seq}"
+        try:
+            self.conn.execute(f"PREPARE {name} AS {sql}")
+        except duckdb.Error:
+            return self.conn.execute(sql)  # raises the real error for invalid SQL
+
+        self._prepared[sql] = name
+        if len(self._prepared) > PREPARED_CACHE_SIZE:
+            _, evicted = self._prepared.popitem(last=False)
+            self.conn.execute(f"DEALLOCATE {evicted}")
+        return self.conn.execute(f"EXECUTE {name}")
+
+    def _reset_prepared(self):
+        """Deallocate every cached prepared statement"""
+        for name in self._prepared.values():
+            self.conn.execute(f"DEALLOCATE {name}")
+        self._prepared.clear()
+
     def query(self, sql: str) -> pd.DataFrame:
         """
         Execute SQL query and return result as DataFrame
@@ -56,10 +192,10 @@ class DuckDBHandler:
             sql: SQL query string
 
         Returns:
-            Query result as DataFrame
+            Query result as an Arrow-backed DataFrame
         """
         try:
-            result = self.conn.execute(sql).fetchdf()
+            result = _to_pandas(_fetch_arrow(self._execute_cached(sql)))
             logger.info(f"Query executed successfully, returned {len(result)} rows")
             return result
 
@@ -67,6 +203,51 @@ class DuckDBHandler:
             logger.error(f"Query failed: {e}")
             raise
 
+    def query_arrow(self, sql: str) -> pa.Table:
+        """
+        Execute SQL query and return result as an Arrow table
+
+        Args:
+            sql: SQL query string
+
+        Returns:
+            Query result as pyarrow.Table
+        """
+        try:
+            result = _fetch_arrow(self._execute_cached(sql))
+            logger.info(f"Query executed successfully, returned {result.num_rows} rows")
+            return result
+
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            raise
+
+    def stream_query(self, sql: str, batch_size: int = STREAM_BATCH_ROWS) -> Iterator["pa.RecordBatch"]:
+        """
+        Execute SQL query and yield the result as Arrow record batches
+
+        Only one batch is held in memory at a time, so callers that need the
+        first rows (or a running count) never materialise the full result.
+
+        Args:
+            sql: SQL query string
+            batch_size: Maximum rows per batch
+
+        Yields:
+            pyarrow.RecordBatch objects in result order
+        """
+        try:
+            result = self.conn.execute(sql)
+            if hasattr(result, "to_arrow_reader"):
+                reader = result.to_arrow_reader(batch_size)
+            else:  # duckdb < 1.4
+                reader = result.fetch_record_batch(batch_size)
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            raise
+
+        yield from reader
+
     def execute(self, sql: str) -> bool:
         """
         Execute SQL statement (INSERT, UPDATE, DELETE, etc.)
@@ -78,6 +259,7 @@ class DuckDBHandler:
             True if successful
         """
         try:
+            self._reset_prepared()  # the statement may change tables cached plans read
             self.conn.execute(sql)
             logger.info("SQL statement executed successfully")
             return True
@@ -114,7 +296,7 @@ class DuckDBHandler:
             DataFrame with schema information
         """
         try:
-            result = self.conn.execute(f"DESCRIBE {table_name}").fetchdf()
+            result = self._execute_cached(f"DESCRIBE {_check_identifier(table_name)}").fetchdf()
             return result
 
         except Exception as e:
@@ -133,9 +315,16 @@ class DuckDBHandler:
             True if successful
         """
         try:
-            self.conn.register("temp_df", df)
-            self.conn.execute(f"INSERT INTO {table_name} SELECT * FROM temp_df")
-            self.conn.unregister("temp_df")
+            _check_identifier(table_name)
+            view = self._views.pop(table_name, None)
+            if view is not None:
+                # A registered view cannot be appended to; copy it into a table of the same name first
+                self._reset_prepared()
+                self.conn.unregister(table_name)
+                self.conn.from_arrow(view).create(table_name)
+
+            # Appends straight into the table; no temp view in the catalog and no INSERT to plan
+            self.conn.append(table_name, df)
 
             logger.info(f"Inserted {len(df)} rows into '{table_name}'")
             return True
@@ -157,10 +346,10 @@ class DuckDBHandler:
         """
         try:
             query = f"SELECT * FROM read_csv_auto('{csv_path}')"
-            result = self.conn.execute(query).fetchdf()
+            result = _to_pandas(_fetch_arrow(self.conn.execute(query)))
 
             if table_name:
-                self.create_table_from_df(result, table_name)
+                self.create_table_from_df(result, table_name, materialize=True)
 
             logger.info(f"Read {len(result)} rows from CSV")
             return result
@@ -182,10 +371,10 @@ class DuckDBHandler:
         """
         try:
             query = f"SELECT * FROM read_parquet('{parquet_path}')"
-            result = self.conn.execute(query).fetchdf()
+            result = _to_pandas(_fetch_arrow(self.conn.execute(query)))
 
             if table_name:
-                self.create_table_from_df(result, table_name)
+                self.create_table_from_df(result, table_name, materialize=True)
 
             logger.info(f"Read {len(result)} rows from Parquet")
             return result
@@ -194,6 +383,21 @@ class DuckDBHandler:
             logger.error(f"Failed to read Parquet: {e}")
             raise
 
+    def read_parquet_lazy(self, parquet_path: str) -> duckdb.DuckDBPyRelation:
+        """
+        Open a Parquet file as a DuckDB relation without reading it
+
+        Filters, projections and aggregates chained on the relation are pushed
+        down into the Parquet scan; nothing is materialised until it is fetched.
+
+        Args:
+            parquet_path: Path to Parquet file
+
+        Returns:
+            DuckDB relation over the file
+        """
+        return self.conn.read_parquet(parquet_path)
+
     def export_to_parquet(self, table_name: str, output_path: str) -> bool:
         """
         Export table to Parquet file
@@ -206,7 +410,7 @@ class DuckDBHandler:
             True if successful
         """
         try:
-            self.conn.execute(f"COPY {table_name} TO '{output_path}' (FORMAT PARQUET)")
+            self.conn.execute(f"COPY {_check_identifier(table_name)} TO '{output_path}' (FORMAT PARQUET)")
             logger.info(f"Exported table '{table_name}' to {output_path}")
             return True
 
@@ -225,32 +429,29 @@ class DuckDBHandler:
             Dictionary with statistics
         """
         try:
-            # Row count
-            row_count = self.conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
-
             # Schema
             schema = self.get_table_schema(table_name)
 
             # Column statistics for numeric columns
             numeric_cols = schema[schema['column_type'].str.contains('INT|DOUBLE|DECIMAL|FLOAT', regex=True)]['column_name'].tolist()
+            numeric_cols = numeric_cols[:10]  # Limit to first 10 numeric columns
+
+            # Row count and every column's aggregates in one scan
+            aggregates = ["COUNT(*)"]
+            for col in numeric_cols:
+                quoted = '"' + col.replace('"', '""') + '"'
+                aggregates += [f"MIN({quoted})", f"MAX({quoted})", f"AVG({quoted})", f"STDDEV({quoted})"]
+            row = self._execute_cached(f"SELECT {', '.join(aggregates)} FROM {table_name}").fetchone()
 
             stats = {
-                "row_count": row_count,
+                "row_count": row[0],
                 "column_count": len(schema),
                 "columns": schema.to_dict('records'),
                 "numeric_stats": {}
             }
 
-            for col in numeric_cols[:10]:  # Limit to first 10 numeric columns
-                col_stats = self.conn.execute(f"""
-                    SELECT
-                        MIN({col}) as min,
-                        MAX({col}) as max,
-                        AVG({col}) as avg,
-                        STDDEV({col}) as stddev
-                    FROM {table_name}
-                """).fetchone()
-
+            for i, col in enumerate(numeric_cols):
+                col_stats = row[1 + 4 * i:5 + 4 * i]
                 stats["numeric_stats"][col] = {
                     "min": col_stats[0],
                     "max": col_stats[1],
@@ -2,11 +2,51 @@
 SQLite Handler - Lightweight relational database support
 """
 import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
 import pandas as pd
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Callable, Union
 from loguru import logger
 from pathlib import Path
 
+# Applied to every connection: WAL journaling with fsync only at checkpoints,
+# temp tables in RAM, reads through mmap and a 64 MB page cache
+CONNECTION_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=30000000000;
+PRAGMA cache_size=-64000;
+"""
+
+# Bound parameters allowed per statement (raised from 999 in SQLite 3.32)
+SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+# query() keeps this many recent results, each for at most QUERY_CACHE_TTL seconds
+# (the TTL bounds staleness when another process writes to the same file)
+QUERY_CACHE_SIZE = 128
+QUERY_CACHE_TTL = 60.0
+
+# Pages copied per step by backup(); other connections can write between steps
+BACKUP_PAGES_PER_STEP = 1024
+
+# Parameter tuples passed to one executemany() call by execute_many
+EXECUTE_MANY_BATCH = 10_000
+
+# Upper bound on rows per INSERT batch, so only one batch is materialised at a time
+BULK_INSERT_ROWS = 5000
+
+
+def _quote(identifier: str) -> str:
+    """Quote an identifier for use in generated SQL"""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _bulk_chunksize(df: pd.DataFrame) -> int:
+    """Rows per multi-row INSERT that stay within SQLite's bound-parameter limit"""
+    return max(1, min(BULK_INSERT_ROWS, SQLITE_MAX_VARIABLES // max(1, len(df.columns))))
+
 
 class SQLiteHandler:
     """Handler for SQLite database operations"""
@@ -23,8 +63,16 @@ class SQLiteHandler:
         # Ensure directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-        self.conn = sqlite3.connect(db_path)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # journal_mode is persistent and returns the resulting mode, so it gets its own statement
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(CONNECTION_PRAGMAS)
         self.cursor = self.conn.cursor()
+
+        # SQL text -> (write epoch, monotonic expiry, result); every write through
+        # this handler bumps the epoch, which invalidates all cached results
+        self._query_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._write_epoch = 0
         logger.info(f"Connected to SQLite database: {db_path}")
 
     def create_table_from_df(self, df: pd.DataFrame, table_name: str, if_exists: str = "replace") -> bool:
@@ -40,7 +88,7 @@ class SQLiteHandler:
             True if successful
         """
         try:
-            df.to_sql(table_name, self.conn, if_exists=if_exists, index=False)
+            self._write_df(df, table_name, if_exists)
             logger.info(f"Created table '{table_name}' with {len(df)} rows")
             return True
 
@@ -48,20 +96,73 @@ class SQLiteHandler:
             logger.error(f"Failed to create table: {e}")
             return False
 
+    def _write_df(self, df: pd.DataFrame, table_name: str, if_exists: str):
+        """
+        Write `df` in bounded batches of multi-row INSERTs, all in one transaction
+
+        Frames too wide for even one row per statement fall back to executemany.
+        """
+        self._write_epoch += 1
+        method = "multi" if len(df.columns) <= SQLITE_MAX_VARIABLES else None
+        with self.conn:
+            df.to_sql(table_name, self.conn, if_exists=if_exists, index=False,
+                      method=method, chunksize=_bulk_chunksize(df))
+
+    @contextmanager
+    def fast_bulk_load(self):
+        """
+        Turn off journaling, fsync and foreign-key checks for a bulk load
+
+        Meant for full rebuilds (e.g. `create_table_from_df` with
+        if_exists='replace'): a crash inside the block can corrupt the
+        database file, so only use it for data that can be reloaded.
+        WAL and the previous settings are restored on exit.
+
+        Example:
+            with db.fast_bulk_load():
+                db.create_table_from_df(df, "sales")
+        """
+        # None of these pragmas can change inside an open transaction
+        self.conn.commit()
+        foreign_keys = self.conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        self.conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF; PRAGMA foreign_keys=OFF;")
+        try:
+            yield self
+        finally:
+            self.conn.commit()
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(f"PRAGMA synchronous=NORMAL; PRAGMA foreign_keys={foreign_keys};")
+
     def query(self, sql: str) -> pd.DataFrame:
         """
         Execute SQL query and return result as DataFrame
 
+        Results are cached by SQL text until the next write through this
+        handler (or QUERY_CACHE_TTL), so repeated dashboard queries skip
+        SQLite and DataFrame construction.
+
         Args:
             sql: SQL query string
 
         Returns:
             Query result as DataFrame
         """
+        key = sql.strip()
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            epoch, expires_at, result = cached
+            if epoch == self._write_epoch and expires_at > time.monotonic():
+                self._query_cache.move_to_end(key)
+                return result.copy(deep=False)
+            del self._query_cache[key]
+
         try:
             result = pd.read_sql_query(sql, self.conn)
             logger.info(f"Query executed successfully, returned {len(result)} rows")
-            return result
+            self._query_cache[key] = (self._write_epoch, time.monotonic() + QUERY_CACHE_TTL, result)
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+            return result.copy(deep=False)
 
         except Exception as e:
             logger.error(f"Query failed: {e}")
@@ -78,6 +179,7 @@ class SQLiteHandler:
         Returns:
             True if successful
         """
+        self._write_epoch += 1
         try:
             if params:
                 self.cursor.execute(sql, params)
@@ -93,21 +195,32 @@ class SQLiteHandler:
             self.conn.rollback()
             return False
 
-    def execute_many(self, sql: str, params_list: List[tuple]) -> bool:
+    def execute_many(self, sql: str, params_list: Iterable[tuple]) -> bool:
         """
         Execute many SQL statements with different parameters
 
+        All rows run through one prepared statement in a single transaction.
+        `params_list` may be any iterable (e.g. a generator); it is consumed
+        in batches, so it never has to be materialised in full.
+
         Args:
             sql: SQL statement template
-            params_list: List of parameter tuples
+            params_list: Iterable of parameter tuples
 
         Returns:
             True if successful
         """
+        self._write_epoch += 1
         try:
-            self.cursor.executemany(sql, params_list)
+            count = 0
+            params = iter(params_list)
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            for batch in iter(lambda: list(islice(params, EXECUTE_MANY_BATCH)), []):
+                self.cursor.executemany(sql, batch)
+                count += len(batch)
             self.conn.commit()
-            logger.info(f"Executed {len(params_list)} statements successfully")
+            logger.info(f"Executed {count} statements successfully")
             return True
 
         except Exception as e:
@@ -132,6 +245,55 @@ class SQLiteHandler:
             logger.error(f"Failed to list tables: {e}")
             return []
 
+    def list_tables_with_counts(self) -> Dict[str, int]:
+        """
+        Row counts for every table, fetched with a single UNION ALL query
+
+        Returns:
+            Dictionary of table name -> row count
+        """
+        try:
+            tables = self.list_tables()
+            if not tables:
+                return {}
+            sql = " UNION ALL ".join(f"SELECT ?, COUNT(*) FROM {_quote(name)}" for name in tables)
+            self.cursor.execute(sql, tables)
+            return dict(self.cursor.fetchall())
+
+        except Exception as e:
+            logger.error(f"Failed to count table rows: {e}")
+            return {}
+
+    def get_all_schemas(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Schema information for every table, fetched in one query
+
+        Returns:
+            Dictionary of table name -> column information dictionaries
+            (same keys as `get_table_schema`)
+        """
+        try:
+            self.cursor.execute(
+                "SELECT m.name, p.cid, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk "
+                "FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+                "WHERE m.type = 'table' ORDER BY m.name, p.cid"
+            )
+            schemas: Dict[str, List[Dict[str, Any]]] = {}
+            for table, cid, name, col_type, notnull, default_value, pk in self.cursor.fetchall():
+                schemas.setdefault(table, []).append({
+                    "cid": cid,
+                    "name": name,
+                    "type": col_type,
+                    "notnull": bool(notnull),
+                    "default_value": default_value,
+                    "primary_key": bool(pk)
+                })
+            return schemas
+
+        except Exception as e:
+            logger.error(f"Failed to get schemas: {e}")
+            raise
+
     def get_table_schema(self, table_name: str) -> List[Dict[str, Any]]:
         """
         Get schema information for a table
@@ -176,7 +338,7 @@ class SQLiteHandler:
             True if successful
         """
         try:
-            df.to_sql(table_name, self.conn, if_exists=if_exists, index=False)
+            self._write_df(df, table_name, if_exists)
             logger.info(f"Inserted {len(df)} rows into '{table_name}'")
             return True
 
@@ -184,24 +346,28 @@ class SQLiteHandler:
             logger.error(f"Failed to insert data: {e}")
             return False
 
-    def drop_table(self, table_name: str) -> bool:
+    def drop_table(self, table_name: Union[str, Iterable[str]]) -> bool:
         """
-        Drop a table
+        Drop a table, or several in one script
 
         Args:
-            table_name: Table name to drop
+            table_name: Table name, or an iterable of table names, to drop
 
         Returns:
             True if successful
         """
+        self._write_epoch += 1
+        names = [table_name] if isinstance(table_name, str) else list(table_name)
         try:
-            self.cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-            self.conn.commit()
-            logger.info(f"Dropped table '{table_name}'")
+            self.conn.executescript(
+                "BEGIN; " + "".join(f"DROP TABLE IF EXISTS {_quote(name)}; " for name in names) + "COMMIT;"
+            )
+            logger.info(f"Dropped table(s) {', '.join(repr(name) for name in names)}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to drop table: {e}")
+            self.conn.rollback()
             return False
 
     def vacuum(self) -> bool:
@@ -239,19 +405,29 @@ class SQLiteHandler:
             logger.error(f"Failed to get row count: {e}")
             return 0
 
-    def backup(self, backup_path: str) -> bool:
+    def backup(self, backup_path: str, progress: Optional[Callable[[int, int, int], None]] = None) -> bool:
         """
         Create a backup of the database
 
+        Uses SQLite's online backup API, which copies a consistent snapshot
+        page by page (including pages still in the WAL file) and skips
+        free pages, instead of copying the live file.
+
         Args:
             backup_path: Path for backup file
+            progress: Optional callback(status, remaining, total) run after each step
 
         Returns:
             True if successful
         """
         try:
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            target = sqlite3.connect(backup_path)
+            try:
+                self.conn.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+                # The copy inherits WAL mode; fold everything into the main file
+                target.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                target.close()
             logger.info(f"Database backed up to {backup_path}")
             return True
 
@@ -260,9 +436,11 @@ class SQLiteHandler:
             return False
 
     def close(self):
-        """Close database connection"""
+        """Close database connection, first letting SQLite refresh its query planner statistics"""
         if self.conn:
+            self.conn.execute("PRAGMA optimize")
             self.conn.close()
+            self.conn = None
             logger.info("SQLite connection closed")
 
     def __enter__(self):
@@ -1,14 +1,38 @@
 """
 NER Processor - Named Entity Recognition for text extraction
 """
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from loguru import logger
+import os
 import re
 
+# spaCy components batch_process does not need for entities
+NER_UNUSED_PIPES = ("parser", "lemmatizer")
+
+# batch_process only forks spaCy worker processes for at least this many texts
+PARALLEL_MIN_TEXTS = 1000
+
 
 class NERProcessor:
     """Process text for Named Entity Recognition"""
 
+    # Regex fallback patterns, compiled once. Each is scanned separately: a single
+    # alternation would drop overlapping matches (e.g. an email inside a URL)
+    _REGEX_PATTERNS = {
+        "EMAIL": re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+        # US format
+        "PHONE": re.compile(r'\b(?:\+?1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b'),
+        "URL": re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'),
+        # Simple formats
+        "DATE": re.compile(
+            r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b',
+            re.IGNORECASE
+        ),
+        "MONEY": re.compile(r'\$\s?\d+(?:,\d{3})*(?:\.\d{2})?'),
+        "PERCENTAGE": re.compile(r'\b\d+(?:\.\d+)?%'),
+    }
+
     def __init__(self, use_spacy: bool = True):
         """
         Initialize NER processor
@@ -57,21 +81,19 @@ class NERProcessor:
         Returns:
             Dictionary of entities by type
         """
-        doc = self.nlp(text)
+        entities = self._entities_from_doc(self.nlp(text))
+        logger.info(f"Extracted {sum(len(v) for v in entities.values())} entities using spaCy")
+        return entities
 
-        entities = {}
+    @staticmethod
+    def _entities_from_doc(doc) -> Dict[str, List[str]]:
+        """Collect a parsed spaCy doc's entities by type, without duplicates"""
+        # Dicts as ordered sets: O(1) membership instead of scanning a growing list
+        entities = defaultdict(dict)
         for ent in doc.ents:
-            entity_type = ent.label_
-            entity_text = ent.text.strip()
-
-            if entity_type not in entities:
-                entities[entity_type] = []
-
-            if entity_text not in entities[entity_type]:
-                entities[entity_type].append(entity_text)
+            entities[ent.label_][ent.text.strip()] = None
 
-        logger.info(f"Extracted {sum(len(v) for v in entities.values())} entities using spaCy")
-        return entities
+        return {entity_type: list(texts) for entity_type, texts in entities.items()}
 
     def _extract_with_regex(self, text: str) -> Dict[str, List[str]]:
         """
@@ -83,42 +105,14 @@ class NERProcessor:
         Returns:
             Dictionary of entities by type
         """
-        entities = {
-            "EMAIL": [],
-            "PHONE": [],
-            "URL": [],
-            "DATE": [],
-            "MONEY": [],
-            "PERCENTAGE": []
-        }
-
-        # Email pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        entities["EMAIL"] = list(set(re.findall(email_pattern, text)))
-
-        # Phone pattern (US format)
-        phone_pattern = r'\b(?:\+?1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b'
-        entities["PHONE"] = list(set(re.findall(phone_pattern, text)))
-        entities["PHONE"] = ["-".join(match) if isinstance(match, tuple) else match for match in entities["PHONE"]]
-
-        # URL pattern
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        entities["URL"] = list(set(re.findall(url_pattern, text)))
-
-        # Date pattern (simple formats)
-        date_pattern = r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b'
-        entities["DATE"] = list(set(re.findall(date_pattern, text, re.IGNORECASE)))
-
-        # Money pattern
-        money_pattern = r'\$\s?\d+(?:,\d{3})*(?:\.\d{2})?'
-        entities["MONEY"] = list(set(re.findall(money_pattern, text)))
-
-        # Percentage pattern
-        percentage_pattern = r'\b\d+(?:\.\d+)?%'
-        entities["PERCENTAGE"] = list(set(re.findall(percentage_pattern, text)))
-
-        # Remove empty lists
-        entities = {k: v for k, v in entities.items() if v}
+        entities = {}
+        for entity_type, pattern in self._REGEX_PATTERNS.items():
+            matches = pattern.findall(text)
+            if entity_type == "PHONE":
+                matches = ["-".join(match) for match in matches]
+            if matches:
+                # dict.fromkeys dedups in O(1) per match and keeps first-seen order
+                entities[entity_type] = list(dict.fromkeys(matches))
 
         logger.info(f"Extracted {sum(len(v) for v in entities.values())} entities using regex")
         return entities
@@ -133,8 +127,11 @@ class NERProcessor:
         Returns:
             Dictionary with entities and metadata
         """
-        entities = self.extract_entities(text)
+        return self._structured(text, self.extract_entities(text))
 
+    @staticmethod
+    def _structured(text: str, entities: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Wrap extracted entities with metadata about the text"""
         return {
             "entities": entities,
             "metadata": {
@@ -160,40 +157,44 @@ class NERProcessor:
             return text
 
         doc = self.nlp(text)
-        highlighted_text = text
-
-        # Sort entities by position (reverse order to preserve indices)
-        entities = sorted(doc.ents, key=lambda e: e.start_char, reverse=True)
 
-        for ent in entities:
+        # Build the output in one forward pass instead of re-slicing the whole text per entity
+        parts = []
+        cursor = 0
+        for ent in sorted(doc.ents, key=lambda e: e.start_char):
             if entity_type and ent.label_ != entity_type:
                 continue
 
-            # Add HTML markup
-            highlighted = f'<mark data-entity="{ent.label_}">{ent.text}</mark>'
-            highlighted_text = (
-                highlighted_text[:ent.start_char] +
-                highlighted +
-                highlighted_text[ent.end_char:]
-            )
+            parts.append(text[cursor:ent.start_char])
+            parts.append(f'<mark data-entity="{ent.label_}">{ent.text}</mark>')
+            cursor = ent.end_char
+        parts.append(text[cursor:])
 
-        return highlighted_text
+        return "".join(parts)
 
-    def batch_process(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def batch_process(self, texts: List[str], batch_size: int = 64,
+                      n_process: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Process multiple texts for NER
 
+        With spaCy, texts are streamed through `nlp.pipe` in batches (with
+        the parser and lemmatizer disabled) instead of one `nlp()` call each.
+
         Args:
             texts: List of text strings
+            batch_size: Texts per spaCy batch
+            n_process: spaCy worker processes (default: one per CPU for at
+                least PARALLEL_MIN_TEXTS texts, otherwise 1)
 
         Returns:
             List of entity dictionaries
         """
-        results = []
-
-        for i, text in enumerate(texts):
-            logger.info(f"Processing text {i + 1}/{len(texts)}")
-            entities = self.extract_structured_data(text)
-            results.append(entities)
-
-        return results
+        logger.info(f"Processing {len(texts)} texts")
+        if not (self.use_spacy and self.nlp):
+            return [self._structured(text, self._extract_with_regex(text)) for text in texts]
+
+        if n_process is None:
+            n_process = (os.cpu_count() or 1) if len(texts) >= PARALLEL_MIN_TEXTS else 1
+        disable = [name for name in NER_UNUSED_PIPES if name in self.nlp.pipe_names]
+        docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disable)
+        return [self._structured(text, self._entities_from_doc(doc)) for text, doc in zip(texts, docs)]
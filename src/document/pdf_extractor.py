@@ -1,19 +1,84 @@
 """
 PDF Extractor - Extract text, tables, and metadata from PDF files
 """
+import io
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
 import pdfplumber
 import fitz  # PyMuPDF
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 import pandas as pd
 from loguru import logger
 from pathlib import Path
 
+# Below this many pages, starting worker processes costs more than parsing in-process
+PARALLEL_MIN_PAGES = 32
+
+
+# Per-page work for pdfplumber, at module level so worker processes can unpickle it
+
+def _page_text(page) -> Optional[str]:
+    return page.extract_text()
+
+
+def _page_tables(page) -> List[List[List[Any]]]:
+    return page.extract_tables()
+
+
+def _page_search(page, pattern: "re.Pattern") -> List[tuple]:
+    return _text_search(page.extract_text(), pattern)
+
+
+def _text_search(text: Optional[str], pattern: "re.Pattern") -> List[tuple]:
+    """
+    (line number, line) pairs of one page's text that match `pattern`
+
+    One regex scan over the whole page; line numbers are counted
+    incrementally between matches instead of splitting the page into lines.
+    """
+    if not text:
+        return []
+    hits = []
+    line_num, counted_to, line_end = 1, 0, -1
+    for match in pattern.finditer(text):
+        start = match.start()
+        if start <= line_end:
+            continue  # this line is already reported
+        line_num += text.count('\n', counted_to, start)
+        counted_to = start
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', start)
+        if line_end == -1:
+            line_end = len(text)
+        hits.append((line_num, text[line_start:line_end].strip()))
+    return hits
+
+
+def _run_on_pages(pdf_path: str, page_nums: List[int], page_func: Callable) -> List[Any]:
+    """Worker: open the PDF once and apply `page_func` to a slice of its pages"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page_func(pdf.pages[page_num]) for page_num in page_nums]
+
 
 class PDFExtractor:
     """Extract data from PDF documents"""
 
-    def __init__(self):
-        """Initialize PDF extractor"""
+    def __init__(self, backend: str = "pymupdf"):
+        """
+        Initialize PDF extractor
+
+        Args:
+            backend: Text engine for extract_text/search_text: 'pymupdf'
+                (MuPDF, native code, several times faster) or 'pdfplumber'
+                (pdfminer layout analysis). Tables always use pdfplumber.
+        """
+        if backend not in ("pymupdf", "pdfplumber"):
+            raise ValueError(f"Unknown PDF text backend: {backend}")
+        self._backend = backend
         logger.info("Initialized PDFExtractor")
 
     def extract_text(self, pdf_path: str, page_numbers: Optional[List[int]] = None) -> str:
@@ -28,20 +93,14 @@ class PDFExtractor:
             Extracted text as string
         """
         try:
-            text_content = []
-
-            with pdfplumber.open(pdf_path) as pdf:
-                pages = page_numbers if page_numbers else range(len(pdf.pages))
-
-                for page_num in pages:
-                    if page_num < len(pdf.pages):
-                        page = pdf.pages[page_num]
-                        text = page.extract_text()
-                        if text:
-                            text_content.append(f"--- Page {page_num + 1} ---\n{text}")
-
-            full_text = "\n\n".join(text_content)
-            logger.info(f"Extracted text from {len(text_content)} pages of {pdf_path}")
+            if self._backend == "pymupdf":
+                with fitz.open(pdf_path) as doc:
+                    full_text, page_count = self._extract_text_fitz(doc, page_numbers)
+            else:
+                with pdfplumber.open(pdf_path) as pdf:
+                    full_text, page_count = self._extract_text_from(pdf, pdf_path, page_numbers)
+
+            logger.info(f"Extracted text from {page_count} pages of {pdf_path}")
             return full_text
 
         except Exception as e:
@@ -60,22 +119,8 @@ class PDFExtractor:
             List of DataFrames, one per table found
         """
         try:
-            all_tables = []
-
             with pdfplumber.open(pdf_path) as pdf:
-                pages = page_numbers if page_numbers else range(len(pdf.pages))
-
-                for page_num in pages:
-                    if page_num < len(pdf.pages):
-                        page = pdf.pages[page_num]
-                        tables = page.extract_tables()
-
-                        for table in tables:
-                            if table and len(table) > 0:
-                                # Convert to DataFrame
-                                df = pd.DataFrame(table[1:], columns=table[0])
-                                df.attrs['page'] = page_num + 1
-                                all_tables.append(df)
+                all_tables = self._extract_tables_from(pdf, pdf_path, page_numbers)
 
             logger.info(f"Extracted {len(all_tables)} tables from {pdf_path}")
             return all_tables
@@ -95,23 +140,8 @@ class PDFExtractor:
             Dictionary with metadata
         """
         try:
-            doc = fitz.open(pdf_path)
-
-            metadata = {
-                "page_count": len(doc),
-                "file_path": pdf_path,
-                "file_size_mb": Path(pdf_path).stat().st_size / (1024 * 1024),
-                "pdf_version": doc.metadata.get("format", ""),
-                "title": doc.metadata.get("title", ""),
-                "author": doc.metadata.get("author", ""),
-                "subject": doc.metadata.get("subject", ""),
-                "creator": doc.metadata.get("creator", ""),
-                "producer": doc.metadata.get("producer", ""),
-                "creation_date": doc.metadata.get("creationDate", ""),
-                "modification_date": doc.metadata.get("modDate", ""),
-            }
-
-            doc.close()
+            with fitz.open(pdf_path) as doc:
+                metadata = self._extract_metadata_from(doc, pdf_path)
 
             logger.info(f"Extracted metadata from {pdf_path}")
             return metadata
@@ -133,11 +163,16 @@ class PDFExtractor:
         try:
             logger.info(f"Extracting all data from {pdf_path}")
 
-            result = {
-                "metadata": self.extract_metadata(pdf_path),
-                "text": self.extract_text(pdf_path),
-                "tables": self.extract_tables(pdf_path)
-            }
+            # Read the file once; both libraries parse the same in-memory bytes
+            # (BytesIO shares the buffer until written, and PyMuPDF references it)
+            data = Path(pdf_path).read_bytes()
+            with pdfplumber.open(io.BytesIO(data)) as pdf, fitz.open(stream=data, filetype="pdf") as doc:
+                result = {
+                    "metadata": self._extract_metadata_from(doc, pdf_path),
+                    "text": (self._extract_text_fitz(doc) if self._backend == "pymupdf"
+                             else self._extract_text_from(pdf, pdf_path))[0],
+                    "tables": self._extract_tables_from(pdf, pdf_path)
+                }
 
             return result
 
@@ -145,6 +180,92 @@ class PDFExtractor:
             logger.error(f"Failed to extract data from PDF: {e}")
             raise
 
+    @staticmethod
+    def _pages(page_count: int, page_numbers: Optional[List[int]]) -> List[int]:
+        """Requested page indices that exist in a document of `page_count` pages (default: all)"""
+        if not page_numbers:
+            return list(range(page_count))
+        return [page_num for page_num in page_numbers if page_num < page_count]
+
+    @staticmethod
+    def _map_pages(pdf, pdf_path: str, pages: List[int], page_func: Callable) -> List[Any]:
+        """
+        Apply `page_func` to each of `pages`, in page order
+
+        Long documents are split into one contiguous slice per CPU and parsed
+        in worker processes (pdfplumber is pure Python, so threads would not
+        help); short ones use the already open `pdf`.
+        """
+        workers = min(os.cpu_count() or 1, len(pages) // PARALLEL_MIN_PAGES)
+        if workers < 2:
+            return [page_func(pdf.pages[page_num]) for page_num in pages]
+
+        size = math.ceil(len(pages) / workers)
+        slices = [pages[start:start + size] for start in range(0, len(pages), size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_run_on_pages, repeat(pdf_path), slices, repeat(page_func))
+            return [result for chunk in results for result in chunk]
+
+    def _extract_text_from(self, pdf, pdf_path: str, page_numbers: Optional[List[int]] = None) -> tuple:
+        """
+        Extract text from an open pdfplumber document
+
+        Returns:
+            Tuple of (text, number of pages that had text)
+        """
+        text_content = []
+        pages = self._pages(len(pdf.pages), page_numbers)
+        for page_num, text in zip(pages, self._map_pages(pdf, pdf_path, pages, _page_text)):
+            if text:
+                text_content.append(f"--- Page {page_num + 1} ---\n{text}")
+        return "\n\n".join(text_content), len(text_content)
+
+    def _extract_text_fitz(self, doc, page_numbers: Optional[List[int]] = None) -> tuple:
+        """
+        Extract text from an open PyMuPDF document (in-process: MuPDF is fast enough)
+
+        Returns:
+            Tuple of (text, number of pages that had text)
+        """
+        text_content = []
+        for page_num in self._pages(len(doc), page_numbers):
+            text = doc[page_num].get_text("text").rstrip()
+            if text:
+                text_content.append(f"--- Page {page_num + 1} ---\n{text}")
+        return "\n\n".join(text_content), len(text_content)
+
+    def _extract_tables_from(self, pdf, pdf_path: str,
+                             page_numbers: Optional[List[int]] = None) -> List[pd.DataFrame]:
+        """Extract tables from an open pdfplumber document, one DataFrame per table"""
+        all_tables = []
+        pages = self._pages(len(pdf.pages), page_numbers)
+        for page_num, tables in zip(pages, self._map_pages(pdf, pdf_path, pages, _page_tables)):
+            for table in tables:
+                if table and len(table) > 0:
+                    # Convert to DataFrame
+                    df = pd.DataFrame(table[1:], columns=table[0])
+                    df.attrs['page'] = page_num + 1
+                    all_tables.append(df)
+        return all_tables
+
+    @staticmethod
+    def _extract_metadata_from(doc, pdf_path: str) -> Dict[str, Any]:
+        """Build the metadata dictionary from an open PyMuPDF document"""
+        info = doc.metadata
+        return {
+            "page_count": len(doc),
+            "file_path": pdf_path,
+            "file_size_mb": Path(pdf_path).stat().st_size / (1024 * 1024),
+            "pdf_version": info.get("format", ""),
+            "title": info.get("title", ""),
+            "author": info.get("author", ""),
+            "subject": info.get("subject", ""),
+            "creator": info.get("creator", ""),
+            "producer": info.get("producer", ""),
+            "creation_date": info.get("creationDate", ""),
+            "modification_date": info.get("modDate", ""),
+        }
+
     def search_text(self, pdf_path: str, search_term: str, case_sensitive: bool = False) -> List[Dict[str, Any]]:
         """
         Search for text in PDF and return matches with page numbers
@@ -158,29 +279,26 @@ class PDFExtractor:
             List of matches with page numbers and context
         """
         try:
-            matches = []
-
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    text = page.extract_text()
-                    if not text:
-                        continue
-
-                    # Perform search
-                    search_text = text if case_sensitive else text.lower()
-                    search_pattern = search_term if case_sensitive else search_term.lower()
-
-                    if search_pattern in search_text:
-                        # Find all occurrences
-                        lines = text.split('\n')
-                        for line_num, line in enumerate(lines):
-                            check_line = line if case_sensitive else line.lower()
-                            if search_pattern in check_line:
-                                matches.append({
-                                    "page": page_num + 1,
-                                    "line": line_num + 1,
-                                    "context": line.strip()
-                                })
+            pattern = re.compile(re.escape(search_term), 0 if case_sensitive else re.IGNORECASE)
+
+            if self._backend == "pymupdf":
+                with fitz.open(pdf_path) as doc:
+                    pages = self._pages(len(doc), None)
+                    page_hits = [_text_search(doc[page_num].get_text("text"), pattern)
+                                 for page_num in pages]
+            else:
+                # Matching happens per page (in the workers, for long documents),
+                # so only matching lines are passed back
+                page_search = partial(_page_search, pattern=pattern)
+                with pdfplumber.open(pdf_path) as pdf:
+                    pages = self._pages(len(pdf.pages), None)
+                    page_hits = self._map_pages(pdf, pdf_path, pages, page_search)
+
+            matches = [
+                {"page": page_num + 1, "line": line_num, "context": context}
+                for page_num, hits in zip(pages, page_hits)
+                for line_num, context in hits
+            ]
 
             logger.info(f"Found {len(matches)} matches for '{search_term}' in {pdf_path}")
             return matches
@@ -1,6 +1,8 @@
 """
 ETL Module - Extract, Transform, Load operations
 """
-from .load_superstore import load_and_clean_superstore, save_clean_data, filter_data
+from .load_superstore import load_and_clean_superstore, load_superstore_cached, save_clean_data, filter_data
+from .csv_reader import detect_encoding, read_csv_fast
+from .dtypes import downcast_dtypes
 
-__all__ = ['load_and_clean_superstore', 'save_clean_data', 'filter_data']
+__all__ = ['load_and_clean_superstore', 'load_superstore_cached', 'save_clean_data', 'filter_data', 'detect_encoding', 'read_csv_fast', 'downcast_dtypes']
@@ -0,0 +1,110 @@
+"""
+CSV Reader - Fast CSV parsing for user uploads
+"""
+import codecs
+import io
+import os
+from typing import List, Optional
+import pandas as pd
+from loguru import logger
+
+# Below this size pandas' C engine is as fast as spinning up pyarrow's thread pool
+PYARROW_MIN_BYTES = 10 << 20
+
+# Byte-order marks, longest first so UTF-32 LE is not mistaken for UTF-16 LE
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def detect_encoding(source, sample_size: int = 65536) -> str:
+    """
+    Guess a file's text encoding from its first `sample_size` bytes.
+
+    Checks for a byte-order mark, then whether the sample is valid UTF-8,
+    then asks charset_normalizer (if installed); "latin1" is the last resort.
+    Only the sample is read, so a mis-encoded file is not parsed twice.
+
+    Args:
+        source: File path or bytes-like buffer (e.g. `UploadedFile.getbuffer()`) to inspect
+        sample_size: Number of leading bytes to examine
+
+    Returns:
+        Encoding name usable with `open()` / `pd.read_csv`
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            sample = f.read(sample_size)
+    else:
+        sample = bytes(memoryview(source)[:sample_size])
+
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        # Incremental, so a multi-byte character cut off at the sample end is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        import charset_normalizer
+
+        best = charset_normalizer.from_bytes(sample).best()
+        if best is not None:
+            return best.encoding
+    except ImportError:
+        logger.debug("charset_normalizer not installed; assuming latin1")
+    return "latin1"
+
+
+def read_csv_fast(source, encoding: str = "utf-8", columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a CSV with pyarrow's multi-threaded parser, falling back to pandas.
+
+    Small files, and anything pyarrow cannot parse, go through pandas'
+    C engine instead.
+
+    Args:
+        source: File path or bytes-like buffer (e.g. `UploadedFile.getbuffer()`)
+        encoding: Text encoding of the file
+        columns: Only parse these columns, in this order (default: all)
+
+    Returns:
+        Parsed DataFrame
+    """
+    in_memory = not isinstance(source, (str, os.PathLike))
+    size = len(source) if in_memory else os.path.getsize(source)
+
+    def _pandas():
+        data = io.BytesIO(source) if in_memory else source
+        df = pd.read_csv(data, encoding=encoding, low_memory=False, cache_dates=True, usecols=columns)
+        return df[columns] if columns else df
+
+    if size < PYARROW_MIN_BYTES:
+        return _pandas()
+
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        table = pa_csv.read_csv(
+            pa.BufferReader(source) if in_memory else source,
+            read_options=pa_csv.ReadOptions(block_size=8 << 20, use_threads=True, encoding=encoding),
+            # Unlisted columns are skipped at parse time
+            convert_options=pa_csv.ConvertOptions(include_columns=columns) if columns else None,
+        )
+        # pyarrow types undecodable text columns as binary instead of raising;
+        # let pandas parse (and raise UnicodeDecodeError) so callers can retry
+        if any(pa.types.is_binary(field.type) for field in table.schema):
+            raise ValueError(f"text is not valid {encoding}")
+        return table.to_pandas()
+    except Exception as e:
+        logger.warning(f"pyarrow CSV parse failed, falling back to pandas: {e}")
+        return _pandas()
@@ -0,0 +1,66 @@
+"""
+Dtype Optimisation - Shrink freshly loaded DataFrames
+"""
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+
+def downcast_dtypes(
+    df: pd.DataFrame,
+    category_ratio: float = 0.5,
+    category_columns: Optional[Iterable[str]] = None,
+    numeric: bool = True
+) -> pd.DataFrame:
+    """
+    Downcast numeric columns and turn repetitive text columns into categoricals.
+
+    Integers move to the smallest type that holds their values; floats
+    only when every value survives the round trip (so money columns such
+    as 261.96 stay float64). Text columns become `category` when listed
+    in `category_columns`, or, if that is not given, when their
+    distinct/total ratio is below `category_ratio`. With `numeric=False`
+    only the categoricals are made, for frames that generated code does
+    arithmetic on (int8 * 100 overflows silently). The frame is flagged in
+    `df.attrs`, so running this again on it (or on a slice of it) is a
+    no-op.
+
+    Args:
+        df: DataFrame to shrink (modified in place)
+        category_ratio: Maximum distinct-value ratio for a text column to become categorical
+        category_columns: Columns to make categorical instead of choosing them by ratio
+        numeric: Also narrow integer and float columns
+
+    Returns:
+        The same DataFrame with smaller dtypes
+    """
+    if df.attrs.get("dtypes_downcast"):
+        return df
+
+    before = df.memory_usage(deep=True).sum()
+    if numeric:
+        for c in df.select_dtypes(include=['integer']).columns:
+            df[c] = pd.to_numeric(df[c], downcast='integer')
+        for c in df.select_dtypes(include=['floating']).columns:
+            if not isinstance(df[c].dtype, np.dtype):
+                continue  # nullable/Arrow floats are left as they are
+            values = df[c].to_numpy()
+            smaller = pd.to_numeric(df[c], downcast='float')
+            if smaller.dtype != values.dtype and np.array_equal(smaller.to_numpy().astype(values.dtype), values,
+                                                                equal_nan=True):
+                df[c] = smaller
+
+    if category_columns is not None:
+        for c in category_columns:
+            if c in df.columns:
+                df[c] = df[c].astype('category')
+    elif len(df):
+        for c in df.select_dtypes(include=['object', 'string']).columns:
+            if df[c].nunique() / len(df) < category_ratio:
+                df[c] = df[c].astype('category')
+
+    df.attrs["dtypes_downcast"] = True
+    after = df.memory_usage(deep=True).sum()
+    logger.info(f"Downcast dtypes: {before / 1024**2:.1f} MB -> {after / 1024**2:.1f} MB")
+    return df
@@ -1,4 +1,7 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
 from loguru import logger
 from datetime import datetime
@@ -7,6 +10,23 @@ from src.utils.schema import validate_schema
 # Logging setup
 logger.add("logs/etl_superstore.log", rotation="500 KB")
 
+# Superstore exports dates as e.g. 11/8/2016
+DATE_FORMAT = "%m/%d/%Y"
+
+REQUIRED_COLUMNS = ["Order Date", "Ship Date", "Sales", "Profit", "Region", "Category", "Sub-Category"]
+DATE_COLUMNS = ["Order Date", "Ship Date"]
+
+# Declared up front so read_csv builds these directly instead of converting afterwards.
+# Sales and Profit are money columns and stay float64: float32 turns 261.96 into 261.9599914...
+READ_DTYPES = {"Sales": "float64", "Profit": "float64",
+               "Region": "category", "Category": "category", "Sub-Category": "category"}
+
+# Rows per Parquet row group written by save_clean_data
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+# Low-cardinality text columns that are cheaper to hold as pandas categoricals
+CATEGORY_COLUMNS = ['Region', 'Category', 'Sub-Category', 'Segment', 'Ship Mode', 'Country', 'State', 'City']
+
 def load_and_clean_superstore(csv_path: str) -> pd.DataFrame:
     """
     Load and clean the Superstore dataset.
@@ -14,22 +34,30 @@ def load_and_clean_superstore(csv_path: str) -> pd.DataFrame:
     logger.info(f"Loading file from {csv_path}")
     
     try:
-        df = pd.read_csv(csv_path, encoding='ISO-8859-1')
+        # Check the header first: parse_dates needs the columns, and a bad file fails before the full parse
+        validate_schema(pd.read_csv(csv_path, encoding='ISO-8859-1', nrows=0), REQUIRED_COLUMNS)
+        # Dates are parsed by the CSV reader itself (explicit format keeps it on the fast path)
+        df = pd.read_csv(csv_path, encoding='ISO-8859-1', parse_dates=DATE_COLUMNS,
+                         date_format=DATE_FORMAT, dtype=READ_DTYPES)
     except Exception as e:
         logger.error(f"Failed to read CSV: {e}")
         raise
-    
-    required_cols = [
-    "Order Date", "Ship Date", "Sales", "Profit", "Region", "Category", "Sub-Category"]
-    validate_schema(df, required_cols)
 
-    # Convert dates
-    df["Order Date"] = pd.to_datetime(df["Order Date"], errors='coerce')
-    df["Ship Date"] = pd.to_datetime(df["Ship Date"], errors='coerce')
+    # read_csv leaves a column as text if any value does not match; coerce those to NaT
+    for col in DATE_COLUMNS:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format=DATE_FORMAT, cache=True, errors='coerce')
 
-    # Strip whitespace from string columns
-    str_cols = df.select_dtypes(include=['object']).columns
-    df[str_cols] = df[str_cols].apply(lambda x: x.str.strip())
+    # Strip whitespace from string columns, one vectorized .str call per column
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        df[col] = df[col].str.strip()
+    # Categoricals only need their (few) categories stripped
+    for col in df.select_dtypes(include=['category']).columns:
+        stripped = df[col].cat.categories.str.strip()
+        if stripped.is_unique:
+            df[col] = df[col].cat.rename_categories(stripped)
+        else:
+            df[col] = df[col].str.strip().astype('category')
 
     # Drop rows with missing essential values
     df.dropna(subset=["Order ID", "Sales", "Profit"], inplace=True)
@@ -38,26 +66,71 @@ def load_and_clean_superstore(csv_path: str) -> pd.DataFrame:
 
     return df
 
-def save_clean_data(df: pd.DataFrame, out_path: str):
+def load_superstore_cached(csv_path: str, cache_dir: str = "data/cache") -> pd.DataFrame:
+    """
+    Load the cleaned Superstore dataset through a Parquet sidecar.
+
+    The first load cleans the CSV and writes `<cache_dir>/<csv name>.parquet`;
+    later loads read the sidecar as long as it is newer than the CSV and
+    stores the money columns as float64 (older sidecars held float32).
+    """
+    parquet_path = os.path.join(cache_dir, f"{os.path.basename(csv_path)}.parquet")
+
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        schema = pq.read_schema(parquet_path)
+        if all(schema.field(c).type == pa.float64() for c in ("Sales", "Profit")):
+            logger.info(f"Loading cached Parquet from {parquet_path}")
+            return pd.read_parquet(parquet_path, engine="pyarrow")
+
+    df = load_and_clean_superstore(csv_path)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+        logger.info(f"Wrote Parquet cache to {parquet_path}")
+    except Exception as e:
+        logger.warning(f"Failed to write Parquet cache: {e}")
+
+    return df
+
+def save_clean_data(df: pd.DataFrame, out_path: str, *, write_csv: bool = True):
     """
-    Save cleaned DataFrame to CSV and Parquet formats.
+    Save cleaned DataFrame as zstd-compressed Parquet, and by default CSV.
+
+    Categorical columns are stored dictionary-encoded, which together with
+    zstd keeps the file small. The CSV copy is the slow part; callers that
+    only read the Parquet file can skip it with `write_csv=False`.
     """
     logger.info(f"Saving cleaned data to {out_path}")
-    
-    df.to_csv(f"{out_path}.csv", index=False)
-    df.to_parquet(f"{out_path}.parquet", index=False)
+
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), f"{out_path}.parquet",
+                   compression="zstd", compression_level=3, use_dictionary=True,
+                   row_group_size=PARQUET_ROW_GROUP_SIZE)
+    if write_csv:
+        df.to_csv(f"{out_path}.csv", index=False)
 
     logger.success("Cleaned data saved successfully.")
 
 def filter_data(df: pd.DataFrame, start_date=None, end_date=None, region=None):
     """
     Filter data by date range and region.
+
+    The conditions are combined into one boolean mask so only a single
+    filtered frame is materialised. A categorical Region (as produced by
+    `load_and_clean_superstore`) is matched on its codes, not per row.
     """
+    mask = np.ones(len(df), dtype=bool)
     if start_date:
-        df = df[df["Order Date"] >= pd.to_datetime(start_date)]
+        mask &= df["Order Date"].to_numpy() >= np.datetime64(pd.to_datetime(start_date))
     if end_date:
-        df = df[df["Order Date"] <= pd.to_datetime(end_date)]
+        mask &= df["Order Date"].to_numpy() <= np.datetime64(pd.to_datetime(end_date))
     if region:
-        df = df[df["Region"].str.lower() == region.lower()]
-    return df
+        regions = df["Region"]
+        if isinstance(regions.dtype, pd.CategoricalDtype):
+            # Lower-case the few categories, then compare the integer codes
+            matches = np.flatnonzero(regions.cat.categories.str.lower() == region.lower())
+            mask &= np.isin(regions.cat.codes.to_numpy(), matches)
+        else:
+            mask &= (regions.str.lower() == region.lower()).to_numpy()
+    return df.loc[mask]
 
@@ -2,7 +2,8 @@
 LLM Module - Language Model utilities and integrations
 """
 from .ollama_client import OllamaClient
-from .prompt_templates import PromptTemplates
+from .prompt_templates import PromptTemplates, RenderedPrompt
 from .code_executor import SafeCodeExecutor
+from .batch_dispatcher import BatchDispatcher
 
-__all__ = ['OllamaClient', 'PromptTemplates', 'SafeCodeExecutor']
+__all__ = ['OllamaClient', 'PromptTemplates', 'RenderedPrompt', 'SafeCodeExecutor', 'BatchDispatcher']
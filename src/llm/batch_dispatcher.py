@@ -0,0 +1,190 @@
+"""
+Batch Dispatcher - Coalesces concurrent LLM requests into gathered bursts
+"""
+import asyncio
+import threading
+import openai
+from typing import Optional, Dict, List, Any, Set
+from loguru import logger
+
+from .ollama_client import OllamaClient
+
+
+class BatchDispatcher:
+    """
+    Collects completion requests that arrive within a short window and sends
+    them to Ollama together.
+
+    Streamlit runs each session's script in its own thread, so the dispatcher
+    owns a background event loop; `submit` and `submit_many` are blocking
+    calls that are safe to use from any thread.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        api_key: str = "ollama",
+        window_seconds: float = 0.008,
+        max_batch: int = 16
+    ):
+        """
+        Initialize batch dispatcher
+
+        Args:
+            base_url: Base URL for Ollama server
+            api_key: API key (default: "ollama" for local)
+            window_seconds: How long to wait for more requests after the first one
+            max_batch: Maximum number of requests sent in one burst
+        """
+        self.base_url = base_url
+        self.api_key = api_key
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.stats = {"batches": 0, "requests": 0, "last_batch_size": 0, "max_batch_size": 0}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._inflight: Set[asyncio.Task] = set()  # batches still running; referenced so they are not collected
+        self._lock = threading.Lock()
+
+    def start(self) -> "BatchDispatcher":
+        """
+        Start the background event loop (idempotent)
+
+        Returns:
+            The dispatcher, for chaining
+        """
+        with self._lock:
+            if self._thread is not None:
+                return self
+
+            ready = threading.Event()
+
+            def _run():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._queue = asyncio.Queue()
+                self._loop.create_task(self._worker())
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name="llm-batch-dispatcher", daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.info(f"Started LLM batch dispatcher ({self.window_seconds * 1000:.0f} ms window)")
+        return self
+
+    def submit(
+        self,
+        prompt: str,
+        model: str = "llama3",
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.4,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Queue one completion request and wait for its answer
+
+        Args:
+            prompt: User prompt
+            model: Model name (default: llama3)
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature (0.0-1.0)
+            timeout: Seconds to wait before giving up (None waits indefinitely)
+
+        Returns:
+            Generated text completion
+        """
+        result = self.submit_many([prompt], model, system_prompt, temperature, timeout)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def submit_many(
+        self,
+        prompts: List[str],
+        model: str = "llama3",
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.4,
+        timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Queue several completion requests and wait for all answers
+
+        Args:
+            prompts: User prompts, one completion each
+            model: Model name (default: llama3)
+            system_prompt: Optional system prompt shared by all requests
+            temperature: Sampling temperature (0.0-1.0)
+            timeout: Seconds to wait before giving up (None waits indefinitely)
+
+        Returns:
+            Completions in prompt order; a failed request yields its exception
+        """
+        self.start()
+        requests = [
+            {"prompt": p, "model": model, "system_prompt": system_prompt, "temperature": temperature}
+            for p in prompts
+        ]
+        future = asyncio.run_coroutine_threadsafe(self._enqueue_all(requests), self._loop)
+        return future.result(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get batching statistics
+
+        Returns:
+            Dictionary with batch and request counts
+        """
+        return dict(self.stats)
+
+    async def _enqueue_all(self, requests: List[Dict]) -> List[Any]:
+        """Put requests on the queue and wait for their futures"""
+        futures = []
+        for request in requests:
+            future = self._loop.create_future()
+            await self._queue.put((request, future))
+            futures.append(future)
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    async def _worker(self):
+        """
+        Drain the queue in windowed batches, each gathered in its own task
+
+        The worker goes straight back to the queue after dispatching a
+        batch, so requests arriving during a slow completion start in the
+        next window instead of waiting for the whole previous batch.
+        """
+        client = openai.AsyncOpenAI(base_url=f"{self.base_url}/v1", api_key=self.api_key)
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self.window_seconds)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(batch)
+            self.stats["last_batch_size"] = len(batch)
+            self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+            logger.debug(f"Dispatching LLM batch of {len(batch)} requests")
+
+            task = self._loop.create_task(self._run_batch(client, batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, client, batch: List[tuple]):
+        """Send one batch's requests together"""
+        await asyncio.gather(*[self._complete(client, request, future) for request, future in batch])
+
+    async def _complete(self, client, request: Dict, future: asyncio.Future):
+        """Run one completion and resolve its future"""
+        kwargs = OllamaClient._chat_kwargs(
+            request["prompt"], request["model"], request["system_prompt"], request["temperature"], None, False
+        )
+        try:
+            response = await client.chat.completions.create(**kwargs)
+            future.set_result(response.choices[0].message.content)
+        except Exception as e:
+            logger.error(f"Error generating batched completion: {e}")
+            future.set_exception(e)
@@ -1,11 +1,30 @@
 """
 Ollama Client - Manages connections to local Ollama LLM server
 """
+import asyncio
+import json
+import re
+import time
 import openai
 import requests
-from typing import Optional, Dict, List
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, List, Union, Iterator
 from loguru import logger
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# A JSON answer wrapped in a markdown code fence
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+# The installed models change at human timescales; serve repeat checks from memory
+MODELS_CACHE_TTL = 30.0
+CONNECTION_CACHE_TTL = 5.0
+
 
 class OllamaClient:
     """Client for interacting with Ollama LLM server"""
@@ -21,17 +40,35 @@ class OllamaClient:
         self.base_url = base_url
         self.api_key = api_key
         self.client = openai.OpenAI(base_url=f"{base_url}/v1", api_key=api_key)
+        # Keep-alive pool for the native /api endpoints, so status checks reuse one socket
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        # (monotonic time, result) of the last check_connection / successful list_models
+        self._connection_cache: Optional[tuple] = None
+        self._models_cache: Optional[tuple] = None
         logger.info(f"Initialized Ollama client with base URL: {base_url}")
 
     def check_connection(self) -> bool:
         """
         Check if Ollama server is running and accessible
 
+        The answer is reused for CONNECTION_CACHE_TTL seconds.
+
         Returns:
             bool: True if connection is successful, False otherwise
         """
+        cached = self._connection_cache
+        if cached and time.monotonic() - cached[0] < CONNECTION_CACHE_TTL:
+            return cached[1]
+
+        connected = self._check_connection()
+        self._connection_cache = (time.monotonic(), connected)
+        return connected
+
+    def _check_connection(self) -> bool:
+        """Ask the server for its model list and report whether it answered"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 logger.success("Ollama server is running")
                 return True
@@ -49,21 +86,49 @@ class OllamaClient:
         """
         List available models on Ollama server
 
+        A successful answer is reused for MODELS_CACHE_TTL seconds; failures
+        are not cached, so a server that was just started shows up at once.
+
         Returns:
             List of model names
         """
+        cached = self._models_cache
+        if cached and time.monotonic() - cached[0] < MODELS_CACHE_TTL:
+            return list(cached[1])
+
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 models = response.json().get("models", [])
                 model_names = [model["name"] for model in models]
                 logger.info(f"Found {len(model_names)} models: {model_names}")
-                return model_names
+                now = time.monotonic()
+                self._models_cache = (now, model_names)
+                self._connection_cache = (now, True)  # same endpoint, so the server is up
+                return list(model_names)
             return []
         except Exception as e:
             logger.error(f"Error listing models: {e}")
             return []
 
+    def invalidate_cache(self):
+        """Forget cached connection and model-list results"""
+        self._connection_cache = None
+        self._models_cache = None
+
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self._session.close()
+        self.client.close()
+
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
+
     def generate_completion(
         self,
         prompt: str,
@@ -71,8 +136,9 @@ class OllamaClient:
         system_prompt: Optional[str] = None,
         temperature: float = 0.4,
         max_tokens: Optional[int] = None,
-        stream: bool = False
-    ) -> str:
+        stream: bool = False,
+        json_mode: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         Generate completion from Ollama model
 
@@ -82,38 +148,140 @@ class OllamaClient:
             system_prompt: Optional system prompt
             temperature: Sampling temperature (0.0-1.0)
             max_tokens: Maximum tokens to generate
-            stream: Whether to stream response
+            stream: Return an iterator of text chunks (see `stream_completion`)
+            json_mode: Constrain the model to emit a single JSON object
 
         Returns:
-            Generated text completion
+            Generated text completion, or an iterator of its chunks if `stream`
         """
+        kwargs = self._chat_kwargs(prompt, model, system_prompt, temperature, max_tokens, json_mode)
+        if stream:
+            return self._stream(kwargs)
+
         try:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
+            response = self.client.chat.completions.create(**kwargs)
+            return response.choices[0].message.content
 
-            kwargs = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "stream": stream
-            }
+        except Exception as e:
+            logger.error(f"Error generating completion: {e}")
+            raise
 
-            if max_tokens:
-                kwargs["max_tokens"] = max_tokens
+    def stream_completion(
+        self,
+        prompt: str,
+        model: str = "llama3",
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.4,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[str]:
+        """
+        Generate a completion and yield its text as the model produces it
 
-            response = self.client.chat.completions.create(**kwargs)
+        Callers can render or parse the answer before it is finished; to get
+        the whole text, collect the chunks and `"".join` them once.
 
-            if stream:
-                return response  # Return stream object
-            else:
-                return response.choices[0].message.content
+        Args:
+            prompt: User prompt
+            model: Model name (default: llama3)
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            json_mode: Constrain the model to emit a single JSON object
+
+        Yields:
+            Text chunks in order (empty deltas are skipped)
+        """
+        return self._stream(self._chat_kwargs(prompt, model, system_prompt, temperature, max_tokens, json_mode))
+
+    def _stream(self, kwargs: Dict) -> Iterator[str]:
+        """Run a streaming chat completion and yield the content deltas"""
+        try:
+            for chunk in self.client.chat.completions.create(stream=True, **kwargs):
+                if chunk.choices:
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        yield content
 
         except Exception as e:
-            logger.error(f"Error generating completion: {e}")
+            logger.error(f"Error streaming completion: {e}")
             raise
 
+    @staticmethod
+    def _chat_kwargs(
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool
+    ) -> Dict:
+        """Build the chat.completions.create arguments shared by both completion paths"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        kwargs = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature
+        }
+
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        return kwargs
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        model: str = "llama3",
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.4
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate completions for several prompts concurrently
+
+        The requests are sent together with asyncio.gather, so wall time is
+        close to the slowest answer rather than the sum. How many Ollama
+        actually runs at once is set by OLLAMA_NUM_PARALLEL on the server.
+
+        Args:
+            prompts: User prompts, one completion each
+            model: Model name (default: llama3)
+            system_prompt: Optional system prompt shared by all requests
+            temperature: Sampling temperature (0.0-1.0)
+
+        Returns:
+            Completions in prompt order; a failed request yields its exception
+        """
+        return asyncio.run(self._generate_batch_async(prompts, model, system_prompt, temperature))
+
+    async def _generate_batch_async(
+        self,
+        prompts: List[str],
+        model: str,
+        system_prompt: Optional[str],
+        temperature: float
+    ) -> List[Union[str, Exception]]:
+        """Send all prompts through one AsyncOpenAI client and gather the answers"""
+        async with openai.AsyncOpenAI(base_url=f"{self.base_url}/v1", api_key=self.api_key) as client:
+            async def _one(prompt: str) -> str:
+                kwargs = self._chat_kwargs(prompt, model, system_prompt, temperature, None, False)
+                response = await client.chat.completions.create(**kwargs)
+                return response.choices[0].message.content
+
+            results = await asyncio.gather(*[_one(p) for p in prompts], return_exceptions=True)
+
+        for prompt, result in zip(prompts, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error generating completion for batch prompt {prompt[:50]!r}: {result}")
+        return results
+
     def generate_structured_output(
         self,
         prompt: str,
@@ -131,28 +299,26 @@ class OllamaClient:
         Returns:
             Parsed JSON dictionary
         """
-        import json
-
         system_prompt = "You are a helpful assistant that responds ONLY with valid JSON. No other text."
 
         response = self.generate_completion(
             prompt=prompt,
             model=model,
             system_prompt=system_prompt,
-            temperature=temperature
+            temperature=temperature,
+            json_mode=True
         )
 
         try:
             # Try to extract JSON from markdown code blocks
-            import re
-            match = re.search(r"```(?:json)?\s*(.*?)\s*```", response, re.DOTALL)
+            match = _JSON_FENCE_RE.search(response)
             if match:
                 json_str = match.group(1)
             else:
                 json_str = response
 
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
+            return _json_loads(json_str)
+        except ValueError as e:  # json and orjson decode errors are both ValueErrors
             logger.error(f"Failed to parse JSON response: {e}")
             logger.debug(f"Response was: {response}")
             raise ValueError(f"Model did not return valid JSON: {e}")
@@ -1,12 +1,380 @@
 """
 Prompt Templates - Reusable prompt templates for different tasks
 """
-from typing import Dict, List, Optional
+import csv
+import hashlib
+import inspect
+import io
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+# DataFrames whose derived prompt pieces (sample rows, null counts) are remembered
+DF_CACHE_SIZE = 32
+
+# id(df) -> (weakref to df, (shape, dtypes), {piece name: text})
+_df_cache: "OrderedDict[int, tuple]" = OrderedDict()
+_df_cache_lock = threading.Lock()
+
+# Schemas whose rendered dtype text is remembered
+DTYPE_CACHE_SIZE = 64
+
+# Wider frames render their "- col: dtype" lines with NumPy string ops
+VECTORIZE_MIN_COLUMNS = 32
+
+# (column labels, dtypes) -> ("- col: dtype" lines, dtypes.to_string())
+_dtype_cache: "OrderedDict[tuple, Tuple[str, str]]" = OrderedDict()
+
+# Bound once; formats the "- column: dtype" lines of wide frames without per-line f-string setup
+_COLUMN_LINE = "- {}: {}".format
+
+# Template -> arguments that vary between otherwise identical prompts (masked in structural keys)
+STRUCTURAL_SLOTS = {
+    "data_analysis_prompt": ("user_query",),
+    "sql_generation_prompt": ("natural_query",),
+}
+
+
+# Static instruction blocks. Each template starts with one of these, byte-identical
+# on every call, followed by the dataset/schema block and then the user's question;
+# send the block as a (cacheable) system message and the rest as the user message.
+DATA_ANALYSIS_INSTRUCTIONS = """You are a helpful data analyst assistant. Analyze the dataset below and answer the user's question.
+
+IMPORTANT INSTRUCTIONS:
+- Use the DataFrame `df` already loaded in memory. DO NOT use pd.read_csv() or load data.
+- Write Python code using pandas to answer the question.
+- Store the final result in a variable named `result`.
+- Keep code concise and efficient.
+- If visualization is needed, use plotly or matplotlib.
+
+Provide your answer in the following format:
+1. Brief explanation of your approach
+2. Python code in a ```python``` code block
+3. Expected output description
+"""
+
+ETL_TASK_INSTRUCTIONS = """You are an ETL specialist. Plan and execute the data transformation task below.
+
+Provide a step-by-step plan with Python code to:
+1. Load the necessary data
+2. Transform/clean the data
+3. Save to the requested output format
+
+Format your response with:
+- Clear step descriptions
+- Python code in ```python``` blocks
+- Error handling considerations
+"""
+
+SQL_GENERATION_INSTRUCTIONS = """You are a SQL expert. Convert the natural language query below to SQL in the given dialect.
+
+Provide:
+1. The SQL query in a ```sql``` code block
+2. Brief explanation of what the query does
+3. Any assumptions made
+"""
+
+DATA_QUALITY_INSTRUCTIONS = """Analyze the data quality of the dataset below and provide recommendations.
+
+Please provide:
+1. Data quality issues identified
+2. Recommended cleaning steps
+3. Python code to fix issues (in ```python``` blocks)
+4. Validation checks to ensure quality
+"""
+
+# Plain string (not an f-string), so the JSON braces need no escaping or formatting per call
+_ROUTING_SUFFIX = """Respond with ONLY a valid JSON object in this format:
+{
+    "selected_agent": "agent_name",
+    "reasoning": "brief explanation",
+    "task_breakdown": [
+        {"step": "step description", "agent": "etl|query|profile", "operation": "load|filter|transform|save|null"}
+    ]
+}
+
+Use "operation" only for etl steps; set it to null otherwise.
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class RenderedPrompt:
+    """
+    A prompt split into a shared preamble and a per-call body
+
+    Equality and hashing use `fingerprint` (a digest of both parts), so
+    batchers can dedupe prompts without comparing the full strings.
+    `str(prompt)` gives the single-string form.
+    """
+    preamble: str = field(compare=False)
+    body: str = field(compare=False, repr=False)
+    fingerprint: bytes = field(default=b"", repr=False)
+
+    def __post_init__(self):
+        if not self.fingerprint:
+            digest = hashlib.sha256(self.preamble.encode())
+            digest.update(b"\n")
+            digest.update(self.body.encode())
+            object.__setattr__(self, "fingerprint", digest.digest())
+
+    def __str__(self) -> str:
+        return self.preamble + "\n" + self.body
+
+
+def _head_csv(df: pd.DataFrame, n: int) -> str:
+    """
+    `df.head(n).to_csv(index=False)`, written with the csv module when possible
+
+    For plain int/float64/bool/text columns without missing values the output
+    is identical and several times faster, since pandas' per-column
+    formatters are skipped. Anything else (dates, categoricals, nulls,
+    MultiIndex columns) goes through pandas.
+    """
+    head = df.head(n)
+    plain = (
+        not isinstance(head.columns, pd.MultiIndex)
+        # float32 is excluded: pandas prints it at float32 precision, Python floats would not
+        and all(dtype.kind in "iubO" or dtype == "float64" or pd.api.types.is_string_dtype(dtype)
+                for dtype in head.dtypes)
+        and not head.isna().to_numpy().any()
+    )
+    if not plain:
+        return head.to_csv(index=False)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(head.columns)
+    writer.writerows(head.to_numpy(dtype=object).tolist())
+    return buf.getvalue()
+
+
+def _call_digest(value: Any) -> Any:
+    """Stand-in for a `cached_call` argument in its key: DataFrames become shape, columns and a content hash"""
+    if isinstance(value, pd.DataFrame):
+        content = hashlib.sha256(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes()).hexdigest()
+        return ("DataFrame", value.shape, tuple(map(str, value.columns)), content)
+    return value
+
+
+def _slot_hole(index: int) -> str:
+    """Placeholder marking where slot `index` appears in a masked prompt"""
+    return f"\x00<SLOT{index}>\x00"
+
+
+def _structural_key(template_id: str, static_tokens: str, var_slots: tuple) -> str:
+    """
+    Cache key for a prompt structure plus its variable values
+
+    Args:
+        template_id: Template name
+        static_tokens: SHA-256 of the prompt with its variable slots masked
+        var_slots: Variable values, exactly as given
+    """
+    digest = hashlib.sha256(repr((static_tokens, var_slots)).encode()).hexdigest()
+    return f"structural:{template_id}:{digest}"
+
+
+def _column_lines(dtypes: pd.Series) -> str:
+    """
+    Render "- col: dtype" lines for a `df.dtypes` Series
+
+    On wide frames each distinct dtype is stringified once (str(dtype) is
+    the bulk of the cost) and the lines are assembled with np.char.add.
+    """
+    if len(dtypes) <= VECTORIZE_MIN_COLUMNS:
+        return "\n".join(itertools.starmap(_COLUMN_LINE, dtypes.items()))
+
+    codes, uniques = pd.factorize(dtypes.to_numpy())
+    names = np.array([str(dtype) for dtype in uniques])[codes]
+    labels = np.array(list(map(str, dtypes.index)))
+    return "\n".join(np.char.add(np.char.add("- ", labels), np.char.add(": ", names)).tolist())
+
+
+def _dtype_render(df: pd.DataFrame) -> Tuple[str, str]:
+    """
+    Return `df`'s dtypes rendered as "- col: dtype" lines and as `dtypes.to_string()`
+
+    Keyed on the schema itself (labels and dtype objects, not their
+    strings), so frames sharing a schema - copies, filtered views - render
+    it once.
+    """
+    dtypes = df.dtypes
+    key = (tuple(dtypes.index), tuple(dtypes))
+    with _df_cache_lock:
+        rendered = _dtype_cache.get(key)
+        if rendered is not None:
+            _dtype_cache.move_to_end(key)
+            return rendered
+
+    rendered = (_column_lines(dtypes), dtypes.to_string())
+    with _df_cache_lock:
+        _dtype_cache[key] = rendered
+        if len(_dtype_cache) > DTYPE_CACHE_SIZE:
+            _dtype_cache.popitem(last=False)
+    return rendered
+
+
+def _df_piece(df: pd.DataFrame, name: Any, compute: Callable[[], str]) -> str:
+    """
+    Return the prompt piece `name` for `df`, computing it on first use
+
+    Pieces are reused while the same frame object keeps its shape and
+    dtypes, so repeated questions about one DataFrame skip the column
+    scans. (The weakref guards against a recycled id; edits that keep the
+    shape and dtypes are not detected.)
+    """
+    fingerprint = (df.shape, tuple(df.dtypes))
+    key = id(df)
+    with _df_cache_lock:
+        entry = _df_cache.get(key)
+        if entry is None or entry[0]() is not df or entry[1] != fingerprint:
+            entry = (weakref.ref(df), fingerprint, {})
+            _df_cache[key] = entry
+            if len(_df_cache) > DF_CACHE_SIZE:
+                _df_cache.popitem(last=False)
+        else:
+            _df_cache.move_to_end(key)
+        pieces = entry[2]
+        if name in pieces:
+            return pieces[name]
+
+    value = compute()
+    with _df_cache_lock:
+        pieces[name] = value
+    return value
+
 
 class PromptTemplates:
-    """Collection of prompt templates for various data tasks"""
+    """
+    Collection of prompt templates for various data tasks
+
+    The analysis, ETL, SQL and quality prompts begin with a static
+    instruction block (the *_INSTRUCTIONS constants) so provider-side
+    prompt caching can reuse that prefix; only the tail changes per call.
+    """
+
+    @staticmethod
+    def cached_call(
+        cache_manager,
+        template_fn: Callable[..., str],
+        llm_call: Callable[[str], str],
+        *args,
+        backend: str = "disk",
+        **kwargs
+    ) -> str:
+        """
+        Build a prompt and ask the LLM, reusing the answer for identical inputs
+
+        The cache key is a SHA-256 of the template name and its arguments
+        (DataFrames by content), so a hit skips both building the prompt
+        and the LLM round trip.
+
+        Args:
+            cache_manager: CacheManager that stores the responses
+            template_fn: Template method, e.g. PromptTemplates.data_analysis_prompt
+            llm_call: Sends a prompt to the model and returns its answer
+            *args: Positional arguments for `template_fn`
+            backend: CacheManager backend ('memory', 'disk', or 'auto')
+            **kwargs: Keyword arguments for `template_fn`
+
+        Returns:
+            LLM response text
+
+        Example:
+            answer = PromptTemplates.cached_call(
+                cache, PromptTemplates.data_analysis_prompt, client.generate_completion, df, "Top 5 products?"
+            )
+        """
+        key_parts = (
+            template_fn.__qualname__,
+            tuple(_call_digest(arg) for arg in args),
+            tuple(sorted((name, _call_digest(value)) for name, value in kwargs.items())),
+        )
+        key = "prompt:" + hashlib.sha256(repr(key_parts).encode()).hexdigest()
+
+        response = cache_manager.get(key, backend=backend)
+        if response is None:
+            response = llm_call(template_fn(*args, **kwargs))
+            cache_manager.set(key, response, backend=backend)
+        return response
+
+    @staticmethod
+    def build_with_structural_cache(
+        cache_manager,
+        template_fn: Callable[..., str],
+        llm_call: Callable[[str], str],
+        *args,
+        backend: str = "disk",
+        **kwargs
+    ) -> str:
+        """
+        Ask the LLM through a cache keyed on prompt structure
+
+        The variable arguments listed in STRUCTURAL_SLOTS (the user's
+        question) are masked out of the prompt before hashing and keyed
+        separately, exactly as given. The answer is cached verbatim: it
+        usually contains code, and rewriting text inside it (say, to echo a
+        differently cased question) could change what the code does.
+
+        Args:
+            cache_manager: CacheManager that stores the response templates
+            template_fn: Template method listed in STRUCTURAL_SLOTS
+            llm_call: Sends a prompt to the model and returns its answer
+            *args: Positional arguments for `template_fn`
+            backend: CacheManager backend ('memory', 'disk', or 'auto')
+            **kwargs: Keyword arguments for `template_fn`
+
+        Returns:
+            LLM response text
+        """
+        template_id = template_fn.__name__
+        bound = inspect.signature(template_fn).bind(*args, **kwargs)
+        bound.apply_defaults()
+        slot_values = [str(bound.arguments[name]) for name in STRUCTURAL_SLOTS[template_id]]
+
+        masked = bound.arguments.copy()
+        for i, name in enumerate(STRUCTURAL_SLOTS[template_id]):
+            masked[name] = _slot_hole(i)
+        static_tokens = hashlib.sha256(template_fn(**masked).encode()).hexdigest()
+        key = _structural_key(template_id, static_tokens, tuple(slot_values))
+
+        response = cache_manager.get(key, backend=backend)
+        if response is None:
+            response = llm_call(template_fn(*bound.args, **bound.kwargs))
+            cache_manager.set(key, response, backend=backend)
+        return response
+
+    @staticmethod
+    def batch_render(requests: Iterable[tuple]) -> Tuple[Dict[str, List[int]], List[str]]:
+        """
+        Render a batch of prompts, grouping byte-identical ones
+
+        Many users asking the same question about the same frame produce the
+        same prompt; the caller can send each unique prompt once (asking for
+        `n=len(indices)` generations where the provider supports it) and
+        scatter the answers back by index.
+
+        Args:
+            requests: (template_fn, args) or (template_fn, args, kwargs) tuples
+
+        Returns:
+            Tuple of ({prompt: [request indices]}, unique prompts in first-seen order)
+
+        Example:
+            groups, prompts = PromptTemplates.batch_render(
+                [(PromptTemplates.data_analysis_prompt, (df, q)) for q in questions]
+            )
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, (template_fn, args, *rest) in enumerate(requests):
+            prompt = template_fn(*args, **(rest[0] if rest else {}))
+            groups.setdefault(prompt, []).append(index)
+        return groups, list(groups)
 
     @staticmethod
     def data_analysis_prompt(
@@ -25,38 +393,74 @@ class PromptTemplates:
         Returns:
             Formatted prompt string
         """
-        df_sample_csv = df.head(sample_rows).to_csv(index=False)
-        column_info = "\n".join([f"- {col}: {dtype}" for col, dtype in df.dtypes.items()])
+        buf = io.StringIO()
+        PromptTemplates.data_analysis_prompt_stream(df, user_query, buf, sample_rows)
+        return buf.getvalue()
 
-        return f"""You are a helpful data analyst assistant. Analyze the following dataset and answer the user's question.
+    @staticmethod
+    def data_analysis_prompt_stream(
+        df: pd.DataFrame,
+        user_query: str,
+        out: IO[str],
+        sample_rows: int = 10
+    ):
+        """
+        Write the data analysis prompt to `out` section by section
 
-Dataset Information:
-- Total Rows: {len(df)}
-- Total Columns: {len(df.columns)}
+        Lets callers with a streaming request body (or a file) receive a
+        large prompt - wide schemas, long samples - without it first being
+        assembled into one string.
 
-Column Details:
-{column_info}
+        Args:
+            df: DataFrame to analyze
+            user_query: User's question
+            out: Text stream the prompt is written to
+            sample_rows: Number of sample rows to include
+        """
+        out.write(DATA_ANALYSIS_INSTRUCTIONS)
+        out.write("\n")
+        PromptTemplates._write_analysis_body(df, user_query, out, sample_rows)
 
-Sample Data (first {sample_rows} rows):
-```csv
-{df_sample_csv}
-```
+    @staticmethod
+    def data_analysis_prompt_parts(
+        df: pd.DataFrame,
+        user_query: str,
+        sample_rows: int = 10
+    ) -> RenderedPrompt:
+        """
+        Generate the data analysis prompt as a shared preamble and a per-question body
 
-IMPORTANT INSTRUCTIONS:
-- Use the DataFrame `df` already loaded in memory. DO NOT use pd.read_csv() or load data.
-- Write Python code using pandas to answer the question.
-- Store the final result in a variable named `result`.
-- Keep code concise and efficient.
-- If visualization is needed, use plotly or matplotlib.
+        The preamble is the same string object on every call, so batch
+        callers can send it once (e.g. as BatchDispatcher's shared
+        `system_prompt`) instead of repeating it in each prompt.
 
-User's Question:
-{user_query}
+        Args:
+            df: DataFrame to analyze
+            user_query: User's question
+            sample_rows: Number of sample rows to include
 
-Provide your answer in the following format:
-1. Brief explanation of your approach
-2. Python code in a ```python``` code block
-3. Expected output description
-"""
+        Returns:
+            RenderedPrompt of DATA_ANALYSIS_INSTRUCTIONS and the dataset and question block
+        """
+        body = io.StringIO()
+        PromptTemplates._write_analysis_body(df, user_query, body, sample_rows)
+        return RenderedPrompt(DATA_ANALYSIS_INSTRUCTIONS, body.getvalue())
+
+    @staticmethod
+    def _write_analysis_body(df: pd.DataFrame, user_query: str, out: IO[str], sample_rows: int):
+        """Write the dataset and question block of the data analysis prompt to `out`"""
+        df_sample_csv = _df_piece(df, ("sample_csv", sample_rows),
+                                  lambda: _head_csv(df, sample_rows))
+        column_info = _dtype_render(df)[0]
+
+        out.write(f"Dataset Information:\n- Total Rows: {len(df)}\n- Total Columns: {len(df.columns)}\n\n")
+        out.write("Column Details:\n")
+        out.write(column_info)
+        out.write(f"\n\nSample Data (first {sample_rows} rows):\n```csv\n")
+        out.write(df_sample_csv)
+        out.write("\n```\n\nUser's Question:\n")
+        out.write(user_query)
+        out.write("\n")
 
     @staticmethod
     def etl_task_prompt(
@@ -75,27 +479,16 @@ Provide your answer in the following format:
         Returns:
             Formatted prompt string
         """
-        files_list = "\n".join([f"- {file}" for file in available_files])
-
-        return f"""You are an ETL specialist. Plan and execute the following data transformation task.
+        files_list = "\n".join(f"- {file}" for file in available_files)
 
+        return ETL_TASK_INSTRUCTIONS + f"""
 Available Data Files:
 {files_list}
 
-Task Description:
-{task_description}
-
 Output Format: {output_format}
 
-Provide a step-by-step plan with Python code to:
-1. Load the necessary data
-2. Transform/clean the data
-3. Save to {output_format} format
-
-Format your response with:
-- Clear step descriptions
-- Python code in ```python``` blocks
-- Error handling considerations
+Task Description:
+{task_description}
 """
 
     @staticmethod
@@ -115,24 +508,16 @@ Format your response with:
         Returns:
             Formatted prompt string
         """
-        schema_text = ""
-        for table, schema in table_schema.items():
-            schema_text += f"\nTable: {table}\n{schema}\n"
+        schema_text = "".join(f"\nTable: {table}\n{schema}\n" for table, schema in table_schema.items())
 
-        return f"""You are a SQL expert. Convert the following natural language query to {dialect} SQL.
+        return SQL_GENERATION_INSTRUCTIONS + f"""
+SQL Dialect: {dialect}
 
 Database Schema:
 {schema_text}
 
 Natural Language Query:
 {natural_query}
-
-Provide:
-1. The SQL query in a ```sql``` code block
-2. Brief explanation of what the query does
-3. Any assumptions made
-
-SQL Dialect: {dialect}
 """
 
     @staticmethod
@@ -146,12 +531,20 @@ SQL Dialect: {dialect}
         Returns:
             Formatted prompt string
         """
-        null_counts = df.isnull().sum()
-        null_info = "\n".join([f"- {col}: {count} nulls ({count/len(df)*100:.1f}%)"
-                               for col, count in null_counts.items() if count > 0])
-
-        return f"""Analyze the data quality of this dataset and provide recommendations.
-
+        def _null_info() -> str:
+            # Count only the columns that have nulls; the rest never reach Python
+            has_null = df.isna().any(axis=0).to_numpy()
+            if not has_null.any():
+                return ""
+            nulls = df.loc[:, has_null].isna().sum()
+            pcts = nulls.to_numpy() * (100.0 / len(df))
+            return "\n".join(f"- {col}: {count} nulls ({pct:.1f}%)"
+                             for col, count, pct in zip(nulls.index, nulls.to_numpy(), pcts))
+
+        null_info = _df_piece(df, "null_info", _null_info)
+        dtypes_text = _dtype_render(df)[1]
+
+        return DATA_QUALITY_INSTRUCTIONS + f"""
 Dataset Information:
 - Total Rows: {len(df)}
 - Total Columns: {len(df.columns)}
@@ -161,13 +554,7 @@ Null Values:
 {null_info if null_info else "- No null values found"}
 
 Data Types:
-{df.dtypes.to_string()}
-
-Please provide:
-1. Data quality issues identified
-2. Recommended cleaning steps
-3. Python code to fix issues (in ```python``` blocks)
-4. Validation checks to ensure quality
+{dtypes_text}
 """
 
     @staticmethod
@@ -205,9 +592,9 @@ Include the code in a ```python``` block.
         Returns:
             Formatted prompt string
         """
-        agents_list = "\n".join([f"- {agent}" for agent in available_agents])
+        agents_list = "\n".join(f"- {agent}" for agent in available_agents)
 
-        return f"""You are a task router. Analyze the user request and determine which agent should handle it.
+        return f"""You are a task router. Analyze the user request, break it into steps and tag each step with the agent that should handle it.
 
 Available Agents:
 {agents_list}
@@ -215,10 +602,4 @@ Available Agents:
 User Request:
 {user_request}
 
-Respond with ONLY a valid JSON object in this format:
-{{
-    "selected_agent": "agent_name",
-    "reasoning": "brief explanation",
-    "task_breakdown": ["step1", "step2", "step3"]
-}}
-"""
+""" + _ROUTING_SUFFIX
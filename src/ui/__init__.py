@@ -0,0 +1,5 @@
+"""
+UI Module - Streamlit renderers for the app's interface modes
+
+Modes are imported on demand by main.py so each page only loads what it uses.
+"""
@@ -0,0 +1,291 @@
+"""
+LLM Mode - upload a dataset and query it with a local model
+"""
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import openai
+import pandas as pd
+import pyarrow.csv as pacsv
+import streamlit as st
+
+from src.llm.batch_dispatcher import BatchDispatcher
+
+OLLAMA_HOST = "http://localhost:11434"
+OLLAMA_BASE_URL = f"{OLLAMA_HOST}/v1"
+_CODE_BLOCK_RE = re.compile(r"```python(.*?)```", re.DOTALL)
+SYSTEM_PROMPT = "You are a helpful data analyst. Respond with brief insight and Python code (pandas only)."
+
+# Seconds between re-renders of a streaming answer; each render re-sends the whole text
+STREAM_RENDER_INTERVAL = 0.05
+
+# Uploads are written to input_docs/ here while the preview is parsed from memory
+_SAVE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload-save")
+
+
+def _csv_preview(source, encoding: str) -> pd.DataFrame:
+    """
+    Parse only the first ~64 KB block of a CSV for the preview table.
+
+    Memory stays bounded by one block no matter how large the upload is.
+    """
+    reader = pacsv.open_csv(source, read_options=pacsv.ReadOptions(block_size=1 << 16, encoding=encoding))
+    try:
+        first = reader.read_next_batch()
+    except StopIteration:
+        return pd.DataFrame(columns=reader.schema.names)
+    finally:
+        reader.close()
+    return first.to_pandas()
+
+
+def _save_upload(path: str, data: memoryview):
+    """
+    Write the uploaded buffer to `path` in one write, without copying it first.
+    """
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _read_upload(path: str, encoding: str = None) -> pd.DataFrame:
+    """
+    Read the saved upload in full, once it is actually needed.
+    """
+    if path.endswith(".csv"):
+        from src.etl.csv_reader import read_csv_fast
+
+        return read_csv_fast(path, encoding=encoding)
+    return pd.read_excel(path)
+
+
+@st.cache_resource(show_spinner=False)
+def _batch_dispatcher():
+    """
+    Shared dispatcher that coalesces questions from all sessions into bursts.
+    """
+    return BatchDispatcher(base_url=OLLAMA_HOST).start()
+
+
+def _uploaded_df() -> pd.DataFrame:
+    """
+    Return the full uploaded frame, reading it on first use.
+    """
+    if "user_uploaded_df" not in st.session_state:
+        # The saved copy must be complete before reading it back; re-raises a failed save
+        st.session_state["user_uploaded_save"].result()
+        st.session_state["user_uploaded_df"] = _read_upload(*st.session_state["user_uploaded_source"])
+    return st.session_state["user_uploaded_df"]
+
+
+def _build_prompt(df: pd.DataFrame, question: str) -> str:
+    """
+    Build the analysis prompt for one question about `df`.
+    """
+    # Compact JSON records: fewer prompt tokens than a CSV dump of the same rows
+    df_sample = json.dumps(df.head(5).to_dict(orient="records"), default=str, separators=(",", ":"))
+    column_names = ", ".join(df.columns)
+
+    return f"""
+                            You are a helpful data assistant. Analyze the following tabular data and answer the user's question.
+
+                            Available columns in the dataset:
+                            {column_names}
+
+                            Use the DataFrame `df` already loaded in memory. Do NOT use `pd.read_csv`.
+
+                            Here are the first 5 rows of the dataset (JSON records):
+                            {df_sample}
+
+                            User's Question:
+                            {question}
+
+                            Give your answer in markdown format. If writing Python code, store the final result in a variable named `result`.
+                        """
+
+
+def render():
+    """
+    Render the LLM Mode expander: file upload, model picker and question box.
+    """
+    with st.expander("🧠 LLM-Powered Smart Querying", expanded=True):
+        # One keep-alive connection pool and client per session, reused across reruns.
+        # (No http2: that needs the optional h2 package, and Ollama serves HTTP/1.1.)
+        if "ollama_http" not in st.session_state:
+            st.session_state.ollama_http = httpx.Client(
+                base_url=OLLAMA_BASE_URL,
+                limits=httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0),
+                timeout=httpx.Timeout(300.0, connect=10.0),
+            )
+        if "oai_client" not in st.session_state:
+            st.session_state.oai_client = openai.OpenAI(
+                base_url=OLLAMA_BASE_URL,
+                api_key="ollama",
+                http_client=st.session_state.ollama_http
+            )
+
+        st.markdown("## 🤖 Ask Questions About Your Data")
+
+        # ✅ File Upload Block Starts Here
+        st.markdown("---")
+        st.subheader("📂 Upload Your Data")
+        uploaded_file = st.file_uploader("Upload a CSV or Excel file", type=["csv", "xlsx"])
+
+        if uploaded_file is not None:
+            file_name = uploaded_file.name
+            save_path = os.path.join("input_docs", file_name)
+
+            is_new_upload = st.session_state.get("user_uploaded_id") != uploaded_file.file_id
+            if is_new_upload:
+                # Forget the previous file first, so a failed preview cannot leave questions answered against it
+                for key in ("user_uploaded_source", "user_uploaded_df", "user_uploaded_preview", "user_uploaded_id"):
+                    st.session_state.pop(key, None)
+
+            # Save or overwrite (once per upload) in the background; the preview
+            # below parses the in-memory bytes and does not wait for the disk
+            if is_new_upload:
+                st.session_state["user_uploaded_save"] = _SAVE_POOL.submit(
+                    _save_upload, save_path, uploaded_file.getbuffer()
+                )
+
+            # Preview the uploaded file (first block only, once per upload, reused across reruns)
+            try:
+                if is_new_upload:
+                    # Parse straight from the in-memory upload rather than reading the copy back
+                    uploaded_file.seek(0)
+                    encoding = None
+                    if file_name.endswith(".csv"):
+                        # Pick the encoding up front from a bounded prefix instead of retrying on failure
+                        from src.etl.csv_reader import detect_encoding
+
+                        encoding = detect_encoding(uploaded_file.getbuffer())
+                        df_preview = _csv_preview(uploaded_file, encoding)
+                    elif file_name.endswith(".xlsx"):
+                        df_preview = pd.read_excel(uploaded_file, nrows=10)
+
+                    # The full frame is only read when a question is asked
+                    st.session_state["user_uploaded_preview"] = df_preview
+                    st.session_state["user_uploaded_source"] = (save_path, encoding)
+                    st.session_state["user_uploaded_id"] = uploaded_file.file_id
+
+                df_preview = st.session_state["user_uploaded_preview"]
+                st.dataframe(df_preview.head(10), use_container_width=True)
+            except Exception as e:
+                st.error(f"❌ Error reading file: {e}")
+
+            try:
+                st.session_state["user_uploaded_save"].result()
+                st.success(f"✅ File '{file_name}' saved to input_docs/")
+            except Exception as e:
+                st.error(f"❌ Error saving file: {e}")
+        # ✅ File Upload Block Ends Here
+
+        # 🧠 Natural Language Input for Questions
+        # 🔀 Model Selector (llama3, mistral, phi3)
+        st.markdown("---")
+        st.subheader("🧠 Select Local LLM Model")
+        llm_model = st.selectbox("Choose a local model", options=["llama3", "mistral","phi3"], index=0)
+
+        # 🧠 Natural Language Input for Questions
+        st.markdown("""
+        Type a natural language question below.  
+        **Example:**
+        - *Top 10 products by sales in California in 2020*
+        - *Show total profit by region between Jan 2020 and Jun 2020*
+        """)
+        user_query = st.text_input("🔎 Ask your question:", placeholder="e.g., What are the top 5 profitable categories in 2016?")
+
+        if st.button("💡 Generate Insight") and user_query:
+            if "user_uploaded_source" in st.session_state:
+                with st.spinner("🤖 Thinking with LLM..."):
+                    try:
+                        # Parsed here so a malformed upload shows as an error, not a traceback
+                        df = _uploaded_df()
+                        prompt = _build_prompt(df, user_query)
+
+                        response = st.session_state.oai_client.chat.completions.create(
+                            model=llm_model,
+                            messages=[
+                                {"role": "system", "content": SYSTEM_PROMPT},
+                                {"role": "user", "content": prompt}
+                            ],
+                            temperature=0.4,
+                            stream=True
+                        )
+
+                        # Render tokens as they arrive instead of waiting for the full answer
+                        st.markdown("### 🧠 LLM Insight")
+                        placeholder = st.empty()
+                        full_output = ""
+                        last_render = time.monotonic()
+                        for chunk in response:
+                            if not chunk.choices:
+                                continue
+                            full_output += chunk.choices[0].delta.content or ""
+                            now = time.monotonic()
+                            if now - last_render >= STREAM_RENDER_INTERVAL:
+                                placeholder.markdown(full_output)
+                                last_render = now
+                        placeholder.markdown(full_output)
+
+                        # ✅ Try extracting the code block from markdown
+                        match = _CODE_BLOCK_RE.search(full_output)
+                        if match:
+                            code_str = match.group(1).strip()
+                            st.markdown("### ⚙️ Executed Output")
+                            try:
+                                local_vars = {}
+                                exec(code_str, {"df": df}, local_vars)
+                                result = local_vars.get("result")
+
+                                # 📊 Display depending on type
+                                if isinstance(result, pd.DataFrame):
+                                    st.dataframe(result, use_container_width=True)
+                                elif isinstance(result, (list, tuple)):
+                                    st.write(result)
+                                elif isinstance(result, (str, int, float)):
+                                    st.success(f"✅ Result: **{result}**")
+                                else:
+                                    st.warning("⚠️ The result was computed but is not displayable.")
+                            except Exception as e:
+                                st.error(f"❌ Error running code: {e}")
+
+                        else:
+                            st.warning("⚠️ No valid Python code block was found in the response.")
+
+                    except Exception as e:
+                        st.error(f"❌ LLM Error: {e}")
+            else:
+                st.warning("📂 Please upload a dataset first.")
+
+        # 📚 Several questions at once, sent to Ollama concurrently
+        st.markdown("---")
+        batch_text = st.text_area("📚 Ask multiple questions (one per line)")
+        st.caption("Ollama answers up to `OLLAMA_NUM_PARALLEL` requests at once; set it on the `ollama serve` side.")
+
+        if st.button("📚 Generate Batch Insights") and batch_text.strip():
+            if "user_uploaded_source" in st.session_state:
+                questions = [q.strip() for q in batch_text.splitlines() if q.strip()]
+                answers = []
+                with st.spinner(f"🤖 Asking {len(questions)} questions..."):
+                    try:
+                        df = _uploaded_df()
+                        answers = _batch_dispatcher().submit_many(
+                            [_build_prompt(df, q) for q in questions],
+                            model=llm_model,
+                            system_prompt=SYSTEM_PROMPT,
+                            temperature=0.4
+                        )
+                    except Exception as e:
+                        st.error(f"❌ Error reading file: {e}")
+                for question, answer in zip(questions, answers):
+                    with st.expander(f"🧠 {question}", expanded=True):
+                        if isinstance(answer, Exception):
+                            st.error(f"❌ LLM Error: {answer}")
+                        else:
+                            st.markdown(answer)
+            else:
+                st.warning("📂 Please upload a dataset first.")
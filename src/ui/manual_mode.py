@@ -0,0 +1,177 @@
+"""
+Manual Mode - Superstore filters, preview and ETL pipeline
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from src.etl.dtypes import downcast_dtypes
+from src.etl.load_superstore import CATEGORY_COLUMNS, load_superstore_cached, save_clean_data, filter_data
+
+SUPERSTORE_PATH = "input_docs/Sample - Superstore.csv"
+_DUCK_LOCK = threading.Lock()  # the shared DuckDB connection serves one query at a time
+
+
+@st.cache_data(show_spinner=False)
+def _load_superstore(path: str, mtime: float) -> pd.DataFrame:
+    """
+    Load the cleaned Superstore data once per file version.
+
+    `mtime` is only part of the cache key so an edited file is reloaded.
+    Cold starts go through the Parquet sidecar, which keeps the parsed dates.
+    """
+    return downcast_dtypes(load_superstore_cached(path), category_columns=CATEGORY_COLUMNS)
+
+
+@st.cache_data(show_spinner=False)
+def _date_bounds(path: str, mtime: float) -> tuple:
+    """
+    Return the (min, max) Order Date of the Superstore data as dates.
+
+    Keyed like `_load_superstore` so the reduction runs once per file version.
+    """
+    col = _load_superstore(path, mtime)['Order Date']
+    return col.min().date(), col.max().date()
+
+
+@st.cache_resource(show_spinner=False)
+def _superstore_duck(path: str, mtime: float):
+    """
+    Register the cached Superstore frame as a DuckDB view, once per file version.
+
+    The view scans the pandas frame in place, so filters run in DuckDB
+    without building a boolean mask over the whole frame on every rerun.
+    """
+    import duckdb
+    con = duckdb.connect()
+    con.register("ss", _load_superstore(path, mtime))
+    return con
+
+
+@st.cache_resource(show_spinner=False)
+def _save_executor() -> ThreadPoolExecutor:
+    """
+    Shared background pool for writing cleaned data off the script thread.
+    """
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="superstore-save")
+
+
+def render():
+    """
+    Render the Manual Mode expander: date/region filters and the Superstore pipeline.
+    """
+    with st.expander("🔧 Manual ETL Controls (click to expand)", expanded=True):
+        # Keep the frame on the session so switching modes back and forth is free,
+        # tagged with the file version so an edited file replaces it
+        mtime = os.path.getmtime(SUPERSTORE_PATH)
+        cached = st.session_state.get("superstore_df")
+        if cached is None or cached[0] != mtime:
+            cached = st.session_state["superstore_df"] = (mtime, _load_superstore(SUPERSTORE_PATH, mtime))
+        df = cached[1]
+
+        min_date, max_date = _date_bounds(SUPERSTORE_PATH, mtime)
+
+        
+        st.markdown(
+    f"<h4>📅 Available Date Range in Data:</h4>"
+    f"<p style='color:#00FFAA; font-size:18px;'><b>{min_date}</b> to <b>{max_date}</b></p>",
+    unsafe_allow_html=True
+                    )
+
+        
+
+        #st.markdown(f"### 📅 Available Date Range in Data: `{min_date}` to `{max_date}`")
+
+        # Batch the inputs in a form so the script reruns once per "Apply", not per widget
+        with st.form("manual_filters", clear_on_submit=False):
+            start_date = st.date_input("Start Date", min_value=min_date, max_value=max_date, value=min_date)
+            end_date = st.date_input("End Date", min_value=min_date, max_value=max_date, value=max_date)
+
+            # Options come from the categorical's codebook, so filtering compares codes
+            region_options = [""] + list(df['Region'].cat.categories)
+            region = st.selectbox("📍 Region Filter", options=region_options)
+
+            query = st.text_input("🧠 Enter your ETL request (e.g., 'Extract sales from Q1 PDF')")
+
+            profile_now = st.checkbox("Generate data profile", value=False)
+
+            submitted = st.form_submit_button("Apply Filters")
+
+        if start_date > end_date:
+            st.warning("⚠️ Start date must be before end date.")
+            filtered_df = pd.DataFrame()  # empty
+        else:
+            # Default filtered data (datetime bounds, end date inclusive), run in DuckDB
+            start_ts = pd.Timestamp(start_date).to_pydatetime()
+            end_ts = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_pydatetime()
+            con = _superstore_duck(SUPERSTORE_PATH, mtime)
+            with _DUCK_LOCK:
+                filtered_df = con.execute(
+                    'SELECT * FROM ss WHERE "Order Date" >= ? AND "Order Date" < ? '
+                    "AND (? = '' OR Region = ?)",
+                    [start_ts, end_ts, region, region],
+                ).fetch_df()
+
+            # Bounded preview; the full CSV is only built when the download is clicked
+            st.caption(f"{len(filtered_df):,} rows")
+            preview_rows = st.slider("Preview rows", 100, 5000, 500, step=100)
+            st.dataframe(filtered_df.head(preview_rows), use_container_width=True, height=400)
+            st.download_button("⬇️ Download CSV",
+                               data=lambda data=filtered_df: data.to_csv(index=False).encode(),
+                               file_name="filtered.csv", mime="text/csv")
+
+        # Report on a save started by an earlier run
+        pending_save = st.session_state.get("pending_save")
+        if pending_save is not None:
+            if not pending_save.done():
+                st.info("💾 Saving cleaned data in the background...")
+            else:
+                st.session_state.pop("pending_save")
+                if pending_save.exception() is not None:
+                    st.error(f"❌ Failed to save cleaned data: {pending_save.exception()}")
+                else:
+                    st.toast("💾 Cleaned data saved to data/processed/")
+
+        # Same for a profile report
+        pending_profile = st.session_state.get("pending_profile")
+        if pending_profile is not None:
+            if not pending_profile.done():
+                st.info("📊 Generating the profile report in the background...")
+            else:
+                st.session_state.pop("pending_profile")
+                if pending_profile.exception() is not None:
+                    st.error(f"❌ Failed to generate profile: {pending_profile.exception()}")
+                else:
+                    st.success(f"✅ Profile report saved to {pending_profile.result()}")
+
+        if submitted and query:
+            if "superstore" in query.lower():
+                # Only rerun the pipeline when the inputs changed since the last run
+                run_key = (query, start_date, end_date, region, profile_now)
+                if st.session_state.get("last_manual_key") == run_key:
+                    st.info("ℹ️ Nothing changed since the last run.")
+                else:
+                    st.session_state["last_manual_key"] = run_key
+                    df = filter_data(df,
+                                     start_date=start_date if start_date else None,
+                                     end_date=end_date if end_date else None,
+                                     region=region if region else None)
+                    # Write in the background; the copy gives the writer thread its own frame
+                    st.session_state["pending_save"] = _save_executor().submit(
+                        save_clean_data, df.copy(), "data/processed/superstore_cleaned"
+                    )
+                    if profile_now:
+                        from src.utils.profiling import generate_profile  # heavy import, only when profiling
+
+                        # Built in a background process (an unchanged slice is only copied from
+                        # the report cache); its outcome is reported on a later run
+                        st.session_state["pending_profile"] = generate_profile(
+                            df, "data/reports/superstore_profile.html"
+                        )
+                        st.success("✅ Superstore data loaded & cleaned; profiling in the background.")
+                    else:
+                        st.success("✅ Superstore data loaded & cleaned.")
+                    st.dataframe(df.head())
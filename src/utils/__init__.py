@@ -1,7 +1,22 @@
 """
 Utilities Module - Helper functions for data processing
+
+Exports are imported on first access (PEP 562), so `from src.utils import
+validate_schema` does not load the profiling module and its dependencies.
 """
-from .profiling import generate_profile
-from .schema import validate_schema
+_EXPORTS = {
+    'generate_profile': '.profiling',
+    'load_profile_inputs': '.profiling',
+    'save_profile_inputs': '.profiling',
+    'validate_schema': '.schema',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
 
-__all__ = ['generate_profile', 'validate_schema']
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
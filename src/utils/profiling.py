@@ -1,11 +1,159 @@
-from ydata_profiling import ProfileReport
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional
 import pandas as pd
+import hashlib
+import multiprocessing
 import os
+import shutil
+import tempfile
+import threading
 
-def generate_profile(df: pd.DataFrame, output_path: str = "data/reports/superstore_profile.html"):
+# Reports are stored here under a hash of the profiled frame's content
+PROFILE_CACHE_DIR = "data/reports/cache"
+
+# Suffix of the temporary file the frame is handed to the worker in, per intermediate_format
+INTERMEDIATE_SUFFIXES = {"parquet": ".parquet", "feather": ".feather"}
+
+# Report settings: Pearson only (the other correlations are O(ncols^2) pairwise loops),
+# no continuous interaction plots, sample or duplicate tables; 0 = one pool worker per CPU
+PROFILE_CONFIG = {
+    "correlations": {
+        "pearson": {"calculate": True},
+        "spearman": {"calculate": False},
+        "kendall": {"calculate": False},
+        "phi_k": {"calculate": False},
+        "cramers": {"calculate": False},
+    },
+    "interactions": {"continuous": False},
+    "samples": None,
+    "duplicates": None,
+    "pool_size": 0,
+}
+
+# One worker: reports are CPU-bound and memory-hungry, so they queue rather than compete.
+# Created on first use, and spawned rather than forked: the app process runs threads.
+_pool: Optional[ProcessPoolExecutor] = None
+
+# digest -> Future of a report still being built, so concurrent calls for one frame share it
+_pending: Dict[str, Future] = {}
+_pending_lock = threading.Lock()
+
+
+def save_profile_inputs(df: pd.DataFrame, path: str):
+    """
+    Persist a frame for (re-)profiling as zstd Parquet or Feather, chosen by the suffix of `path`.
+    """
+    if path.endswith(".feather"):
+        df.to_feather(path, compression="zstd")
+    else:
+        df.to_parquet(path, engine="pyarrow", compression="zstd")
+
+
+def load_profile_inputs(path: str) -> pd.DataFrame:
     """
-    Generate and save a profiling report as an HTML file.
+    Read a frame written by `save_profile_inputs`.
     """
+    if path.endswith(".feather"):
+        return pd.read_feather(path)
+    return pd.read_parquet(path, engine="pyarrow")
+
+
+def _run_profile(df_path: str, output_path: str) -> str:
+    """
+    Build the report for the frame stored at `df_path` (worker process side).
+
+    Top-level so the pool can pickle it; removes `df_path` when done. The
+    HTML is written next to `output_path` and moved into place, so a
+    half-written report is never picked up as a cache hit.
+    """
+    from ydata_profiling import ProfileReport
+
+    try:
+        df = load_profile_inputs(df_path)
+    finally:
+        os.remove(df_path)
+    partial_path = f"{os.path.splitext(output_path)[0]}.partial.html"
+    profile = ProfileReport(df, title="Superstore Data Report", explorative=True, **PROFILE_CONFIG)
+    profile.to_file(output_file=partial_path)
+    os.replace(partial_path, output_path)
+    return output_path
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    The shared report worker pool, started on first use (call with `_pending_lock` held).
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _profile_cached(digest: str, df: pd.DataFrame, intermediate_format: str) -> Future:
+    """
+    Future of the cached report for `digest`, starting a build unless one is already running.
+    """
+    with _pending_lock:
+        future = _pending.get(digest)
+        if future is not None:
+            return future
+
+        fd, df_path = tempfile.mkstemp(suffix=INTERMEDIATE_SUFFIXES[intermediate_format])
+        os.close(fd)
+        try:
+            save_profile_inputs(df, df_path)
+        except Exception:
+            os.remove(df_path)
+            raise
+        cache_path = os.path.join(PROFILE_CACHE_DIR, f"{digest}.html")
+        future = _pending[digest] = _get_pool().submit(_run_profile, df_path, cache_path)
+
+    def _done(_):
+        with _pending_lock:
+            _pending.pop(digest, None)
+
+    future.add_done_callback(_done)
+    return future
+
+
+def generate_profile(
+    df: pd.DataFrame,
+    output_path: str = "data/reports/superstore_profile.html",
+    *,
+    intermediate_format: str = "parquet"
+) -> Future:
+    """
+    Generate and save a profiling report as an HTML file, in a background process.
+
+    Reports are cached on disk by a hash of the frame's content, column
+    names and dtypes; a frame profiled before is served by copying its report, without ProfileReport.
+    Otherwise the frame is handed to the worker as a temporary zstd file in
+    `intermediate_format` ("parquet" or "feather").
+    Returns a Future resolving to `output_path` once the HTML is written;
+    callers keep it and check `.done()` on later runs rather than wait.
+    """
+    if intermediate_format not in INTERMEDIATE_SUFFIXES:
+        raise ValueError(f"Unsupported intermediate format: {intermediate_format}")
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    profile = ProfileReport(df, title="Superstore Data Report", explorative=True)
-    profile.to_file(output_file=output_path)
\ No newline at end of file
+    os.makedirs(PROFILE_CACHE_DIR, exist_ok=True)
+    # Column names and dtypes are part of the key: a renamed or recast frame hashes the same values
+    hasher = hashlib.sha256(repr((tuple(df.columns), tuple(map(str, df.dtypes)))).encode())
+    hasher.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest = hasher.hexdigest()[:16]
+    cache_path = os.path.join(PROFILE_CACHE_DIR, f"{digest}.html")
+
+    result = Future()
+    if os.path.exists(cache_path):
+        shutil.copyfile(cache_path, output_path)
+        result.set_result(output_path)
+        return result
+
+    def _copy(report: Future):
+        try:
+            shutil.copyfile(report.result(), output_path)
+            result.set_result(output_path)
+        except Exception as e:
+            result.set_exception(e)
+
+    _profile_cached(digest, df, intermediate_format).add_done_callback(_copy)
+    return result
@@ -4,7 +4,9 @@ def validate_schema(df: pd.DataFrame, expected_columns: list) -> bool:
     """
     Check if the required columns exist in the dataframe.
     """
-    missing = [col for col in expected_columns if col not in df.columns]
+    # Hash lookups against a set of the columns, reported in expected order
+    columns = frozenset(df.columns)
+    missing = [col for col in expected_columns if col not in columns]
     if missing:
         raise ValueError(f"Missing columns: {missing}")
     return True
\ No newline at end of file
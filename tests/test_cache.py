@@ -1,9 +1,11 @@
 """
 Tests for Cache Module
 """
+import json
 import unittest
 import tempfile
 import shutil
+import time
 from pathlib import Path
 
 from src.cache.cache_manager import CacheManager
@@ -34,6 +36,131 @@ class TestCacheManager(unittest.TestCase):
         value = self.cache.get("test_key", backend="disk")
         self.assertEqual(value, {"data": "test"})
 
+    def test_memory_cache_lru_eviction(self):
+        """Test the memory cache evicts the least recently used entry when full"""
+        cache = CacheManager(cache_dir=self.temp_dir, ttl_seconds=10, max_memory_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_memory_cache_expiry(self):
+        """Test memory entries expire after their TTL"""
+        self.cache.set("short", "value", ttl_seconds=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get("short"))
+        self.assertEqual(len(self.cache.memory_cache), 0)
+
+    def test_expired_entries_reaped(self):
+        """Test expired entries are removed on any access, not only their own"""
+        self.cache.set("short_mem", "value", ttl_seconds=0.01)
+        self.cache.set("short_disk", "value", backend="disk", ttl_seconds=0.01)
+        time.sleep(0.02)
+        self.cache.get("other_key")
+
+        self.assertEqual(len(self.cache.memory_cache), 0)
+        self.assertEqual(len(self.cache.cache_metadata), 0)
+        self.assertFalse(any(Path(self.temp_dir).iterdir()))
+
+    def test_cached_decorator_dataframe_args(self):
+        """Test cached() keys DataFrame arguments by content"""
+        import pandas as pd
+
+        calls = []
+
+        @self.cache.cached()
+        def total(df, column="a"):
+            calls.append(1)
+            return int(df[column].sum())
+
+        df = pd.DataFrame({"a": range(100)})
+        self.assertEqual(total(df), 4950)
+        self.assertEqual(total(df.copy()), 4950)
+        self.assertEqual(len(calls), 1)
+
+        changed = df.copy()
+        changed.loc[50, "a"] = 0
+        self.assertEqual(total(changed), 4900)
+        self.assertEqual(len(calls), 2)
+
+    def test_cached_decorator_hashable_args(self):
+        """Test cached() serves hashable calls from the fast path until cleared"""
+        calls = []
+
+        @self.cache.cached()
+        def square(x):
+            calls.append(x)
+            return x * x
+
+        self.assertEqual([square(3), square(3), square(4)], [9, 9, 16])
+        self.assertEqual(calls, [3, 4])
+
+        self.cache.clear(backend="memory")
+        square(3)
+        self.assertEqual(calls, [3, 4, 3])
+
+    def test_disk_write_failure_keeps_previous_value(self):
+        """Test a failed disk write leaves the previous entry and no temp files"""
+        self.assertTrue(self.cache.set("key", {"a": 1}, backend="disk"))
+
+        class Unpicklable:
+            def __reduce__(self):
+                raise RuntimeError("boom")
+
+        self.assertFalse(self.cache.set("key", [Unpicklable()], backend="disk"))
+        self.cache._hot_set.clear()
+        self.assertEqual(self.cache.get("key", backend="disk"), {"a": 1})
+        self.assertEqual(list(Path(self.temp_dir).glob("*.tmp")), [])
+
+    def test_disk_cache_json_values(self):
+        """Test JSON-shaped values are stored as JSON and others as pickle"""
+        self.cache.set("json_key", {"answer": ["a", 1, 2.5, None, True]}, backend="disk")
+        self.cache.set("tuple_key", {"answer": (1, 2)}, backend="disk")
+        self.assertTrue(self.cache.set("big_int_key", [2 ** 70, -2 ** 70], backend="disk"))
+
+        self.assertEqual(len(list(Path(self.temp_dir).glob("*.json"))), 1)
+        self.assertEqual(len(list(Path(self.temp_dir).glob("*.pkl"))), 2)
+        self.assertEqual(self.cache.get("json_key", backend="disk"), {"answer": ["a", 1, 2.5, None, True]})
+        self.assertEqual(self.cache.get("tuple_key", backend="disk"), {"answer": (1, 2)})
+        self.assertEqual(self.cache.get("big_int_key", backend="disk"), [2 ** 70, -2 ** 70])
+
+        # A restarted process has no format tags and finds the files by suffix
+        fresh = CacheManager(cache_dir=self.temp_dir, ttl_seconds=10)
+        self.assertEqual(fresh.get("json_key", backend="disk"), {"answer": ["a", 1, 2.5, None, True]})
+
+    def test_disk_cache_dataframe(self):
+        """Test DataFrames round-trip through one disk cache file with out-of-band buffers"""
+        import pandas as pd
+
+        df = pd.DataFrame({"a": range(1000), "b": [1.5] * 1000})
+        self.cache.set("df_key", df, backend="disk")
+        self.assertEqual([p.suffix for p in Path(self.temp_dir).iterdir()], [".pkl"])
+
+        value = self.cache.get("df_key", backend="disk")
+        pd.testing.assert_frame_equal(value, df)
+        value.loc[0, "a"] = -1  # restored arrays must stay writable
+
+        self.cache.delete("df_key", backend="disk")
+        self.assertFalse(any(Path(self.temp_dir).iterdir()))
+
+    def test_disk_hits_promoted(self):
+        """Test repeated disk reads are served from memory until the entry changes"""
+        self.cache.set("key", [1, 2], backend="disk")
+        first = self.cache.get("key", backend="disk")
+        self.assertIs(self.cache.get("key", backend="disk"), first)
+
+        self.cache.set("key", [3], backend="disk")
+        self.assertEqual(self.cache.get("key", backend="auto"), [3])
+
+        self.cache.set("key", "mem", backend="memory")
+        self.assertEqual(self.cache.get("key", backend="auto"), "mem")
+        self.cache.delete("key", backend="auto")
+        self.assertIsNone(self.cache.get("key", backend="auto"))
+
     def test_cache_miss(self):
         """Test cache miss returns None"""
         value = self.cache.get("nonexistent_key", backend="memory")
@@ -71,6 +198,24 @@ class TestMemoryStore(unittest.TestCase):
         self.assertEqual(history[0]["role"], "user")
         self.assertEqual(history[0]["content"], "Hello")
 
+    def test_history_limit(self):
+        """Test history keeps only the newest max_history messages"""
+        for i in range(15):
+            self.store.add_message("user" if i % 2 else "assistant", str(i))
+
+        history = self.store.get_conversation_history()
+        self.assertEqual([m["content"] for m in history], [str(i) for i in range(5, 15)])
+        self.assertEqual([m["content"] for m in self.store.get_conversation_history(limit=3)], ["12", "13", "14"])
+        self.assertEqual([m["content"] for m in self.store.get_conversation_history(limit=2, role_filter="user")],
+                         ["11", "13"])
+
+        # Filtered reads only see messages still in the history
+        self.store.add_message("system", "s")
+        for i in range(10):
+            self.store.add_message("user", f"u{i}")
+        self.assertEqual(self.store.get_conversation_history(role_filter="system"), [])
+        self.assertEqual(self.store.get_conversation_history(role_filter="assistant"), [])
+
     def test_session_data(self):
         """Test session data management"""
         self.store.set_session_data("key", "value")
@@ -90,6 +235,24 @@ class TestMemoryStore(unittest.TestCase):
         self.assertEqual(len(logs), 1)
         self.assertEqual(logs[0]["operation"], "test_op")
 
+    def test_export_import_round_trip(self):
+        """Test export writes ISO timestamps and import restores the entries"""
+        self.store.add_message("user", "Hello")
+        self.store.log_execution("op", "success")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = str(Path(temp_dir) / "store.json")
+            self.assertTrue(self.store.export_to_json(path))
+            with open(path) as f:
+                self.assertIn("timestamp", json.load(f)["conversation_history"][0])
+
+            restored = MemoryStore(max_history=10)
+            self.assertTrue(restored.import_from_json(path))
+
+        message = restored.get_conversation_history(role_filter="user")[0]
+        self.assertEqual(message["content"], "Hello")
+        self.assertAlmostEqual(message["timestamp_ns"], self.store.conversation_history[0]["timestamp_ns"], delta=1000)
+        self.assertEqual(len(restored.get_execution_logs(status_filter="success")), 1)
+
     def test_clear_all(self):
         """Test clearing all data"""
         self.store.add_message("user", "test")
@@ -40,6 +40,64 @@ class TestDuckDBHandler(unittest.TestCase):
         result = self.db.query("SELECT * FROM test_table WHERE value > 100")
         self.assertEqual(len(result), 2)
 
+    def test_query_arrow(self):
+        """Test querying into an Arrow table"""
+        self.db.create_table_from_df(self.test_df, "test_table")
+        result = self.db.query_arrow("SELECT name FROM test_table WHERE value > 100 ORDER BY id")
+        self.assertEqual(result.column("name").to_pylist(), ["Bob", "Charlie"])
+
+    def test_repeated_query_after_replace(self):
+        """Test a repeated query sees the table it reads being replaced"""
+        self.db.create_table_from_df(self.test_df, "test_table")
+        self.assertEqual(len(self.db.query("SELECT * FROM test_table")), 3)
+
+        self.db.create_table_from_df(self.test_df.head(1), "test_table")
+        self.assertEqual(len(self.db.query("SELECT * FROM test_table")), 1)
+
+    def test_invalid_table_name(self):
+        """Test table names that are not plain identifiers are rejected"""
+        self.assertFalse(self.db.create_table_from_df(self.test_df, "t; DROP TABLE x"))
+        with self.assertRaises(ValueError):
+            self.db.get_table_schema("test_table --")
+
+    def test_stream_query(self):
+        """Test streaming a query as Arrow record batches"""
+        self.db.create_table_from_df(self.test_df, "test_table")
+        batches = list(self.db.stream_query("SELECT * FROM test_table ORDER BY id", batch_size=2))
+
+        self.assertEqual(sum(b.num_rows for b in batches), 3)
+        self.assertEqual(batches[0].column("name").to_pylist()[0], "Alice")
+
+    def test_materialize_table(self):
+        """Test materialized tables survive the source frame changing"""
+        self.db.create_table_from_df(self.test_df, "test_table", materialize=True)
+        self.test_df.loc[0, "value"] = -1
+
+        result = self.db.query("SELECT value FROM test_table ORDER BY id")
+        self.assertEqual(result["value"].tolist(), [100, 200, 300])
+
+    def test_append_to_existing_view(self):
+        """Test appending to a registered view or a table keeps the rows already there"""
+        self.db.create_table_from_df(self.test_df, "test_table")
+        self.assertTrue(self.db.create_table_from_df(self.test_df, "test_table", if_exists="append"))
+        self.assertEqual(len(self.db.query("SELECT * FROM test_table")), 6)
+
+        self.assertTrue(self.db.create_table_from_df(self.test_df, "test_table", if_exists="append",
+                                                     materialize=True))
+        self.assertEqual(len(self.db.query("SELECT * FROM test_table")), 9)
+
+    def test_file_database_persists_tables(self):
+        """Test frames saved to a database file survive a reopen"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "test.duckdb")
+            with DuckDBHandler(db_path) as db:
+                self.assertTrue(db.create_table_from_df(self.test_df, "t"))
+
+            with DuckDBHandler(db_path) as db:
+                self.assertEqual(db.list_tables(), ["t"])
+                self.assertTrue(db.insert_dataframe(self.test_df.head(1), "t"))
+                self.assertEqual(len(db.query("SELECT * FROM t")), 4)
+
     def test_insert_dataframe(self):
         """Test inserting DataFrame"""
         self.db.create_table_from_df(self.test_df, "test_table")
@@ -72,7 +130,8 @@ class TestSQLiteHandler(unittest.TestCase):
     def tearDown(self):
         """Clean up"""
         self.db.close()
-        Path(self.temp_db.name).unlink(missing_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            Path(self.temp_db.name + suffix).unlink(missing_ok=True)
 
     def test_create_table(self):
         """Test creating table from DataFrame"""
@@ -88,12 +147,72 @@ class TestSQLiteHandler(unittest.TestCase):
         result = self.db.query("SELECT * FROM test_table WHERE value > 100")
         self.assertEqual(len(result), 2)
 
+    def test_query_cache_invalidated_by_writes(self):
+        """Test repeated queries are cached until the next write"""
+        self.db.create_table_from_df(self.test_df, "test_table")
+        first = self.db.query("SELECT * FROM test_table")
+        self.assertEqual(len(self.db.query("SELECT * FROM test_table")), 3)
+        self.assertEqual(len(self.db._query_cache), 1)
+
+        self.db.execute("INSERT INTO test_table VALUES (4, 'Dana', 400)")
+        self.assertEqual(len(self.db.query("SELECT * FROM test_table")), 4)
+        self.assertEqual(len(first), 3)
+
     def test_get_table_schema(self):
         """Test getting table schema"""
         self.db.create_table_from_df(self.test_df, "test_table")
         schema = self.db.get_table_schema("test_table")
         self.assertEqual(len(schema), 3)  # 3 columns
 
+    def test_insert_multiple_batches(self):
+        """Test inserting more rows than fit in one INSERT batch"""
+        df = pd.DataFrame({"id": range(12000), "value": 1.5})
+        self.assertTrue(self.db.insert_dataframe(df, "big_table"))
+        self.assertEqual(self.db.get_table_row_count("big_table"), 12000)
+
+    def test_execute_many_generator(self):
+        """Test execute_many consumes a generator in one transaction"""
+        self.db.execute("CREATE TABLE pairs (a INTEGER, b INTEGER)")
+        self.assertTrue(self.db.execute_many("INSERT INTO pairs VALUES (?, ?)", ((i, i * 2) for i in range(25000))))
+        self.assertEqual(self.db.get_table_row_count("pairs"), 25000)
+
+        rows = [(1, 2), (3,)]  # second tuple has too few parameters
+        self.assertFalse(self.db.execute_many("INSERT INTO pairs VALUES (?, ?)", rows))
+        self.assertEqual(self.db.get_table_row_count("pairs"), 25000)
+
+    def test_batched_introspection(self):
+        """Test counting, describing and dropping several tables at once"""
+        self.db.create_table_from_df(self.test_df, "first")
+        self.db.create_table_from_df(self.test_df.head(1), "second")
+
+        self.assertEqual(self.db.list_tables_with_counts(), {"first": 3, "second": 1})
+        schemas = self.db.get_all_schemas()
+        self.assertEqual(schemas["first"], self.db.get_table_schema("first"))
+
+        self.assertTrue(self.db.drop_table(["first", "second"]))
+        self.assertEqual(self.db.list_tables(), [])
+
+    def test_fast_bulk_load(self):
+        """Test bulk loading restores WAL journaling"""
+        with self.db.fast_bulk_load():
+            self.db.create_table_from_df(self.test_df, "test_table")
+        self.assertEqual(self.db.query("PRAGMA journal_mode").iloc[0, 0], "wal")
+        self.assertEqual(self.db.get_table_row_count("test_table"), 3)
+
+    def test_backup(self):
+        """Test backup includes rows still in the WAL"""
+        self.db.create_table_from_df(self.test_df, "test_table")
+        backup_path = self.temp_db.name + ".bak"
+        try:
+            steps = []
+            self.assertTrue(self.db.backup(backup_path, progress=lambda status, remaining, total: steps.append(remaining)))
+            self.assertEqual(steps[-1], 0)
+            with SQLiteHandler(backup_path) as copy:
+                self.assertEqual(copy.get_table_row_count("test_table"), 3)
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                Path(backup_path + suffix).unlink(missing_ok=True)
+
     def test_row_count(self):
         """Test getting row count"""
         self.db.create_table_from_df(self.test_df, "test_table")
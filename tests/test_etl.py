@@ -0,0 +1,207 @@
+"""
+Tests for ETL Module
+"""
+import os
+import unittest
+import tempfile
+import shutil
+import pandas as pd
+
+from src.etl.load_superstore import load_and_clean_superstore, load_superstore_cached, save_clean_data, filter_data
+from src.etl import csv_reader
+from src.etl.dtypes import downcast_dtypes
+
+
+SAMPLE_CSV = """Row ID,Order ID,Order Date,Ship Date,Region,Category,Sub-Category,Sales,Profit
+1,CA-1,11/8/2016,11/11/2016,South,Furniture,Chairs,261.96,41.91
+2,CA-2,6/12/2016,6/16/2016,West, Office Supplies ,Labels,14.62,6.87
+3,CA-3,1/5/2017,1/9/2017,East,Technology,Phones,907.15,90.72
+"""
+
+
+class TestLoadSuperstore(unittest.TestCase):
+    """Test Superstore loading helpers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, "superstore.csv")
+        with open(self.csv_path, "w") as f:
+            f.write(SAMPLE_CSV)
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_and_clean(self):
+        """Test dates are parsed and strings stripped"""
+        df = load_and_clean_superstore(self.csv_path)
+        self.assertEqual(len(df), 3)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["Order Date"]))
+        self.assertIn("Office Supplies", df["Category"].tolist())
+        self.assertIsInstance(df["Region"].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["Sales"].dtype, "float64")
+        self.assertEqual(df["Sales"].iloc[0], 261.96)  # money values are read exactly
+
+    def test_cached_load_writes_parquet_sidecar(self):
+        """Test the Parquet sidecar is written and reused"""
+        first = load_superstore_cached(self.csv_path, cache_dir=self.cache_dir)
+        sidecar = os.path.join(self.cache_dir, "superstore.csv.parquet")
+        self.assertTrue(os.path.exists(sidecar))
+
+        second = load_superstore_cached(self.csv_path, cache_dir=self.cache_dir)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_save_clean_data(self):
+        """Test Parquet is always written and CSV unless skipped"""
+        df = load_and_clean_superstore(self.csv_path)
+        out_path = os.path.join(self.temp_dir, "clean")
+
+        save_clean_data(df, out_path, write_csv=False)
+        self.assertFalse(os.path.exists(f"{out_path}.csv"))
+        pd.testing.assert_frame_equal(pd.read_parquet(f"{out_path}.parquet"), df)
+
+        save_clean_data(df, out_path)
+        self.assertTrue(os.path.exists(f"{out_path}.csv"))
+
+    def test_filter_data(self):
+        """Test filtering by date range and region"""
+        df = load_and_clean_superstore(self.csv_path)
+
+        filtered = filter_data(df, start_date="2016-01-01", end_date="2016-12-31")
+        self.assertEqual(len(filtered), 2)
+
+        filtered = filter_data(df, region="west")
+        self.assertEqual(filtered["Order ID"].tolist(), ["CA-2"])
+
+        # Plain text Region takes the per-row path
+        df["Region"] = df["Region"].astype(str)
+        filtered = filter_data(df, region="WEST")
+        self.assertEqual(filtered["Order ID"].tolist(), ["CA-2"])
+
+
+class TestReadCsvFast(unittest.TestCase):
+    """Test the upload CSV reader"""
+
+    def test_small_buffer_uses_pandas(self):
+        """Test small in-memory files parse through pandas"""
+        df = csv_reader.read_csv_fast(SAMPLE_CSV.encode("utf-8"))
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df["Order ID"].tolist(), ["CA-1", "CA-2", "CA-3"])
+
+    def test_large_buffer_uses_pyarrow(self):
+        """Test files over the threshold parse through pyarrow"""
+        original = csv_reader.PYARROW_MIN_BYTES
+        csv_reader.PYARROW_MIN_BYTES = 0
+        try:
+            df = csv_reader.read_csv_fast(memoryview(SAMPLE_CSV.encode("latin1")), encoding="latin1")
+        finally:
+            csv_reader.PYARROW_MIN_BYTES = original
+        self.assertEqual(len(df), 3)
+        self.assertAlmostEqual(df["Sales"].sum(), 1183.73)
+
+    def test_column_subset(self):
+        """Test only the requested columns are parsed, in the requested order"""
+        original = csv_reader.PYARROW_MIN_BYTES
+        try:
+            for threshold in (original, 0):
+                csv_reader.PYARROW_MIN_BYTES = threshold
+                df = csv_reader.read_csv_fast(SAMPLE_CSV.encode("utf-8"), columns=["Sales", "Region"])
+                self.assertEqual(list(df.columns), ["Sales", "Region"])
+        finally:
+            csv_reader.PYARROW_MIN_BYTES = original
+
+
+
+class TestDetectEncoding(unittest.TestCase):
+    """Test sample-based encoding detection"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, data: bytes) -> str:
+        path = os.path.join(self.test_dir, "sample.csv")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_bom(self):
+        """Test a UTF-8 byte-order mark wins"""
+        path = self._write(b"\xef\xbb\xbf" + SAMPLE_CSV.encode("utf-8"))
+        self.assertEqual(csv_reader.detect_encoding(path), "utf-8-sig")
+
+    def test_utf8(self):
+        """Test valid UTF-8, including a character split at the sample end"""
+        path = self._write("Café,Zoë\n".encode("utf-8") * 10)
+        self.assertEqual(csv_reader.detect_encoding(path), "utf-8")
+        self.assertEqual(csv_reader.detect_encoding(path, sample_size=4), "utf-8")
+
+    def test_buffer(self):
+        """Test an in-memory upload is sniffed from its prefix without a file"""
+        data = b"\xef\xbb\xbf" + SAMPLE_CSV.encode("utf-8")
+        self.assertEqual(csv_reader.detect_encoding(memoryview(data)), "utf-8-sig")
+        data = ("Région,Société,Café crème\n" * 20).encode("cp1252")
+        self.assertEqual(csv_reader.detect_encoding(bytearray(data)), csv_reader.detect_encoding(self._write(data)))
+
+    def test_non_utf8(self):
+        """Test a Windows-1252 file gets an encoding that decodes it"""
+        text = "Région,Société,Café crème\n" * 20
+        path = self._write(text.encode("cp1252"))
+        encoding = csv_reader.detect_encoding(path)
+        self.assertNotEqual(encoding, "utf-8")
+        self.assertEqual(text.encode("cp1252").decode(encoding), text)
+
+
+
+class TestDowncastDtypes(unittest.TestCase):
+    """Test post-load dtype shrinking"""
+
+    def test_downcast(self):
+        """Test numeric downcasting and categorical conversion"""
+        df = pd.DataFrame({
+            "qty": [1, 2, 3, 4, 5, 6],
+            "price": [1.5, 2.5, 3.5, 4.5, 5.5, 6.5],
+            "region": ["West", "West", "East", "West", "East", "West"],
+            "id": ["a", "b", "c", "d", "e", "f"]
+        })
+        df = downcast_dtypes(df)
+
+        self.assertEqual(df["qty"].dtype, "int8")
+        self.assertEqual(df["price"].dtype, "float32")
+        self.assertIsInstance(df["region"].dtype, pd.CategoricalDtype)
+        self.assertNotIsInstance(df["id"].dtype, pd.CategoricalDtype)
+        self.assertTrue(df.attrs["dtypes_downcast"])
+
+    def test_downcast_keeps_inexact_floats(self):
+        """Test floats are only narrowed when every value round-trips exactly"""
+        df = downcast_dtypes(pd.DataFrame({"sales": [261.96, 731.94], "half": [0.5, None]}))
+
+        self.assertEqual(df["sales"].dtype, "float64")
+        self.assertEqual(df["sales"].tolist(), [261.96, 731.94])
+        self.assertEqual(df["half"].dtype, "float32")
+
+    def test_category_columns(self):
+        """Test an explicit column list replaces the ratio rule"""
+        df = downcast_dtypes(pd.DataFrame({"region": ["West", "West"], "city": ["A", "A"]}),
+                             category_columns=["region", "missing"])
+
+        self.assertIsInstance(df["region"].dtype, pd.CategoricalDtype)
+        self.assertNotIsInstance(df["city"].dtype, pd.CategoricalDtype)
+
+    def test_downcast_categoricals_only(self):
+        """Test numeric=False keeps numeric widths so arithmetic cannot overflow"""
+        df = downcast_dtypes(pd.DataFrame({"qty": [1, 2, 3, 4], "region": ["W", "W", "W", "W"]}), numeric=False)
+
+        self.assertEqual(df["qty"].dtype, "int64")
+        self.assertEqual((df["qty"] * 100).max(), 400)
+        self.assertIsInstance(df["region"].dtype, pd.CategoricalDtype)
+
+
+if __name__ == "__main__":
+    unittest.main()
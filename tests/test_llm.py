@@ -1,11 +1,22 @@
 """
 Tests for LLM Module
 """
+import asyncio
+import io
+import tempfile
+import threading
+import time
+import shutil
 import unittest
+from types import SimpleNamespace
+from unittest import mock
 import pandas as pd
 
+from src.cache.cache_manager import CacheManager
 from src.llm.code_executor import SafeCodeExecutor
-from src.llm.prompt_templates import PromptTemplates
+from src.llm.ollama_client import OllamaClient
+from src.llm.batch_dispatcher import BatchDispatcher
+from src.llm.prompt_templates import PromptTemplates, DATA_ANALYSIS_INSTRUCTIONS, _head_csv
 
 
 class TestSafeCodeExecutor(unittest.TestCase):
@@ -89,6 +100,124 @@ class TestPromptTemplates(unittest.TestCase):
         self.assertIn("Total Columns: 2", prompt)
         self.assertIn("What is the total sales?", prompt)
 
+    def test_prompt_static_prefix(self):
+        """Test the instruction block leads every prompt and the question comes last"""
+        other = pd.DataFrame({"units": [1, 2]})
+        for df, query in [(self.df, "What is the total sales?"), (other, "How many units?")]:
+            prompt = PromptTemplates.data_analysis_prompt(df, query)
+            self.assertTrue(prompt.startswith(DATA_ANALYSIS_INSTRUCTIONS))
+            self.assertTrue(prompt.rstrip().endswith(query))
+
+    def test_data_analysis_prompt_parts(self):
+        """Test the prompt splits into a shared preamble and a per-question body"""
+        parts = PromptTemplates.data_analysis_prompt_parts(self.df, "What is the total sales?")
+        other = PromptTemplates.data_analysis_prompt_parts(self.df, "Max sales?")
+
+        self.assertIs(parts.preamble, other.preamble)
+        self.assertIn("What is the total sales?", parts.body)
+        self.assertEqual(PromptTemplates.data_analysis_prompt(self.df, "What is the total sales?"),
+                         parts.preamble + "\n" + parts.body)
+        self.assertNotEqual(parts, other)
+        self.assertEqual(parts, PromptTemplates.data_analysis_prompt_parts(self.df.copy(), "What is the total sales?"))
+        self.assertEqual(len({parts, other}), 2)
+
+    def test_data_analysis_prompt_stream(self):
+        """Test streaming the prompt writes the same text as building it"""
+        out = io.StringIO()
+        PromptTemplates.data_analysis_prompt_stream(self.df, "What is the total sales?", out)
+        self.assertEqual(out.getvalue(), PromptTemplates.data_analysis_prompt(self.df, "What is the total sales?"))
+
+    def test_batch_render(self):
+        """Test identical prompts in a batch are grouped by request index"""
+        ask = PromptTemplates.data_analysis_prompt
+        groups, prompts = PromptTemplates.batch_render([
+            (ask, (self.df, "Total sales?")),
+            (ask, (self.df, "Max sales?")),
+            (ask, (self.df, "Total sales?"), {"sample_rows": 10}),
+        ])
+
+        self.assertEqual(len(prompts), 2)
+        self.assertEqual([groups[p] for p in prompts], [[0, 2], [1]])
+
+    def test_wide_frame_column_details(self):
+        """Test wide frames list every column with its dtype"""
+        wide = pd.DataFrame({f"col_{i}": [i] for i in range(40)}).astype({"col_1": "float64", "col_2": "category"})
+        prompt = PromptTemplates.data_analysis_prompt(wide, "q")
+
+        expected = "\n".join(f"- {col}: {dtype}" for col, dtype in wide.dtypes.items())
+        self.assertIn(expected, prompt)
+
+    def test_data_quality_prompt(self):
+        """Test null counts are listed only for columns that have nulls"""
+        df = pd.DataFrame({"a": [1, None, 3], "b": ["x", None, None], "c": [1, 2, 3]})
+        prompt = PromptTemplates.data_quality_prompt(df)
+
+        self.assertIn("- a: 1 nulls (33.3%)", prompt)
+        self.assertIn("- b: 2 nulls (66.7%)", prompt)
+        self.assertNotIn("- c:", prompt)
+        self.assertIn("No null values found", PromptTemplates.data_quality_prompt(self.df))
+
+    def test_data_analysis_prompt_tracks_frame_changes(self):
+        """Test cached column details follow a frame whose columns change"""
+        PromptTemplates.data_analysis_prompt(self.df, "q")
+        self.df["region"] = ["East", "West", "East"]
+
+        prompt = PromptTemplates.data_analysis_prompt(self.df, "q")
+        self.assertIn("- region:", prompt)
+        self.assertIn("Total Columns: 3", prompt)
+
+    def test_head_csv_matches_pandas(self):
+        """Test the sample serializer writes exactly what to_csv would"""
+        frames = [
+            pd.DataFrame({"n": [1, 2], "x": [0.1, 1e-9], "s": ["a,b", 'say "hi"'], "b": [True, False]}),
+            pd.DataFrame({"x": [1.5, None], "d": pd.to_datetime(["2020-01-01", "2020-01-02"])}),
+        ]
+        for df in frames:
+            self.assertEqual(_head_csv(df, 10), df.head(10).to_csv(index=False))
+
+    def test_cached_call(self):
+        """Test identical template inputs reuse the cached LLM response"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cache = CacheManager(cache_dir=temp_dir)
+        prompts = []
+
+        def llm_call(prompt):
+            prompts.append(prompt)
+            return f"answer {len(prompts)}"
+
+        ask = PromptTemplates.data_analysis_prompt
+        self.assertEqual(PromptTemplates.cached_call(cache, ask, llm_call, self.df, "total?"), "answer 1")
+        self.assertEqual(PromptTemplates.cached_call(cache, ask, llm_call, self.df.copy(), "total?"), "answer 1")
+        self.assertEqual(PromptTemplates.cached_call(cache, ask, llm_call, self.df, "max?"), "answer 2")
+
+        changed = self.df.assign(sales=[1, 2, 3])
+        self.assertEqual(PromptTemplates.cached_call(cache, ask, llm_call, changed, "total?"), "answer 3")
+        self.assertEqual(len(prompts), 3)
+
+    def test_structural_cache(self):
+        """Test repeated questions share one cached answer, returned verbatim"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cache = CacheManager(cache_dir=temp_dir)
+        prompts = []
+
+        def llm_call(prompt):
+            prompts.append(prompt)
+            return "-- sum\nSELECT region, sum(sales) FROM orders GROUP BY region"
+
+        schema = {"orders": "region TEXT, sales REAL"}
+        ask = PromptTemplates.sql_generation_prompt
+        first = PromptTemplates.build_with_structural_cache(cache, ask, llm_call, schema, "sum")
+        second = PromptTemplates.build_with_structural_cache(cache, ask, llm_call, schema, "sum")
+        self.assertEqual(len(prompts), 1)
+        self.assertEqual(first, second)
+
+        # Other wordings are asked afresh; the cached code is never rewritten
+        self.assertEqual(PromptTemplates.build_with_structural_cache(cache, ask, llm_call, schema, "SUM"), first)
+        PromptTemplates.build_with_structural_cache(cache, ask, llm_call, {"items": "id INT"}, "sum")
+        self.assertEqual(len(prompts), 3)
+
     def test_etl_task_prompt(self):
         """Test ETL task prompt generation"""
         prompt = PromptTemplates.etl_task_prompt(
@@ -114,6 +243,130 @@ class TestPromptTemplates(unittest.TestCase):
         self.assertIn("Get all users", prompt)
         self.assertIn("DuckDB", prompt)
 
+    def test_agent_routing_prompt(self):
+        """Test routing prompt asks for agent-tagged steps"""
+        prompt = PromptTemplates.agent_routing_prompt(
+            "Load sales.csv and profile it",
+            ["ETL Agent", "Profiling Agent"]
+        )
+
+        self.assertIn("Load sales.csv and profile it", prompt)
+        self.assertIn("- ETL Agent", prompt)
+        self.assertIn('"agent": "etl|query|profile"', prompt)
+
+
+class _FakeAsyncOpenAI:
+    """Stand-in for openai.AsyncOpenAI that echoes the prompt back"""
+
+    def __init__(self, **kwargs):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def _create(self, model, messages, temperature):
+        prompt = messages[-1]["content"]
+        if prompt == "slow":
+            await asyncio.sleep(1)
+        if prompt == "fail":
+            raise RuntimeError("model error")
+        message = SimpleNamespace(content=f"{model}:{prompt}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestOllamaClient(unittest.TestCase):
+    """Test OllamaClient functionality"""
+
+    def test_status_requests_pooled_and_cached(self):
+        """Test status requests go through the pooled session and a TTL cache"""
+        client = OllamaClient()
+        response = SimpleNamespace(status_code=200, json=lambda: {"models": [{"name": "llama3"}]})
+
+        with mock.patch.object(client._session, "get", return_value=response) as get:
+            self.assertTrue(client.check_connection())
+            self.assertEqual(client.list_models(), ["llama3"])
+            self.assertEqual(get.call_count, 2)
+
+            # Repeat calls are served from the TTL cache
+            self.assertTrue(client.check_connection())
+            self.assertEqual(client.list_models(), ["llama3"])
+            self.assertEqual(get.call_count, 2)
+
+            client.invalidate_cache()
+            client.list_models()
+            self.assertEqual(get.call_count, 3)
+        client.close()
+
+    def test_generate_structured_output(self):
+        """Test JSON answers are parsed, with or without a code fence"""
+        client = OllamaClient()
+
+        with mock.patch.object(client, "generate_completion", return_value='```json\n{"a": [1, 2]}\n```'):
+            self.assertEqual(client.generate_structured_output("q"), {"a": [1, 2]})
+        with mock.patch.object(client, "generate_completion", return_value="not json"):
+            with self.assertRaises(ValueError):
+                client.generate_structured_output("q")
+
+    def test_stream_completion(self):
+        """Test streamed deltas are yielded in order, skipping empty ones"""
+        client = OllamaClient()
+        chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+            for text in ["Hel", None, "lo"]
+        ] + [SimpleNamespace(choices=[])]
+
+        with mock.patch.object(client.client.chat.completions, "create", return_value=iter(chunks)) as create:
+            self.assertEqual(list(client.stream_completion("hi", model="phi3")), ["Hel", "lo"])
+        self.assertTrue(create.call_args.kwargs["stream"])
+        self.assertEqual(create.call_args.kwargs["model"], "phi3")
+
+    def test_generate_batch(self):
+        """Test batch answers come back in prompt order, failures as exceptions"""
+        client = OllamaClient()
+
+        with mock.patch("src.llm.ollama_client.openai.AsyncOpenAI", _FakeAsyncOpenAI):
+            results = client.generate_batch(["q1", "fail", "q2"], model="llama3")
+
+        self.assertEqual(results[0], "llama3:q1")
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(results[2], "llama3:q2")
+
+
+class TestBatchDispatcher(unittest.TestCase):
+    """Test BatchDispatcher functionality"""
+
+    def test_submit_many_coalesces_into_one_batch(self):
+        """Test requests queued together are sent as one batch"""
+        with mock.patch("src.llm.batch_dispatcher.openai.AsyncOpenAI", _FakeAsyncOpenAI):
+            dispatcher = BatchDispatcher(window_seconds=0.05).start()
+            results = dispatcher.submit_many(["q1", "q2", "fail"], model="mistral", timeout=5)
+
+        self.assertEqual(results[:2], ["mistral:q1", "mistral:q2"])
+        self.assertIsInstance(results[2], RuntimeError)
+        self.assertEqual(dispatcher.get_stats()["batches"], 1)
+        self.assertEqual(dispatcher.get_stats()["max_batch_size"], 3)
+
+    def test_slow_batch_does_not_block_later_requests(self):
+        """Test a request arriving during a slow completion is answered without waiting for it"""
+        with mock.patch("src.llm.batch_dispatcher.openai.AsyncOpenAI", _FakeAsyncOpenAI):
+            dispatcher = BatchDispatcher().start()
+            slow = threading.Thread(target=dispatcher.submit, args=("slow",), kwargs={"timeout": 5})
+            slow.start()
+            time.sleep(0.1)
+            self.assertEqual(dispatcher.submit("hi", timeout=0.5), "llama3:hi")
+            slow.join()
+
+    def test_submit_raises_on_failure(self):
+        """Test a single failed request raises"""
+        with mock.patch("src.llm.batch_dispatcher.openai.AsyncOpenAI", _FakeAsyncOpenAI):
+            dispatcher = BatchDispatcher().start()
+            self.assertEqual(dispatcher.submit("hi", timeout=5), "llama3:hi")
+            with self.assertRaises(RuntimeError):
+                dispatcher.submit("fail", timeout=5)
+
 
 if __name__ == "__main__":
     unittest.main()